@@ -1,15 +1,19 @@
 """Check patching resource updates."""
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 from threading import Lock
+from typing import Self, cast
 
 from environs import Env
 from loguru import logger
 
 from main import get_app
+from src.app import APP
 from src.config import RevancedConfig
 from src.manager.github import GitHubManager
+from src.patches_cache import SingleFlight
 from src.utils import default_build, patches_dl_list_key, patches_versions_key
 
 
@@ -122,52 +126,102 @@ def _print_build_summary(build_infos: list[AppBuildInfo]) -> None:
     logger.info("=" * 60)
 
 
+class ReleaseTagResolver(object):
+    """Release tags of patch bundle URLs, resolved through the release API once per URL for the whole check."""
+
+    def __init__(self: Self, config: RevancedConfig) -> None:
+        self.config = config
+        self._tags: dict[str, str] = {}
+        self._lock = Lock()
+        # Apps checked in parallel usually share bundle URLs; they wait for one request instead of issuing their own.
+        self._flight = SingleFlight()
+
+    def tag(self: Self, url: str) -> str:
+        """Return the release tag a patch bundle URL currently points at."""
+        url = url.strip()
+        return cast("str", self._flight.do(url, lambda: self._cached_or_resolved(url)))
+
+    def _cached_or_resolved(self: Self, url: str) -> str:
+        """Resolve a URL unless an earlier caller already did."""
+        with self._lock:
+            if url in self._tags:
+                return self._tags[url]
+        tag, _ = APP.resolve_release(url, self.config, APP.PATCH_BUNDLE_ASSET_FILTER)
+        with self._lock:
+            self._tags[url] = tag
+        return tag
+
+
+@dataclass
+class ResourceCheck(object):
+    """Run-wide state shared by the per-app checks."""
+
+    config: RevancedConfig
+    github_manager: GitHubManager
+    tag_resolver: ReleaseTagResolver
+    metadata_only: bool = True
+    resource_cache: dict[str, tuple[str, str]] = field(default_factory=dict)
+    resource_lock: Lock = field(default_factory=Lock)
+
+
+def _latest_patch_bundles(app_obj: APP, check: ResourceCheck) -> tuple[list[str], list[str]]:
+    """Return the current versions and sources of an app's patch bundles."""
+    if check.metadata_only:
+        # Neither the bundles nor the CLI are needed to compare tags.
+        return [check.tag_resolver.tag(url) for url in app_obj.patches_dl_list], app_obj.patches_dl_list
+    app_obj.download_patch_resources(check.config, check.resource_cache, check.resource_lock)
+    return app_obj.get_patch_bundles_versions(), app_obj.patches_dl_list
+
+
+def _check_app(app_name: str, check: ResourceCheck) -> AppBuildInfo | None:
+    """Compare an app's last built patch bundles with the current ones."""
+    logger.info(f"Checking {app_name}")
+    app_obj = get_app(check.config, app_name)
+    old_patches_versions = check.github_manager.get_last_version(app_obj, patches_versions_key)
+    old_patches_sources = check.github_manager.get_last_version_source(app_obj, patches_dl_list_key)
+
+    # Backward compatibility for string version/source
+    if isinstance(old_patches_versions, str):
+        old_patches_versions = [old_patches_versions]
+    if isinstance(old_patches_sources, str):
+        old_patches_sources = [old_patches_sources]
+
+    new_patches_versions, new_patches_sources = _latest_patch_bundles(app_obj, check)
+
+    # Detect why build is needed
+    reason = _detect_build_reason(
+        old_patches_versions,
+        old_patches_sources,
+        new_patches_versions,
+        new_patches_sources,
+    )
+    if reason is None:
+        return None
+    logger.debug(f"{app_name} needs rebuild: {reason.value}")
+    return AppBuildInfo(
+        app_name=app_name,
+        reason=reason,
+        old_versions=old_patches_versions,
+        new_versions=new_patches_versions,
+        old_sources=old_patches_sources,
+        new_sources=new_patches_sources,
+    )
+
+
 def check_if_build_is_required() -> bool:
     """Read resource version and determine which apps need rebuilding."""
     env = Env()
     env.read_env()
     config = RevancedConfig(env)
-    build_infos: list[AppBuildInfo] = []
-    resource_cache: dict[str, tuple[str, str]] = {}
-    resource_lock = Lock()
-    github_manager = GitHubManager(env)
-
-    for app_name in env.list("PATCH_APPS", default_build):
-        logger.info(f"Checking {app_name}")
-        app_obj = get_app(config, app_name)
-        old_patches_versions = github_manager.get_last_version(app_obj, patches_versions_key)
-        old_patches_sources = github_manager.get_last_version_source(app_obj, patches_dl_list_key)
-
-        # Backward compatibility for string version/source
-        if isinstance(old_patches_versions, str):
-            old_patches_versions = [old_patches_versions]
-        if isinstance(old_patches_sources, str):
-            old_patches_sources = [old_patches_sources]
-
-        app_obj.download_patch_resources(config, resource_cache, resource_lock)
-
-        new_patches_versions = app_obj.get_patch_bundles_versions()
-        new_patches_sources = app_obj.patches_dl_list
-
-        # Detect why build is needed
-        reason = _detect_build_reason(
-            old_patches_versions,
-            old_patches_sources,
-            new_patches_versions,
-            new_patches_sources,
-        )
-
-        if reason:
-            build_info = AppBuildInfo(
-                app_name=app_name,
-                reason=reason,
-                old_versions=old_patches_versions,
-                new_versions=new_patches_versions,
-                old_sources=old_patches_sources,
-                new_sources=new_patches_sources,
-            )
-            build_infos.append(build_info)
-            logger.debug(f"{app_name} needs rebuild: {reason.value}")
+    # Bundle versions are release tags, so by default they are read from the release API without any download.
+    metadata_only = env.bool("RESOURCE_CHECK_METADATA_ONLY", True)
+    check = ResourceCheck(config, GitHubManager(env), ReleaseTagResolver(config), metadata_only)
+    app_names = env.list("PATCH_APPS", default_build)
+
+    # Apps are checked concurrently, but results keep the PATCH_APPS order the workflow output relies on.
+    with ThreadPoolExecutor(max(config.max_parallel_apps, 1)) as executor:
+        results = list(executor.map(lambda app_name: _check_app(app_name, check), app_names))
+    build_infos = [info for info in results if info is not None]
 
     # Print detailed summary
     _print_build_summary(build_infos)
@@ -179,4 +233,5 @@ def check_if_build_is_required() -> bool:
     return False
 
 
-check_if_build_is_required()
+if __name__ == "__main__":
+    check_if_build_is_required()
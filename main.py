@@ -1,21 +1,32 @@
 """Entry point."""
 
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
-from typing import Any
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from threading import BoundedSemaphore, Lock
+from types import TracebackType
+from typing import Any, Self
 
 from environs import Env
 from loguru import logger
 
 from src.app import APP
+from src.artifact_store import ArtifactStore
+from src.bundle_metadata import BundleMetadataReader
 from src.config import RevancedConfig
+from src.downloader.cloak_pool import CloakBrowserPool
 from src.downloader.download import Downloader
+from src.downloader.fetch_pool import FetchPool
+from src.downloader.release_cache import ReleaseMetadataCache
 from src.exceptions import AppNotFoundError, BuilderError, PatchesJsonLoadError, PatchingFailedError
+from src.jvm import ClassDataSharing
+from src.jvm_daemon import JvmDaemonPool
 from src.parser import Parser
 from src.patches import Patches
 from src.utils import (
     check_java,
+    configure_http_sessions,
     delete_old_changelog,
     generate_obtainium_export,
     load_older_updates,
@@ -39,31 +50,66 @@ def get_app(config: RevancedConfig, app_name: str) -> APP:
     return APP(app_name=app_name, package_name=package_name, config=config)
 
 
+@dataclass
+class AppBuild(object):
+    """Per-app state handed from one pipeline stage to the next."""
+
+    app: APP
+    patcher: Patches | None = None
+    parser: Parser | None = None
+    app_all_patches: list[dict[str, str]] | None = None
+
+
+def fetch_app_resources(app_name: str, config: RevancedConfig, caches: AppCaches) -> AppBuild:
+    """Network stage: resolve the app and download its CLI and patch bundles."""
+    _, resource_cache, _, resource_lock = caches
+    logger.info(f"Trying to build {app_name}")
+    app = get_app(config, app_name)
+    # Resource downloads use shared in-run caches unless the operator disables caching in config.
+    app.download_patch_resources(config, resource_cache, resource_lock)
+    return AppBuild(app)
+
+
+def load_app_patches(build: AppBuild, config: RevancedConfig) -> AppBuild:
+    """Metadata stage: list patches with the CLI and resolve the app version to download."""
+    build.patcher = Patches(config, build.app)
+    build.parser = Parser(build.patcher, config)
+    build.app_all_patches = build.patcher.get_app_configs(build.app)
+    return build
+
+
+def acquire_app_apk(build: AppBuild, config: RevancedConfig, caches: AppCaches) -> AppBuild:
+    """APK stage: download the input APK for the version chosen by the metadata stage."""
+    download_cache, _, download_lock, _ = caches
+    # APK downloads use shared in-run caches unless the operator disables caching in config.
+    build.app.download_apk_for_patching(config, download_cache, download_lock)
+    return build
+
+
+def patch_app_build(build: AppBuild) -> dict[str, Any]:
+    """JVM stage: select patches, record update info and run the patch command."""
+    app, parser, patcher = build.app, build.parser, build.patcher
+    if parser is None or patcher is None or build.app_all_patches is None:
+        msg = f"Patch metadata for {app.app_name} was not loaded before patching."
+        raise BuilderError(msg)
+    parser.include_exclude_patch(app, build.app_all_patches, patcher.patches_dict)
+    logger.info(app)
+    app_update_info = save_patch_info(app, {})
+    parser.patch_app(app)
+    return app_update_info
+
+
 def process_single_app(
     app_name: str,
     config: RevancedConfig,
     caches: AppCaches,
 ) -> dict[str, Any]:
     """Process a single app and return its update info."""
-    download_cache, resource_cache, download_lock, resource_lock = caches
-    logger.info(f"Trying to build {app_name}")
     try:
-        app = get_app(config, app_name)
-
-        # Resource downloads use shared in-run caches unless the operator disables caching in config.
-        app.download_patch_resources(config, resource_cache, resource_lock)
-
-        patcher = Patches(config, app)
-        parser = Parser(patcher, config)
-        app_all_patches = patcher.get_app_configs(app)
-
-        # APK downloads use shared in-run caches unless the operator disables caching in config.
-        app.download_apk_for_patching(config, download_cache, download_lock)
-
-        parser.include_exclude_patch(app, app_all_patches, patcher.patches_dict)
-        logger.info(app)
-        app_update_info = save_patch_info(app, {})
-        parser.patch_app(app)
+        build = fetch_app_resources(app_name, config, caches)
+        build = load_app_patches(build, config)
+        build = acquire_app_apk(build, config, caches)
+        app_update_info = patch_app_build(build)
     except AppNotFoundError as e:
         logger.info(e)
         raise
@@ -81,6 +127,122 @@ def process_single_app(
         return app_update_info
 
 
+def _log_stage_failure(app_name: str, error: BaseException) -> None:
+    """Log a pipeline stage failure with the same wording process_single_app uses."""
+    if isinstance(error, AppNotFoundError):
+        logger.info(error)
+    elif isinstance(error, PatchesJsonLoadError):
+        logger.opt(exception=error).error("Patches.json not found")
+    elif isinstance(error, PatchingFailedError):
+        logger.opt(exception=error).error(error)
+    elif isinstance(error, BuilderError):
+        logger.opt(exception=error).error(f"Failed to build {app_name} because of {error}")
+    else:
+        # Unexpected errors are still reported per stage, worded like the final failed-app summary.
+        logger.opt(exception=error).error(f"Error processing {app_name}: {error}")
+
+
+class AppPipeline(object):
+    """Run app builds as stages with separate bounded pools so network and JVM work overlap across apps."""
+
+    def __init__(self: Self, config: RevancedConfig, caches: AppCaches) -> None:
+        # Pools never exceed the app count, so small runs do not spawn idle threads.
+        network_workers = min(len(config.apps), config.max_download_workers)
+        jvm_workers = min(len(config.apps), config.max_parallel_apps)
+        # list-patches and patch runs share these slots, so MAX_PARALLEL_APPS still caps the JVMs alive at once.
+        self._jvm_slots = BoundedSemaphore(jvm_workers)
+        # Downloaded APKs waiting for a JVM are bounded to one batch beyond the running one, so the APK stage
+        # cannot fill the disk with every app's APK while the first patches are still running.
+        self._apk_slots = BoundedSemaphore(2 * jvm_workers)
+        self._executors = [
+            ThreadPoolExecutor(max_workers=network_workers, thread_name_prefix="resources"),
+            ThreadPoolExecutor(max_workers=jvm_workers, thread_name_prefix="metadata"),
+            ThreadPoolExecutor(max_workers=network_workers, thread_name_prefix="apk"),
+            ThreadPoolExecutor(max_workers=jvm_workers, thread_name_prefix="patch"),
+        ]
+        # Each stage consumes the previous stage's output; the executors' work queues connect them.
+        self._stages: list[Callable[[Any], Any]] = [
+            lambda app_name: fetch_app_resources(app_name, config, caches),
+            lambda build: self._with_jvm_slot(load_app_patches, build, config),
+            lambda build: self._acquire_apk(build, config, caches),
+            self._patch,
+        ]
+        logger.info(
+            f"Processing {len(config.apps)} apps in a staged pipeline with {network_workers} download workers "
+            f"per stage and {jvm_workers} JVM workers shared by list-patches and patching",
+        )
+
+    def _with_jvm_slot(self: Self, stage: Callable[..., Any], *args: Any) -> Any:
+        """Run a JVM stage once one of the run's shared JVM slots is free."""
+        with self._jvm_slots:
+            return stage(*args)
+
+    def _acquire_apk(self: Self, build: AppBuild, config: RevancedConfig, caches: AppCaches) -> AppBuild:
+        """Download an app's APK once the patch stage has room for it; the slot is held until it is patched."""
+        self._apk_slots.acquire()
+        try:
+            return acquire_app_apk(build, config, caches)
+        except BaseException:
+            self._apk_slots.release()
+            raise
+
+    def _patch(self: Self, build: AppBuild) -> dict[str, Any]:
+        """Patch an app in a shared JVM slot and free its APK slot for the next download."""
+        try:
+            update_info: dict[str, Any] = self._with_jvm_slot(patch_app_build, build)
+        finally:
+            self._apk_slots.release()
+        return update_info
+
+    def __enter__(self: Self) -> Self:
+        """Return the pipeline so callers can submit apps inside a with block."""
+        return self
+
+    def __exit__(
+        self: Self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Wait for every queued stage and release all worker threads."""
+        # Upstream pools drain first because their callbacks still hand work to the later stages.
+        for executor in self._executors:
+            executor.shutdown(wait=True)
+
+    def submit(self: Self, app_name: str) -> Future[dict[str, Any]]:
+        """Queue an app at the first stage and return a future for its update info."""
+        result: Future[dict[str, Any]] = Future()
+        self._run_stage(result, app_name, 0, app_name)
+        return result
+
+    def _run_stage(self: Self, result: Future[dict[str, Any]], app_name: str, stage: int, value: Any) -> None:
+        """Hand an app to one stage's pool and continue with the next stage when it finishes."""
+        try:
+            future = self._executors[stage].submit(self._stages[stage], value)
+        except RuntimeError as e:
+            # Pools only refuse work while the run is being torn down, so the app is reported as failed.
+            result.set_exception(e)
+            return
+        future.add_done_callback(lambda done: self._on_stage_done(result, app_name, stage, done))
+
+    def _on_stage_done(
+        self: Self,
+        result: Future[dict[str, Any]],
+        app_name: str,
+        stage: int,
+        done: Future[Any],
+    ) -> None:
+        """Propagate a stage failure or advance the app to its next stage."""
+        if (error := done.exception()) is not None:
+            _log_stage_failure(app_name, error)
+            result.set_exception(error)
+        elif stage + 1 < len(self._stages):
+            self._run_stage(result, app_name, stage + 1, done.result())
+        else:
+            logger.info(f"Successfully completed {app_name}")
+            result.set_result(done.result())
+
+
 def _build_caches() -> AppCaches:
     """Create cache containers and locks shared across app workers."""
     # Cache policy is enforced by callers, but the tuple shape stays stable for app-processing helpers.
@@ -117,15 +279,12 @@ def _process_apps_in_parallel(
     failed_apps: list[str],
 ) -> None:
     """Process apps with worker concurrency while preserving aggregate failure reporting."""
-    # Worker count is capped by app count and operator config so a large env file does not overload the runner.
-    max_workers = min(len(config.apps), config.max_parallel_apps)
-    logger.info(f"Processing {len(config.apps)} apps in parallel with {max_workers} workers")
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    # Downloads for later apps proceed while earlier apps occupy the JVM stages.
+    with AppPipeline(config, caches) as pipeline:
         # Submitting everything first lets independent apps finish even if one app fails early.
         future_to_app = {}
         for app_name in config.apps:
-            future = executor.submit(process_single_app, app_name, config, caches)
+            future = pipeline.submit(app_name)
             future_to_app[future] = app_name
         total_apps = len(config.apps)
 
@@ -162,9 +321,18 @@ def main() -> None:
     config = RevancedConfig(env)
     updates_info = {}
     failed_apps: list[str] = []
+    # Extra downloads already go through these caches, so they are configured before anything is fetched.
+    configure_http_sessions(config)
+    ArtifactStore.configure(config)
+    ReleaseMetadataCache.configure(config)
+    FetchPool.configure(config)
+    CloakBrowserPool.configure(config)
     Downloader.extra_downloads(config)
     if not config.dry_run:
         check_java()
+        ClassDataSharing.configure(config)
+        BundleMetadataReader.configure(config)
+        JvmDaemonPool.configure(config)
         delete_old_changelog()
         updates_info = load_older_updates(env)
 
@@ -0,0 +1,70 @@
+"""Compare full-page and targeted parsing of APKMirror and Uptodown page fixtures.
+
+The fixtures are synthetic: hand-built pages with each site's real structure around the elements the scrapers
+read, padded with filler markup to a realistic size. Timings indicate the relative win, not live-page numbers.
+"""
+
+import argparse
+from collections.abc import Callable
+from pathlib import Path
+from timeit import repeat
+
+from bs4 import BeautifulSoup
+from bs4.filter import SoupStrainer
+from loguru import logger
+
+from src.downloader.apkmirror import APKMIRROR_PAGE_CLASSES
+from src.html_parsing import has_class, html_parser, parse_html
+
+FIXTURES = Path(__file__).resolve().parent.parent.joinpath("tests", "fixtures", "html")
+# Each fixture page with the lookup the scrapers perform on it.
+LOOKUPS: list[tuple[str, str, SoupStrainer, Callable[[BeautifulSoup], object]]] = [
+    # APKMirror pages are parsed once with the page cache's strainer and then serve every lookup made on them.
+    (
+        "apkmirror_release.html",
+        "variants table",
+        SoupStrainer(class_=has_class(*APKMIRROR_PAGE_CLASSES)),
+        lambda soup: soup.find(class_="tab-pane noPadding"),
+    ),
+    (
+        "apkmirror_variant.html",
+        "download button and version",
+        SoupStrainer(class_=has_class(*APKMIRROR_PAGE_CLASSES)),
+        lambda soup: (soup.find(class_="center"), soup.find(class_="appspec-value"), soup.find(class_="apkm-badge")),
+    ),
+    (
+        "apkmirror_search.html",
+        "app icon",
+        SoupStrainer("div", class_=has_class("bubble-wrap")),
+        lambda soup: soup.select_one("div.bubble-wrap > img"),
+    ),
+    (
+        "uptodown_detail.html",
+        "download button",
+        SoupStrainer("button", id="detail-download-button"),
+        lambda soup: soup.find("button", id="detail-download-button"),
+    ),
+]
+
+
+def _best_ms(func: Callable[[], object], number: int) -> float:
+    """Return the fastest of five timing runs, in milliseconds per call."""
+    return min(repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def run(number: int) -> None:
+    """Time every lookup with and without a strainer."""
+    for fixture, label, strainer, lookup in LOOKUPS:
+        markup = FIXTURES.joinpath(fixture).read_text()
+        full_ms = _best_ms(lambda: lookup(parse_html(markup)), number)  # noqa: B023
+        targeted_ms = _best_ms(lambda: lookup(parse_html(markup, strainer)), number)  # noqa: B023
+        logger.info(
+            f"{fixture} ({label}, {html_parser}): full {full_ms:.2f} ms, targeted {targeted_ms:.2f} ms, "
+            f"{full_ms / targeted_ms:.1f}x faster",
+        )
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--number", type=int, default=20, help="Parses per timing run.")
+    run(argument_parser.parse_args().number)
@@ -6,8 +6,7 @@ from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Any
 
-import requests
-from bs4 import BeautifulSoup
+from bs4.filter import SoupStrainer
 from google_play_scraper import app as gplay_app
 from google_play_scraper.exceptions import GooglePlayScraperException
 
@@ -24,9 +23,16 @@ from src.exceptions import (
     BuilderError,
     DownloadError,
 )
+from src.html_parsing import has_class, parse_html
 from src.patches import Patches
 from src.patches_gen import parse_text_to_json, run_command_and_capture_output
-from src.utils import apkmirror_status_check, bs4_parser, handle_request_response, request_header, request_timeout
+from src.utils import (
+    apkmirror_status_check,
+    handle_request_response,
+    request_header,
+    request_timeout,
+    session,
+)
 
 no_of_col = 4
 combo_headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/116.0"}
@@ -41,7 +47,7 @@ missing_apps_file = "missing_apps.json"
 def _download_file(url: str, destination: Path, headers: dict[str, str] | None = None) -> None:
     """Download an API-selected resource into the temporary status-check workspace."""
     # Streaming keeps the status check memory usage bounded while downloading the CLI and patch bundle.
-    with requests.get(url, headers=headers, stream=True, timeout=request_timeout) as response:
+    with session.get(url, headers=headers, stream=True, timeout=request_timeout) as response:
         handle_request_response(response, url)
         # The destination lives in a TemporaryDirectory, so direct overwrite is acceptable for this short-lived file.
         with destination.open("wb") as file:
@@ -53,7 +59,7 @@ def _download_file(url: str, destination: Path, headers: dict[str, str] | None =
 
 def _latest_revanced_cli_download_url() -> str:
     """Resolve the current ReVanced CLI JAR from GitHub release metadata."""
-    response = requests.get(
+    response = session.get(
         revanced_cli_latest_release_api,
         headers=github_release_api_headers,
         timeout=request_timeout,
@@ -72,7 +78,7 @@ def _latest_revanced_cli_download_url() -> str:
 
 def _current_revanced_patches_download_url() -> str:
     """Resolve the v5 patch bundle URL from the ReVanced API release object."""
-    response = requests.get(revanced_api, timeout=request_timeout)
+    response = session.get(revanced_api, timeout=request_timeout)
     handle_request_response(response, revanced_api)
     # OpenAPI marks `download_url` as required for `/v5/patches`, so missing data should fail loudly.
     return str(response.json()["download_url"])
@@ -169,9 +175,10 @@ def apkmirror_scrapper(package_name: str) -> str:
 
 
 def _extracted_from_apkmirror_scrapper(search_url: str) -> str:
-    r = requests.get(search_url, headers=request_header, timeout=request_timeout)
+    r = session.get(search_url, headers=request_header, timeout=request_timeout)
     handle_request_response(r, search_url)
-    soup = BeautifulSoup(r.text, bs4_parser)
+    # The icon is the only thing read from the search page, so only its wrapper is parsed.
+    soup = parse_html(r.text, SoupStrainer("div", class_=has_class("bubble-wrap")))
     icon_element = soup.select_one("div.bubble-wrap > img")
     if not icon_element:
         raise APKMirrorIconScrapError(url=search_url)
@@ -248,7 +255,7 @@ def _is_on_google_play(package_name: str) -> bool:
         # This only fetches response headers, bypassing downloading the full HTML page content.
         # It is significantly faster and consumes minimal network bandwidth.
         # We also pass request_header to present a standard User-Agent and prevent requests from being blocked.
-        response = requests.head(url, headers=request_header, timeout=request_timeout)
+        response = session.head(url, headers=request_header, timeout=request_timeout)
     except Exception:  # noqa: BLE001
         # Fallback to False if check fails (e.g. request timeouts, network failure, or rate limit)
         # to ensure the automated status pipeline never crashes.
@@ -3,8 +3,8 @@
 import concurrent
 import hashlib
 import pathlib
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from threading import Lock
 from typing import Any, Self
 from urllib.parse import urlparse
@@ -14,6 +14,7 @@ from loguru import logger
 
 from src.cli_args import merge_cli_arg_maps
 from src.config import RevancedConfig
+from src.downloader.fetch_pool import FetchPool
 from src.downloader.sources import APKEEP, apk_sources
 from src.exceptions import BuilderError, DownloadError, PatchingFailedError
 from src.utils import slugify, time_zone
@@ -22,6 +23,9 @@ from src.utils import slugify, time_zone
 class APP(object):
     """Patched APK."""
 
+    # Release assets that are patch bundles; other assets of the same release are ignored.
+    PATCH_BUNDLE_ASSET_FILTER = ".*(rvp|mpp)"
+
     def __init__(self: Self, app_name: str, package_name: str, config: RevancedConfig) -> None:
         """Initialize APP.
 
@@ -144,12 +148,15 @@ class APP(object):
                             includes package name for apkeep sources.
         """
         version = self.app_version or "latest"
+        if self.archs_to_build:
+            # ABI-specific downloads differ per arch selection, so apps building other ABIs must not share them.
+            version = f"{version}@{','.join(sorted(self.archs_to_build))}"
 
         if self.download_source == APKEEP:
             # Use package@version format for apkeep to ensure uniqueness
             return (self.download_source, f"{self.package_name}@{version}")
 
-        # For URL-based sources, source+version is already unique
+        # For URL-based sources, source+version+archs is already unique
         return (self.download_source, version)
 
     def get_cli_temporary_files_path(self: Self, config: RevancedConfig) -> str:
@@ -239,6 +246,19 @@ class APP(object):
         """
         from src.downloader.download import Downloader  # noqa: PLC0415
 
+        url = url.strip()
+        if url.startswith("local://"):
+            return "latest", url.split("/")[-1]
+        tag, url = APP.resolve_release(url, config, assets_filter)
+        if not file_name:
+            extension = pathlib.Path(url).suffix
+            file_name = APP.generate_filename(url) + extension
+        Downloader(config).direct_download(url, file_name)
+        return tag, file_name
+
+    @staticmethod
+    def resolve_release(url: str, config: RevancedConfig, assets_filter: str) -> tuple[str, str]:
+        """Return the release tag of a resource URL and the asset URL to fetch, without downloading the asset."""
         url = url.strip()
         tag = "latest"
         if url.startswith("https://github"):
@@ -252,13 +272,7 @@ class APP(object):
             from src.downloader.gitlab import Gitlab  # noqa: PLC0415
 
             tag, url = Gitlab.patch_resource(url, assets_filter, config)
-        elif url.startswith("local://"):
-            return tag, url.split("/")[-1]
-        if not file_name:
-            extension = pathlib.Path(url).suffix
-            file_name = APP.generate_filename(url) + extension
-        Downloader(config).direct_download(url, file_name)
-        return tag, file_name
+        return tag, url
 
     def _setup_download_tasks(self: Self) -> list[tuple[str, str, None, str]]:
         """Setup download tasks for CLI and patch bundles."""
@@ -269,7 +283,7 @@ class APP(object):
         # Download multiple patch bundles
         for i, patches_url in enumerate(self.patches_dl_list):
             bundle_name = f"patches_{i}" if len(self.patches_dl_list) > 1 else "patches"
-            download_tasks.append((bundle_name, patches_url, None, ".*(rvp|mpp)"))
+            download_tasks.append((bundle_name, patches_url, None, self.PATCH_BUNDLE_ASSET_FILTER))
 
         return download_tasks
 
@@ -352,25 +366,24 @@ class APP(object):
         self: Self,
         resources_to_download: list[tuple[str, str, RevancedConfig, str]],
         download_tasks: list[tuple[str, str, RevancedConfig, str]],
-        config: RevancedConfig,
         resource_cache: dict[str, tuple[str, str]],
         resource_lock: Lock,
     ) -> None:
         """Download resources in parallel and update cache thread-safely."""
-        with ThreadPoolExecutor(config.max_resource_workers) as executor:
-            futures: dict[str, concurrent.futures.Future[tuple[str, str]]] = {}
-
-            for resource_name, url, cfg, assets_filter in resources_to_download:
-                futures[resource_name] = executor.submit(self.download, url, cfg, assets_filter)
-
-            concurrent.futures.wait(futures.values())
-            self._update_resource_cache(
-                futures,
-                resources_to_download,
-                download_tasks,
-                resource_cache,
-                resource_lock,
-            )
+        # Apps share one fetch pool, so concurrent apps reuse its threads and respect its per-host limit.
+        fetch_pool = FetchPool.shared()
+        futures: dict[str, concurrent.futures.Future[tuple[str, str]]] = {
+            resource_name: fetch_pool.submit(url, partial(self.download, url, cfg, assets_filter))
+            for resource_name, url, cfg, assets_filter in resources_to_download
+        }
+        concurrent.futures.wait(futures.values())
+        self._update_resource_cache(
+            futures,
+            resources_to_download,
+            download_tasks,
+            resource_cache,
+            resource_lock,
+        )
 
     def _update_resource_cache(
         self: Self,
@@ -443,7 +456,6 @@ class APP(object):
             self._download_and_cache_resources(
                 resources_to_download,
                 download_tasks,
-                config,
                 resource_cache,
                 resource_lock,
             )
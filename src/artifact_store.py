@@ -0,0 +1,161 @@
+"""Content-addressed store that keeps one copy of every downloaded artifact across runs."""
+
+import json
+import os
+import shutil
+import stat
+from collections.abc import Iterable
+from pathlib import Path
+from threading import Lock
+from typing import Any, ClassVar, Self
+from uuid import uuid4
+
+from loguru import logger
+
+from src.config import RevancedConfig
+
+# Blobs are read-only so nothing that opens a hardlinked working file for writing can corrupt the shared copy.
+_BLOB_MODE = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+# Response headers that identify one version of a remote file; at least one must match before a blob is reused.
+VALIDATOR_HEADERS = ("etag", "last-modified")
+
+
+def response_validators(headers: Any) -> dict[str, str]:
+    """Return the cache validators a server sent for an artifact, keyed by lowercase header name."""
+    return {name: headers[name] for name in VALIDATOR_HEADERS if headers.get(name)}
+
+
+class ArtifactStore(object):
+    """SHA-256 addressed blobs plus a URL index, so identical bytes are downloaded and stored once."""
+
+    _shared: ClassVar["ArtifactStore | None"] = None
+    # Parallel download workers share the index file, so reads and rewrites are serialized in-process.
+    _lock: ClassVar[Lock] = Lock()
+
+    def __init__(self: Self, root: Path) -> None:
+        self.root = root
+        self.index_path = root.joinpath("index.json")
+        self._index: dict[str, dict[str, Any]] | None = None
+
+    @classmethod
+    def configure(cls: type["ArtifactStore"], config: RevancedConfig) -> None:
+        """Enable the run-wide store unless the operator opted out or disabled caching altogether."""
+        if config.artifact_store and not config.disable_caching:
+            cls._shared = cls(config.temp_folder.joinpath(config.artifact_store_folder_name))
+        else:
+            cls._shared = None
+
+    @classmethod
+    def shared(cls: type["ArtifactStore"]) -> "ArtifactStore | None":
+        """Return the run-wide store, or None when downloads should be written straight to their working names."""
+        return cls._shared
+
+    def blob_path(self: Self, digest: str) -> Path:
+        """Return where the blob with a given SHA-256 lives."""
+        # A two-character fan-out keeps directory listings small once many versions have accumulated.
+        return self.root.joinpath("blobs", digest[:2], digest)
+
+    def _load_index(self: Self) -> dict[str, dict[str, Any]]:
+        """Read the URL index once per run; an unreadable index only costs re-downloads."""
+        if self._index is None:
+            try:
+                self._index = json.loads(self.index_path.read_text())
+            except FileNotFoundError:
+                self._index = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable artifact index {self.index_path}: {e}")
+                self._index = {}
+        return self._index
+
+    def _write_index(self: Self, index: dict[str, dict[str, Any]]) -> None:
+        """Publish the URL index atomically so an interrupted run never leaves it truncated."""
+        partial_path = self.index_path.with_name(f".{self.index_path.name}.{uuid4().hex}.part")
+        try:
+            partial_path.write_text(json.dumps(index, indent=2, sort_keys=True))
+            partial_path.replace(self.index_path)
+        except OSError as e:
+            # The blobs are still valid; only cross-run reuse of this download is lost.
+            partial_path.unlink(missing_ok=True)
+            logger.warning(f"Unable to write artifact index {self.index_path}: {e}")
+
+    def stored_blob(self: Self, url: str) -> Path | None:
+        """Return the blob last downloaded from a URL, or None when it was never stored or has been removed."""
+        with self._lock:
+            entry = self._load_index().get(url)
+        if entry is None:
+            return None
+        blob = self.blob_path(entry["digest"])
+        return blob if blob.exists() else None
+
+    def conditional_headers(self: Self, url: str) -> dict[str, str]:
+        """Return revalidation headers for a URL whose stored copy is still available."""
+        with self._lock:
+            entry = self._load_index().get(url)
+        if entry is None or not self.blob_path(entry["digest"]).exists():
+            return {}
+        validators: dict[str, str] = entry.get("validators", {})
+        headers: dict[str, str] = {}
+        if etag := validators.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := validators.get("last-modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def lookup(self: Self, urls: Iterable[str], validators: dict[str, str], expected_size: int) -> Path | None:
+        """Return the stored blob for any of the URLs when the server still reports the same version."""
+        if not validators:
+            # Without an ETag or Last-Modified there is no way to tell that the remote bytes are unchanged.
+            return None
+        with self._lock:
+            index = self._load_index()
+            for url in urls:
+                entry = index.get(url)
+                if entry is None:
+                    continue
+                stored_validators: dict[str, str] = entry.get("validators", {})
+                shared_names = stored_validators.keys() & validators.keys()
+                if not shared_names or any(stored_validators[name] != validators[name] for name in shared_names):
+                    continue
+                blob = self.blob_path(entry["digest"])
+                size = blob.stat().st_size if blob.exists() else None
+                if size is not None and (not expected_size or size == expected_size):
+                    return blob
+        return None
+
+    def publish(self: Self, partial_path: Path, digest: str, urls: Iterable[str], validators: dict[str, str]) -> Path:
+        """Move a completed download into the store, deduplicating it against existing blobs, and index its URLs."""
+        blob = self.blob_path(digest)
+        with self._lock:
+            if blob.exists():
+                # Same bytes under a different URL or name: the earlier copy is kept and this one is dropped.
+                partial_path.unlink(missing_ok=True)
+            else:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                partial_path.chmod(_BLOB_MODE)
+                partial_path.replace(blob)
+            index = self._load_index()
+            replaced_digests: set[str] = set()
+            for url in urls:
+                previous = index.get(url)
+                if previous is not None and previous["digest"] != digest:
+                    replaced_digests.add(previous["digest"])
+                index[url] = {"digest": digest, "size": blob.stat().st_size, "validators": validators}
+            referenced_digests = {entry["digest"] for entry in index.values()}
+            for stale_digest in replaced_digests - referenced_digests:
+                # Working copies are hardlinks, so dropping a superseded blob never removes a file still in use.
+                logger.debug(f"Removing superseded artifact blob {stale_digest}")
+                self.blob_path(stale_digest).unlink(missing_ok=True)
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._write_index(index)
+        return blob
+
+    @staticmethod
+    def link(blob: Path, target: Path) -> None:
+        """Expose a blob under its working name, copying only when the filesystem cannot hardlink."""
+        partial_path = target.with_name(f".{target.name}.{uuid4().hex}.part")
+        try:
+            os.link(blob, partial_path)
+        except OSError:
+            shutil.copyfile(blob, partial_path)
+        # Replacing atomically means a concurrent reader sees either the old file or the complete new one.
+        partial_path.replace(target)
@@ -0,0 +1,126 @@
+"""Read patch metadata embedded in .rvp/.mpp bundles without launching the CLI."""
+
+import json
+import zipfile
+from pathlib import Path
+from typing import Any, ClassVar
+
+from loguru import logger
+
+from src.config import RevancedConfig
+
+# Bundles that ship machine-readable metadata store it under one of these archive entries.
+METADATA_ENTRY_NAMES = ("patches-list.json", "patches.json", "META-INF/patches.json")
+
+
+def _option_default(value: Any) -> str:
+    """Render an option default the way the CLI prints it, so both metadata paths produce identical dicts."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        # Kotlin prints booleans in lowercase.
+        return str(value).lower()
+    if isinstance(value, list):
+        return f"[{', '.join(_option_default(item) for item in value)}]"
+    return str(value)
+
+
+def _normalise_option(option: dict[str, Any]) -> dict[str, Any]:
+    """Convert one embedded option into the parser's option schema."""
+    title = option.get("title") or option.get("name") or ""
+    raw_values = option.get("values") or option.get("possible_values") or []
+    # ReVanced publishes `values` as a label -> value map; other producers use a plain list.
+    possible_values = raw_values.values() if isinstance(raw_values, dict) else raw_values
+    return {
+        "title": title,
+        "description": option.get("description") or "",
+        "required": bool(option.get("required", False)),
+        # The CLI parser falls back to the title when a dialect omits keys; embedded metadata follows suit.
+        "key": option.get("key") or title,
+        "default": _option_default(option.get("default")),
+        "possible_values": [_option_default(value) for value in possible_values],
+        "type": option.get("type") or "",
+    }
+
+
+def _normalise_compatible_packages(raw_packages: Any) -> list[dict[str, Any]] | None:
+    """Convert both the map and the list form of compatible packages into the parser's list schema."""
+    if not raw_packages:
+        return None
+    if isinstance(raw_packages, dict):
+        return [{"name": name, "versions": list(versions or []) or None} for name, versions in raw_packages.items()]
+    return [{"name": package["name"], "versions": package.get("versions") or None} for package in raw_packages]
+
+
+def _normalise_patch(patch: dict[str, Any]) -> dict[str, Any]:
+    """Convert one embedded patch into the dict shape parse_single_section produces."""
+    return {
+        "name": patch.get("name"),
+        "description": patch.get("description") or "",
+        "compatiblePackages": _normalise_compatible_packages(patch.get("compatiblePackages")),
+        "use": bool(patch.get("use", False)),
+        "options": [_normalise_option(option) for option in patch.get("options") or []],
+    }
+
+
+def _apply_list_patches_args(patches: list[dict[str, Any]], list_patches_args: dict[str, str]) -> list[dict[str, Any]]:
+    """Drop the fields and patches the CLI would omit for these list-patches flags."""
+    show_packages = bool(list_patches_args.get("PACKAGES", "").strip())
+    show_versions = bool(list_patches_args.get("VERSIONS", "").strip())
+    show_options = bool(list_patches_args.get("OPTIONS", "").strip())
+    show_universal = bool(list_patches_args.get("UNIVERSAL", "").strip())
+    filtered = []
+    for patch in patches:
+        # Without the universal flag the CLI hides patches that are not bound to any package.
+        if not show_universal and patch["compatiblePackages"] is None:
+            continue
+        packages = patch["compatiblePackages"]
+        if packages is not None and not show_versions:
+            packages = [{**package, "versions": None} for package in packages]
+        filtered.append(
+            {
+                **patch,
+                "compatiblePackages": packages if show_packages else None,
+                "options": patch["options"] if show_options else [],
+            },
+        )
+    return filtered
+
+
+class BundleMetadataReader(object):
+    """Opt-in reader that turns embedded bundle metadata into parsed list-patches output."""
+
+    enabled: ClassVar[bool] = False
+
+    @classmethod
+    def configure(cls: type["BundleMetadataReader"], config: RevancedConfig) -> None:
+        """Enable the native reader for this run when the operator opted in."""
+        cls.enabled = config.patches_native_metadata
+
+    @classmethod
+    def read(
+        cls: type["BundleMetadataReader"],
+        patches_file: Path,
+        list_patches_args: dict[str, str],
+    ) -> list[dict[str, Any]] | None:
+        """Return patch metadata from the bundle as these list-patches flags would print it, or None for the CLI."""
+        if not cls.enabled:
+            return None
+        if list_patches_args.get("FILTER_PACKAGE_NAME", "").strip():
+            # The package filter's value syntax differs per CLI family, so only the CLI can apply it faithfully.
+            return None
+        try:
+            with zipfile.ZipFile(patches_file) as bundle:
+                entry_names = set(bundle.namelist())
+                entry_name = next((name for name in METADATA_ENTRY_NAMES if name in entry_names), None)
+                if entry_name is None:
+                    # Bundles that only carry compiled patches need the CLI to instantiate them.
+                    return None
+                raw_patches = json.loads(bundle.read(entry_name))
+            patches = [_normalise_patch(patch) for patch in raw_patches]
+        except (OSError, zipfile.BadZipFile, ValueError, TypeError, KeyError, AttributeError) as e:
+            # Unknown metadata layouts are not errors; the CLI still produces the authoritative list.
+            logger.debug(f"Falling back to list-patches for {patches_file.name}: {e}")
+            return None
+        # Descriptions and indices are printed by default in every CLI family, so only opt-in fields are dropped.
+        return _apply_list_patches_args(patches, list_patches_args)
@@ -40,9 +40,20 @@ class RevancedConfig(object):
         self.global_cli_pargs = env.str("GLOBAL_CLI_PARGS", "")
         # CLI temp paths stay under the mounted artifact folder so parallel patchers keep isolated work directories.
         self.cli_temp_folder_name = env.str("CLI_TEMP_FOLDER_NAME", "patch-source-temporary-files")
-        self.max_resource_workers = env.int("MAX_RESOURCE_WORKERS", 3)
-        self.max_parallel_apps = env.int("MAX_PARALLEL_APPS", 4)
+        self._read_concurrency_settings(env)
         self.disable_caching = env.bool("DISABLE_CACHING", False)
+        # Downloads are kept once per SHA-256 under the temp folder and hardlinked to their working names.
+        self.artifact_store = env.bool("ARTIFACT_STORE", True)
+        self.artifact_store_folder_name = ".cas"
+        # GitHub/GitLab release JSON is reused within its TTL and revalidated with ETags after that.
+        self.release_metadata_cache = env.bool("RELEASE_METADATA_CACHE", True)
+        self.release_metadata_ttl_seconds = env.int("RELEASE_METADATA_TTL_SECONDS", 0)
+        self.release_metadata_cache_file_name = "release-metadata-cache.json"
+        # Parsed list-patches output is reused across runs; this bounds how many CLI/bundle combinations are kept.
+        self.patches_metadata_cache_size = env.int("PATCHES_METADATA_CACHE_SIZE", 32)
+        self.patches_metadata_cache_folder_name = "list-patches-cache"
+        # Bundles that embed machine-readable metadata can be listed without starting the CLI's JVM.
+        self.patches_native_metadata = env.bool("PATCHES_NATIVE_METADATA", False)
         self.obtainium_export = env.bool("OBTAINIUM_EXPORT", False)
         self.obtainium_github_tag = env.str("OBTAINIUM_GITHUB_TAG", "latest")
         self.obtainium_site_export = env.bool("OBTAINIUM_SITE_EXPORT", False)
@@ -53,3 +64,26 @@ class RevancedConfig(object):
             r"Version([\w.]+)-PatchVersion[v]?([\w.]+)-PatchSet",
         )
         self.obtainium_version_match_group = env.str("OBTAINIUM_VERSION_MATCH_GROUP", "$1+$2")
+
+    def _read_concurrency_settings(self: Self, env: Env) -> None:
+        """Read the worker, connection and JVM limits that bound how much of the runner a build uses at once."""
+        self.max_resource_workers = env.int("MAX_RESOURCE_WORKERS", 3)
+        self.max_parallel_apps = env.int("MAX_PARALLEL_APPS", 4)
+        # Parallel runs pipeline each app; this bounds the resource and APK download stages independently of the JVMs.
+        self.max_download_workers = env.int("MAX_DOWNLOAD_WORKERS", 4)
+        # Large range-capable artifacts can be split across this many connections; 1 keeps a single stream.
+        self.download_segments = env.int("DOWNLOAD_SEGMENTS", 1)
+        self.download_min_segment_mb = env.int("DOWNLOAD_MIN_SEGMENT_MB", 16)
+        self.max_connections_per_host = env.int("MAX_CONNECTIONS_PER_HOST", 6)
+        # APKMirror variant pages tried per release; 1 keeps the single preferred variant and its one fetch.
+        self.apkmirror_variant_probes = env.int("APKMIRROR_VARIANT_PROBES", 1)
+        # Patch JVMs wait for free memory/CPU and get an explicit -Xmx sized from earlier runs of the same app.
+        self.jvm_admission_control = env.bool("JVM_ADMISSION_CONTROL", True)
+        self.jvm_default_heap_mb = env.int("JVM_DEFAULT_HEAP_MB", 2048)
+        self.jvm_memory_reserve_mb = env.int("JVM_MEMORY_RESERVE_MB", 512)
+        self.jvm_heap_estimates_file_name = "jvm-heap-estimates.json"
+        # Opt-in warm JVM hosts run list-patches, patch and merge commands without paying JVM startup each time.
+        self.jvm_daemon = env.bool("JVM_DAEMON", False)
+        self.jvm_daemon_pool_size = env.int("JVM_DAEMON_POOL_SIZE", 2)
+        # Each CLI/APKEditor jar gets an AppCDS archive in the temp folder, cutting JVM startup on later launches.
+        self.jvm_class_data_sharing = env.bool("JVM_CLASS_DATA_SHARING", True)
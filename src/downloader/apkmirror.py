@@ -1,22 +1,31 @@
 """Downloader Class."""
 
-from typing import Any, Self, cast
+import re
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, ClassVar, Self, cast
 from uuid import uuid4
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 from loguru import logger
 
 from src.app import APP
+from src.downloader.apkmirror_index import ApkMirrorIndex
+from src.downloader.cloak_pool import CloakBrowserPool
 from src.downloader.download import Downloader
+from src.downloader.page_cache import CachedPage, PageCache
 from src.downloader.sources import APK_MIRROR_BASE_URL
-from src.exceptions import APKMirrorAPKDownloadError, ScrapingError
+from src.downloader.throttle import HostThrottle
+from src.exceptions import APKMirrorAPKDownloadError, DownloadError, ScrapingError
 from src.utils import (
     apkmirror_scraper,
-    bs4_parser,
     contains_any_word,
     handle_request_response,
+    possible_archs,
     request_timeout,
     slugify,
+    status_code_403,
+    status_code_429,
 )
 
 # CloakBrowser runs inside the Docker container as root, so Chromium needs container-safe launch flags.
@@ -37,11 +46,34 @@ CLOAK_CHALLENGE_MARKERS = (
     "just a moment",
     "turnstile",
 )
+# Page fetches from every worker share one throttle that keeps parallel builds under Cloudflare's challenge rate.
+APKMIRROR_REQUESTS_PER_SECOND = 2.0
+APKMIRROR_REQUEST_BURST = 4
+APKMIRROR_MAX_CONCURRENT_REQUESTS = 4
+# A pushed-back fetch is retried after the throttle has slowed down before paying for a CloakBrowser launch.
+APKMIRROR_FETCH_ATTEMPTS = 2
+# The next variant is only probed once the current one has failed or is still loading after this long.
+APKMIRROR_VARIANT_HEDGE_SECONDS = 5.0
+# Without ARCHS_TO_BUILD, single APKs are only taken when they cover the common arm64 target or every ABI.
+DEFAULT_APK_ARCHS = ["arm64-v8a", "universal", "noarch"]
+# Variant rows labelled with these carry native libraries for every ABI, or none at all.
+ALL_ABI_LABELS = frozenset({"universal", "noarch"})
+# Every APKMirror payload (APK, APKM bundle or XAPK) is a zip archive, unlike the HTML page of an expired link.
+ZIP_MAGIC = b"PK\x03\x04"
+# Release pages and resolved download links survive between runs so pinned versions skip most page fetches.
+APKMIRROR_INDEX_FILE_NAME = "apkmirror-index.json"
+# Every class the scrapers read from an APKMirror page; pages are parsed once, keeping only these elements.
+APKMIRROR_PAGE_CLASSES = frozenset(
+    {"listWidget p-relative", "tab-pane noPadding", "tab-pane", "apkm-badge", "center", "appspec-value"},
+)
 
 
 class ApkMirror(Downloader):
     """Files downloader."""
 
+    # Release, variant and download pages are revisited by several steps and workers; each is fetched once per run.
+    _pages: ClassVar[PageCache] = PageCache(APKMIRROR_PAGE_CLASSES)
+
     @staticmethod
     def _is_cloudflare_challenge(source: str) -> bool:
         """Detect Cloudflare challenge HTML that can be returned with HTTP 200."""
@@ -64,9 +96,8 @@ class ApkMirror(Downloader):
     def _extract_source_with_cloak(url: str, cause: Exception | None = None) -> str:
         """Fetch APKMirror HTML through CloakBrowser when cloudscraper receives a challenge page."""
         launch_browser, playwright_timeout_error = ApkMirror._cloak_dependencies(url, cause)
-        browser = launch_browser(args=CLOAK_BROWSER_ARGS)
-        try:
-            page = browser.new_page()
+
+        def load_source(page: Any) -> str:
             # CloakBrowser owns the browser fingerprint, so partial header overrides would desync client hints.
             page.goto(url, wait_until="domcontentloaded", timeout=CLOAK_REQUEST_TIMEOUT_MS)
             try:
@@ -74,9 +105,10 @@ class ApkMirror(Downloader):
                 page.wait_for_load_state("networkidle", timeout=CLOAK_NETWORK_IDLE_TIMEOUT_MS)
             except playwright_timeout_error:
                 logger.debug(f"Timed out waiting for APKMirror network idle after CloakBrowser loaded {url}.")
-            source = cast("str", page.content())
-        finally:
-            browser.close()
+            return cast("str", page.content())
+
+        # Every fallback in the run shares one browser, so Chromium starts at most once.
+        source = CloakBrowserPool.shared(lambda: launch_browser(args=CLOAK_BROWSER_ARGS)).run(load_source)
 
         if ApkMirror._is_cloudflare_challenge(source):
             msg = "APKMirror still returned a Cloudflare challenge after CloakBrowser loaded the page."
@@ -99,9 +131,8 @@ class ApkMirror(Downloader):
         target_path = self.config.temp_folder.joinpath(file_name)
         # Save into a unique partial path so failed browser downloads never poison the cache target.
         partial_path = target_path.with_name(f".{target_path.name}.{uuid4().hex}.part")
-        browser = launch_browser(args=CLOAK_BROWSER_ARGS)
-        try:
-            page = browser.new_page()
+
+        def save_download(page: Any) -> None:
             # The download endpoint validates navigation context; keep CloakBrowser's own UA and add only the referer.
             page.set_extra_http_headers({"Referer": referer})
             page.goto(referer, wait_until="domcontentloaded", timeout=CLOAK_REQUEST_TIMEOUT_MS)
@@ -124,13 +155,14 @@ class ApkMirror(Downloader):
                     url,
                 )
             download_info.value.save_as(str(partial_path))
+
+        try:
+            CloakBrowserPool.shared(lambda: launch_browser(args=CLOAK_BROWSER_ARGS)).run(save_download)
             partial_path.replace(target_path)
         except Exception as exc:
             partial_path.unlink(missing_ok=True)
             msg = f"Unable to download {file_name} from APKMirror with CloakBrowser."
             raise APKMirrorAPKDownloadError(msg, url=url) from exc
-        finally:
-            browser.close()
 
     @staticmethod
     def _select_download_extension(apk_type: str, *, preserve_bundle: bool) -> str:
@@ -158,38 +190,40 @@ class ApkMirror(Downloader):
         pass the download page URL as a Referer header — exactly what the
         twitter-apk reference implementation does — to satisfy Cloudflare checks.
         """
-        link_page_source = self._extract_source(link)
-        notes_divs = self._extracted_search_source_div(link_page_source, "tab-pane")
-        apk_type = self._extracted_search_source_div(link_page_source, "apkm-badge").get_text()
+        notes_divs = self._extracted_search_div(link, "tab-pane")
+        apk_type = self._extracted_search_div(link, "apkm-badge").get_text()
         extension = self._select_download_extension(apk_type, preserve_bundle=preserve_bundle)
         possible_links = notes_divs.find_all("a")
         for possible_link in possible_links:
             if possible_link.get("href") and "download.php?id=" in possible_link.get("href"):
                 file_name = f"{app}.{extension}"
                 download_url = APK_MIRROR_BASE_URL + possible_link["href"]
-                try:
-                    # cloudscraper remains the fast path when APKMirror only serves a JavaScript challenge.
-                    self._download(
-                        download_url,
-                        file_name,
-                        http_session=apkmirror_scraper,
-                        extra_headers={"Referer": link},
-                    )
-                except ScrapingError as exc:
-                    # CAPTCHA/Turnstile challenges require a browser context rather than a raw HTTP retry.
-                    self._download_file_with_cloak(download_url, file_name, link, exc)
+                self._download_variant(download_url, file_name, link)
                 return file_name, download_url
         msg = f"Unable to extract force download for {app}"
         raise APKMirrorAPKDownloadError(msg, url=link)
 
-    def _extract_download_link(self: Self, page: str, app: str, *, preserve_bundle: bool) -> tuple[str, str]:
-        """Extract the APKMirror download link while honoring the selected input-shape policy.
+    def _download_variant(self: Self, download_url: str, file_name: str, referer: str) -> None:
+        """Download a download.php link with the force-download page as referer."""
+        try:
+            # cloudscraper remains the fast path when APKMirror only serves a JavaScript challenge.
+            self._download(
+                download_url,
+                file_name,
+                http_session=apkmirror_scraper,
+                extra_headers={"Referer": referer},
+            )
+        except ScrapingError as exc:
+            # CAPTCHA/Turnstile challenges require a browser context rather than a raw HTTP retry.
+            self._download_file_with_cloak(download_url, file_name, referer, exc)
 
-        :param page: Url of the page
-        :param app: Name of the app
-        """
-        logger.debug(f"Extracting download link from\n{page}")
+    def _force_download_page(self: Self, page: str, app: str) -> str:
+        """Return the force-download page linked from a variant page's download button."""
         download_button = self._extracted_search_div(page, "center")
+        if download_button is None:
+            # Challenge and error pages carry no download button; report them as unusable instead of crashing.
+            msg = f"Unable to find the download button for {app}"
+            raise APKMirrorAPKDownloadError(msg, url=page)
         download_links = download_button.find_all("a")
         if final_download_link := next(
             (
@@ -199,14 +233,23 @@ class ApkMirror(Downloader):
             ),
             None,
         ):
-            return self._extract_force_download_link(
-                APK_MIRROR_BASE_URL + final_download_link,
-                app,
-                preserve_bundle=preserve_bundle,
-            )
+            return APK_MIRROR_BASE_URL + final_download_link
         msg = f"Unable to extract link from {app} version list"
         raise APKMirrorAPKDownloadError(msg, url=page)
 
+    def _extract_download_link(self: Self, page: str, app: str, *, preserve_bundle: bool) -> tuple[str, str]:
+        """Extract the APKMirror download link while honoring the selected input-shape policy.
+
+        :param page: Url of the page
+        :param app: Name of the app
+        """
+        logger.debug(f"Extracting download link from\n{page}")
+        return self._extract_force_download_link(
+            self._force_download_page(page, app),
+            app,
+            preserve_bundle=preserve_bundle,
+        )
+
     def extract_download_link(self: Self, page: str, app: str) -> tuple[str, str]:
         """Function to extract the download link from apkmirror html page.
 
@@ -218,36 +261,103 @@ class ApkMirror(Downloader):
 
     def extract_download_link_for_app(self: Self, page: str, app: APP) -> tuple[str, str]:
         """Extract the APKMirror download link using the app's patcher profile."""
+        return self._extract_download_link(page, app.app_name, preserve_bundle=self._preserves_bundle(app))
+
+    @staticmethod
+    def _preserves_bundle(app: APP) -> bool:
+        """Return whether the app's patcher takes APKMirror bundles as they are."""
         # Morphe's APKM support is profile-specific, so only Morphe apps preserve APKMirror bundles as `.apkm`.
-        preserve_bundle = app.effective_cli_argsf == "morphe-cli"
-        return self._extract_download_link(page, app.app_name, preserve_bundle=preserve_bundle)
+        return app.effective_cli_argsf == "morphe-cli"
 
-    def get_download_page(self: Self, main_page: str) -> str:
-        """Function to get the download page in apk_mirror.
+    @staticmethod
+    def _variant_rank(apk_type: str, text: str, archs: Sequence[str]) -> tuple[int, int] | None:
+        """Rank a variant row for the wanted ABIs, lower first; None when the variant cannot be used.
 
-        :param main_page: Main Download Page in APK mirror(Index)
-        :return:
+        Single APKs rank before bundles, and among APKs the fewest ABIs win: a single-ABI APK ships one set of
+        native libraries, so it is the smallest download and patch input. Bundles are split by ABI before merging.
         """
+        if apk_type not in {"APK", "BUNDLE"}:
+            return None
+        if not archs:
+            if apk_type == "APK" and not contains_any_word(text, DEFAULT_APK_ARCHS):
+                return None
+            return (0, 0) if apk_type == "APK" else (1, 0)
+        row_archs = set(re.findall(r"[\w-]+", text)) & (set(possible_archs) | ALL_ABI_LABELS)
+        covers_all = bool(row_archs & ALL_ABI_LABELS)
+        covers_wanted = covers_all or set(archs) <= row_archs
+        if apk_type == "APK":
+            if not covers_wanted:
+                return None
+            return (0, len(possible_archs) + 1 if covers_all else len(row_archs))
+        # Bundles labelled with other ABIs are still a last resort, as they were before ABI-aware selection.
+        return (1, 0) if covers_wanted else (2, 0)
+
+    def _variant_candidates(self: Self, main_page: str, archs: Sequence[str] = ()) -> list[str]:
+        """Return a release page's usable variant pages, best first for the wanted ABIs."""
         list_widget = self._extracted_search_div(main_page, "tab-pane noPadding")
         if list_widget is None:
             # APKMirror can return a normal 404 page for a guessed release URL, so fail before parsing variant rows.
             msg = "Unable to find APKMirror variants table on release page"
             raise APKMirrorAPKDownloadError(msg, url=main_page)
-        table_rows = list_widget.find_all(class_="table-row headerFont")
-        links: dict[str, str] = {}
-        apk_archs = ["arm64-v8a", "universal", "noarch"]
-        for row in table_rows:
+        ranked: list[tuple[tuple[int, int], str]] = []
+        # The last row of a rank has always been the preferred one, so rows are read bottom-up for a stable sort.
+        for row in reversed(list_widget.find_all(class_="table-row headerFont")):
             if row.find(class_="accent_color"):
                 apk_type = row.find(class_="apkm-badge").get_text()
-                sub_url = row.find(class_="accent_color")["href"]
-                text = row.text.strip()
-                if apk_type == "APK" and (not contains_any_word(text, apk_archs)):
+                rank = self._variant_rank(apk_type, row.get_text(" ", strip=True), archs)
+                if rank is not None:
+                    ranked.append((rank, f"{APK_MIRROR_BASE_URL}{row.find(class_='accent_color')['href']}"))
+        return [url for _, url in sorted(ranked, key=lambda ranked_url: ranked_url[0])]
+
+    def get_download_page(self: Self, main_page: str, archs: Sequence[str] = (), app_name: str = "app") -> str:
+        """Function to get the download page in apk_mirror.
+
+        :param main_page: Main Download Page in APK mirror(Index)
+        :param archs: ABIs to build; empty keeps the default arm64/universal preference
+        :param app_name: Name of the app, for error messages
+        :return:
+        """
+        candidates = self._variant_candidates(main_page, archs)
+        if not candidates:
+            msg = "Unable to extract download page"
+            raise APKMirrorAPKDownloadError(msg, url=main_page)
+        # APKMIRROR_VARIANT_PROBES > 1 lets a failed or challenged variant page fall back to the next-best variants.
+        candidates = candidates[: max(self.config.apkmirror_variant_probes, 1)]
+        if len(candidates) == 1:
+            # Without an alternative there is nothing to probe; the download step reports a broken page itself.
+            return candidates[0]
+        return self._first_usable_variant(candidates, main_page, app_name)
+
+    def _first_usable_variant(self: Self, candidates: list[str], main_page: str, app_name: str) -> str:
+        """Return the most preferred variant page that links to a download key, hedging slow or failed probes.
+
+        The next variant is only fetched once the current one has failed or is still loading after a delay, so a
+        healthy preferred page costs a single fetch. Probed pages land in the run-wide cache, so the winner is not
+        fetched again for the download.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="apkmirror-variant")
+        probes: list[Future[str]] = []
+        failures: list[Exception] = []
+        try:
+            # Preference order, not completion order, picks the winner so the downloaded file type stays stable.
+            for index, candidate in enumerate(candidates):
+                if index == len(probes):
+                    probes.append(executor.submit(self._force_download_page, candidate, app_name))
+                while not probes[index].done() and len(probes) < len(candidates):
+                    if not wait([probes[index]], timeout=APKMIRROR_VARIANT_HEDGE_SECONDS).done:
+                        probes.append(executor.submit(self._force_download_page, candidates[len(probes)], app_name))
+                try:
+                    probes[index].result()
+                except (APKMirrorAPKDownloadError, ScrapingError) as exc:
+                    logger.warning(f"APKMirror variant {candidate} is unusable ({exc}); trying the next variant.")
+                    failures.append(exc)
                     continue
-                links[apk_type] = f"{APK_MIRROR_BASE_URL}{sub_url}"
-        if preferred_link := links.get("APK", links.get("BUNDLE")):
-            return preferred_link
-        msg = "Unable to extract download page"
-        raise APKMirrorAPKDownloadError(msg, url=main_page)
+                return candidate
+        finally:
+            # Hedged probes of less preferred variants are no longer needed once one has won.
+            executor.shutdown(wait=False, cancel_futures=True)
+        msg = f"Unable to find a downloadable APKMirror variant for {app_name}"
+        raise APKMirrorAPKDownloadError(msg, url=main_page) from failures[0]
 
     @staticmethod
     def _version_matches_title(version: str, title: str) -> bool:
@@ -276,7 +386,44 @@ class ApkMirror(Downloader):
         version_slug = version.replace(".", "-")
         return f"{trimmed}/{app_slug}-{version_slug}-release/"
 
+    def _index(self: Self) -> ApkMirrorIndex | None:
+        """Return the persistent release index, unless caching is disabled for this run."""
+        if self.config.disable_caching:
+            return None
+        return ApkMirrorIndex.for_file(self.config.temp_folder.joinpath(APKMIRROR_INDEX_FILE_NAME))
+
+    def _listing_rows(self: Self, app: APP) -> list[tuple[str, str]]:
+        """Return the (title, release page) rows of the app's version listing and add them to the index."""
+        versions_div = self._extracted_search_div(app.download_source, "listWidget p-relative")
+        if versions_div is None:
+            # A missing listing container means the source page is not the expected APKMirror app listing.
+            msg = f"Unable to find APKMirror version list for {app.app_name}"
+            raise APKMirrorAPKDownloadError(msg, url=app.download_source)
+        rows: list[tuple[str, str]] = []
+        for app_row in versions_div.find_all(class_="appRow"):
+            # APKMirror release slugs can differ from the app source slug, so links must come from the listing row.
+            title = app_row.find(class_="appRowTitle")
+            download_link = app_row.find(class_="downloadLink")
+            if not title or not download_link or not download_link.get("href"):
+                continue
+            rows.append((title.get_text(" ", strip=True), f"{APK_MIRROR_BASE_URL}{download_link['href']}"))
+        if index := self._index():
+            # Listings only show recent releases; the index keeps the ones older runs saw before they scrolled off.
+            index.record_listing(app.download_source, rows)
+        return rows
+
     def _find_specific_version_page(self: Self, app: APP, version: str) -> str:
+        """Resolve a specific APKMirror release URL, reusing the release page an earlier run found for it."""
+        index = self._index()
+        if index and (known_page := index.version_page(app.download_source, version)):
+            logger.debug(f"Indexed release page for {app.app_name} {version}: {known_page}")
+            return known_page
+        release_page = self._resolve_release_page(app, version, index)
+        if index:
+            index.record_version(app.download_source, version, release_page)
+        return release_page
+
+    def _resolve_release_page(self: Self, app: APP, version: str, index: ApkMirrorIndex | None) -> str:
         """Resolve a specific APKMirror release URL, trying a direct URL guess before listing scrape.
 
         The listing page only shows the most recent versions. Popular apps like YouTube push older
@@ -285,9 +432,9 @@ class ApkMirror(Downloader):
         # Fast path: construct the release URL directly and verify that the release page exists.
         guessed_url = self._guess_release_url(app.download_source, version)
         try:
-            page_source = self._extract_source(guessed_url)
             # A valid release page contains the variants table; a 404/soft-error page does not.
-            if self._extracted_search_source_div(page_source, "tab-pane noPadding") is not None:
+            # The page stays cached, so get_download_page reads the same table without another request.
+            if self._extracted_search_div(guessed_url, "tab-pane noPadding") is not None:
                 logger.debug(f"Direct URL resolved for {app.app_name} {version}: {guessed_url}")
                 return guessed_url
             logger.debug(f"Guessed URL {guessed_url} loaded but has no variants table; falling back to listing.")
@@ -295,21 +442,14 @@ class ApkMirror(Downloader):
             # The guessed URL returned a non-200 or challenge page; fall through to listing-based lookup.
             logger.debug(f"Guessed URL {guessed_url} failed; falling back to listing scrape.")
 
-        # Slow path: scrape the first page of the version listing and match by title text.
-        versions_div = self._extracted_search_div(app.download_source, "listWidget p-relative")
-        if versions_div is None:
-            # A missing listing container means the source page is not the expected APKMirror app listing.
-            msg = f"Unable to find APKMirror version list for {app.app_name}"
-            raise APKMirrorAPKDownloadError(msg, url=app.download_source)
+        # Releases seen by earlier listing scrapes are matched the same way before the listing is fetched again.
+        if index and (listed_page := index.listed_page(app.download_source, version, self._version_matches_title)):
+            return listed_page
 
-        for app_row in versions_div.find_all(class_="appRow"):
-            # APKMirror release slugs can differ from the app source slug, so links must come from the listing row.
-            title = app_row.find(class_="appRowTitle")
-            download_link = app_row.find(class_="downloadLink")
-            if not title or not download_link or not download_link.get("href"):
-                continue
-            if self._version_matches_title(version, title.get_text(" ", strip=True)):
-                return f"{APK_MIRROR_BASE_URL}{download_link['href']}"
+        # Slow path: scrape the first page of the version listing and match by title text.
+        for title, release_page in self._listing_rows(app):
+            if self._version_matches_title(version, title):
+                return release_page
 
         msg = f"Unable to find {app.app_name} version {version} on APKMirror"
         raise APKMirrorAPKDownloadError(msg, url=app.download_source)
@@ -322,7 +462,7 @@ class ApkMirror(Downloader):
         by Cloudflare. CloakBrowser is a heavier fallback for CAPTCHA/Turnstile
         pages that cloudscraper can no longer solve.
         """
-        response = apkmirror_scraper.get(url, timeout=request_timeout)
+        response = ApkMirror._throttled_get(url)
         try:
             # Non-200 challenge responses need the same browser fallback as HTTP 200 challenge pages.
             handle_request_response(response, url)
@@ -337,14 +477,38 @@ class ApkMirror(Downloader):
         return source
 
     @staticmethod
-    def _extracted_search_source_div(source: str, search_class: str) -> Tag:
-        """Extract search div from source."""
-        soup = BeautifulSoup(source, bs4_parser)
-        return soup.find(class_=search_class)  # type: ignore[return-value]
+    def _is_pushback(response: Any) -> bool:
+        """Return whether APKMirror asked the client to slow down."""
+        if response.status_code in {status_code_403, status_code_429}:
+            return True
+        return ApkMirror._is_cloudflare_challenge(cast("str", response.text))
+
+    @staticmethod
+    def _throttled_get(url: str) -> Any:
+        """Fetch an APKMirror page within the host's rate and concurrency limits, retrying once it has backed off."""
+        throttle = HostThrottle.for_url(
+            url,
+            APKMIRROR_REQUESTS_PER_SECOND,
+            APKMIRROR_REQUEST_BURST,
+            APKMIRROR_MAX_CONCURRENT_REQUESTS,
+        )
+        for attempt in range(1, APKMIRROR_FETCH_ATTEMPTS + 1):
+            with throttle.request() as outcome:
+                response = apkmirror_scraper.get(url, timeout=request_timeout)
+                outcome.pushed_back = ApkMirror._is_pushback(response)
+            if not outcome.pushed_back:
+                break
+            # The next attempt waits for the narrowed window and an empty bucket to refill.
+            logger.debug(f"APKMirror pushed back on {url} (attempt {attempt}/{APKMIRROR_FETCH_ATTEMPTS}).")
+        return response
+
+    def _page(self: Self, url: str) -> CachedPage:
+        """Return an APKMirror page from the run-wide cache, fetching it on first use."""
+        return self._pages.get(url, self._extract_source)
 
     def _extracted_search_div(self: Self, url: str, search_class: str) -> Tag:
         """Extract search div from url."""
-        return self._extracted_search_source_div(self._extract_source(url), search_class)
+        return self._page(url).find_by_class(search_class)  # type: ignore[return-value]
 
     def specific_version(self: Self, app: APP, version: str, main_page: str = "") -> tuple[str, str]:
         """Function to download the specified version of app from  apkmirror.
@@ -357,17 +521,93 @@ class ApkMirror(Downloader):
         if not main_page:
             # APKMirror may rename app slugs independently from source paths, so resolve release URLs from listing HTML.
             main_page = self._find_specific_version_page(app, version)
-        download_page = self.get_download_page(main_page)
+        if indexed_download := self._download_indexed(app, main_page):
+            return indexed_download
+        download_page = self.get_download_page(main_page, app.archs_to_build, app.app_name)
         if app.app_version == "latest":
-            try:
-                logger.info(f"Trying to guess {app.app_name} version.")
-                appsec_val = self._extracted_search_div(download_page, "appspec-value")
-                appsec_version = str(appsec_val.find(text=lambda text: "Version" in text))
-                app.app_version = slugify(appsec_version.rsplit(":", maxsplit=1)[-1].strip())
-                logger.info(f"Guessed {app.app_version} for {app.app_name}")
-            except ScrapingError:
-                pass
-        return self.extract_download_link_for_app(download_page, app)
+            self._guess_version(app, download_page)
+        file_name, download_url = self.extract_download_link_for_app(download_page, app)
+        self._index_download(app, main_page, download_page, download_url)
+        return file_name, download_url
+
+    def _guess_version(self: Self, app: APP, download_page: str) -> None:
+        """Read the version from a variant page's spec list, leaving it "latest" when the page does not show one."""
+        logger.info(f"Trying to guess {app.app_name} version.")
+        try:
+            appsec_val = self._extracted_search_div(download_page, "appspec-value")
+        except ScrapingError:
+            return
+        appsec_version = appsec_val.find(text=lambda text: "Version" in text) if appsec_val else None
+        if not appsec_version:
+            logger.warning(f"Unable to guess {app.app_name} version from {download_page}.")
+            return
+        app.app_version = slugify(str(appsec_version).rsplit(":", maxsplit=1)[-1].strip())
+        logger.info(f"Guessed {app.app_version} for {app.app_name}")
+
+    def _download_indexed(self: Self, app: APP, release_page: str) -> tuple[str, str] | None:
+        """Download a release straight from the link an earlier run resolved, skipping its variant and download pages.
+
+        Returns None when the release has no usable indexed link, so the caller resolves it from the pages.
+        """
+        index = self._index()
+        chain = index.resolved(app.download_source, release_page) if index else None
+        # A link resolved for other ABIs points at the wrong variant, so it is resolved again for this app.
+        if not index or not chain or chain.get("archs", []) != list(app.archs_to_build):
+            return None
+        extension = self._select_download_extension(chain["apk_type"], preserve_bundle=self._preserves_bundle(app))
+        file_name = f"{app.app_name}.{extension}"
+        try:
+            self._download_variant(chain["download_url"], file_name, chain["force_download_page"])
+            self._verify_indexed_payload(file_name, chain["download_url"])
+        except (DownloadError, ScrapingError) as exc:
+            # APKMirror can expire or replace a link; drop it so this and later runs resolve the release again.
+            logger.warning(f"Indexed APKMirror link for {app.app_name} failed ({exc}); resolving {release_page}.")
+            index.forget_resolved(app.download_source, release_page)
+            return None
+        if app.app_version == "latest":
+            app.app_version = chain["version"]
+        logger.info(f"Downloaded {app.app_name} {chain['version']} from the indexed APKMirror link.")
+        return file_name, chain["download_url"]
+
+    def _verify_indexed_payload(self: Self, file_name: str, download_url: str) -> None:
+        """Reject an indexed link that answered with a page instead of the APK, APKM or XAPK archive it pointed to.
+
+        An expired download.php link can return a normal 200 HTML page, which the download itself accepts.
+        """
+        if self.config.dry_run:
+            return
+        file_path = self.config.temp_folder.joinpath(file_name)
+        try:
+            with file_path.open("rb") as file:
+                magic = file.read(len(ZIP_MAGIC))
+        except OSError:
+            magic = b""
+        if magic != ZIP_MAGIC:
+            file_path.unlink(missing_ok=True)
+            msg = f"Indexed link returned a non-archive payload for {file_name}"
+            raise DownloadError(msg, url=download_url)
+
+    def _index_download(self: Self, app: APP, release_page: str, variant_page: str, download_url: str) -> None:
+        """Record the download chain a release page resolved to, read from the pages cached while resolving it."""
+        if not (index := self._index()):
+            return
+        # An unguessed version would be reported as "latest" by every later run that reuses this chain.
+        if not app.app_version or app.app_version == "latest":
+            logger.debug(f"Not indexing {release_page} for {app.app_name}; its version is unknown.")
+            return
+        force_download_page = self._force_download_page(variant_page, app.app_name)
+        index.record_resolved(
+            app.download_source,
+            release_page,
+            {
+                "variant_page": variant_page,
+                "force_download_page": force_download_page,
+                "download_url": download_url,
+                "apk_type": self._extracted_search_div(force_download_page, "apkm-badge").get_text(),
+                "version": app.app_version,
+                "archs": list(app.archs_to_build),
+            },
+        )
 
     def latest_version(self: Self, app: APP, **kwargs: Any) -> tuple[str, str]:
         """Function to download whatever the latest version of app from apkmirror.
@@ -375,17 +615,9 @@ class ApkMirror(Downloader):
         :param app: Name of the application
         :return: Version of downloaded apk
         """
-        app_main_page = app.download_source
-        versions_div = self._extracted_search_div(app_main_page, "listWidget p-relative")
-        if versions_div is None:
-            # Without the listing widget there is no safe way to infer the latest APKMirror release.
-            msg = f"Unable to find APKMirror version list for {app.app_name}"
-            raise APKMirrorAPKDownloadError(msg, url=app_main_page)
-        app_rows = versions_div.find_all(class_="appRow")
         version_urls = [
-            app_row.find(class_="downloadLink")["href"]
-            for app_row in app_rows
-            if "beta" not in app_row.find(class_="appRowTitle").get_text().lower()
-            and "alpha" not in app_row.find(class_="appRowTitle").get_text().lower()
+            release_page
+            for title, release_page in self._listing_rows(app)
+            if "beta" not in title.lower() and "alpha" not in title.lower()
         ]
-        return self.specific_version(app, "latest", APK_MIRROR_BASE_URL + max(version_urls))
+        return self.specific_version(app, "latest", max(version_urls))
@@ -0,0 +1,124 @@
+"""On-disk index of APKMirror release pages and the download links resolved from them."""
+
+import json
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Any, ClassVar, Self, cast
+from uuid import uuid4
+
+from loguru import logger
+
+# Resolved links older than this are resolved again, in case APKMirror replaced a variant's file.
+RESOLVED_LINK_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+# Listing rows kept per app source; the least recently seen are dropped first, as old releases are rarely pinned.
+MAX_LISTED_RELEASES = 200
+
+
+class ApkMirrorIndex(object):
+    """Per app source: release pages by version and listing title, and each release page's resolved download chain.
+
+    Pinned versions found in the index skip the release-URL guess and listing scrape; releases with a resolved chain
+    also skip the variant and download pages, so repeated builds go straight to the download.php link.
+    """
+
+    _instances: ClassVar[dict[Path, "ApkMirrorIndex"]] = {}
+    _instances_lock: ClassVar[Lock] = Lock()
+
+    def __init__(self: Self, index_file: Path) -> None:
+        self.index_file = index_file
+        self._lock = Lock()
+        self._sources: dict[str, dict[str, Any]] | None = None
+
+    @classmethod
+    def for_file(cls: type["ApkMirrorIndex"], index_file: Path) -> "ApkMirrorIndex":
+        """Return the run-wide index stored in a file, so every downloader instance shares one copy."""
+        with cls._instances_lock:
+            if index_file not in cls._instances:
+                cls._instances[index_file] = cls(index_file)
+            return cls._instances[index_file]
+
+    def _load(self: Self) -> dict[str, dict[str, Any]]:
+        """Read the index once per run; an unreadable file only costs the page fetches it would have saved."""
+        if self._sources is None:
+            try:
+                self._sources = json.loads(self.index_file.read_text())
+            except FileNotFoundError:
+                self._sources = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable APKMirror index {self.index_file}: {e}")
+                self._sources = {}
+        return self._sources
+
+    def _save(self: Self, sources: dict[str, dict[str, Any]]) -> None:
+        """Publish the index atomically so an interrupted run never leaves it truncated."""
+        partial_path = self.index_file.with_name(f".{self.index_file.name}.{uuid4().hex}.part")
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            partial_path.write_text(json.dumps(sources, indent=2, sort_keys=True))
+            partial_path.replace(self.index_file)
+        except OSError as e:
+            partial_path.unlink(missing_ok=True)
+            logger.warning(f"Unable to write APKMirror index {self.index_file}: {e}")
+
+    def _source(self: Self, source: str) -> dict[str, Any]:
+        """Return the entries of one app source, creating them on first use."""
+        return self._load().setdefault(source, {"releases": {}, "resolved": {}, "versions": {}})
+
+    def record_listing(self: Self, source: str, rows: Iterable[tuple[str, str]]) -> None:
+        """Remember the (title, release page) rows of a listing scrape, adding to what earlier runs saw."""
+        now = time()
+        with self._lock:
+            releases: dict[str, dict[str, Any]] = self._source(source)["releases"]
+            changed = False
+            for title, release_page in rows:
+                entry = releases.get(release_page)
+                changed = changed or entry is None or entry["title"] != title
+                # Seen times only order pruning, so refreshing them alone is not worth rewriting the file.
+                releases[release_page] = {"title": title, "seen_at": now}
+            if len(releases) > MAX_LISTED_RELEASES:
+                by_age = sorted(releases, key=lambda page: releases[page]["seen_at"])
+                for stale_page in by_age[: len(releases) - MAX_LISTED_RELEASES]:
+                    del releases[stale_page]
+            if changed:
+                self._save(self._load())
+
+    def record_version(self: Self, source: str, version: str, release_page: str) -> None:
+        """Remember the release page a version resolved to."""
+        with self._lock:
+            versions = self._source(source)["versions"]
+            if versions.get(version) != release_page:
+                versions[version] = release_page
+                self._save(self._load())
+
+    def version_page(self: Self, source: str, version: str) -> str | None:
+        """Return the release page a version resolved to in an earlier run."""
+        with self._lock:
+            return cast("str | None", self._source(source)["versions"].get(version))
+
+    def listed_page(self: Self, source: str, version: str, matches: Callable[[str, str], bool]) -> str | None:
+        """Return a release page seen in any earlier listing whose title matches a version."""
+        with self._lock:
+            releases: dict[str, dict[str, Any]] = self._source(source)["releases"]
+            return next((page for page, entry in releases.items() if matches(version, entry["title"])), None)
+
+    def resolved(self: Self, source: str, release_page: str) -> dict[str, Any] | None:
+        """Return the download chain resolved from a release page, unless it is too old to trust."""
+        with self._lock:
+            entry: dict[str, Any] | None = self._source(source)["resolved"].get(release_page)
+        if entry is None or time() - entry["resolved_at"] > RESOLVED_LINK_MAX_AGE_SECONDS:
+            return None
+        return entry
+
+    def record_resolved(self: Self, source: str, release_page: str, chain: dict[str, Any]) -> None:
+        """Remember the variant page, force-download page, download link, APK type and version of a release page."""
+        with self._lock:
+            self._source(source)["resolved"][release_page] = {**chain, "resolved_at": time()}
+            self._save(self._load())
+
+    def forget_resolved(self: Self, source: str, release_page: str) -> None:
+        """Drop a resolved chain whose download link stopped working."""
+        with self._lock:
+            if self._source(source)["resolved"].pop(release_page, None) is not None:
+                self._save(self._load())
@@ -0,0 +1,145 @@
+"""Run-wide CloakBrowser shared by every APKMirror fallback."""
+
+import atexit
+from collections.abc import Callable
+from concurrent.futures import Future
+from pathlib import Path
+from queue import SimpleQueue
+from threading import Lock, Thread
+from typing import Any, ClassVar, Self, TypeVar
+from uuid import uuid4
+
+from loguru import logger
+
+from src.config import RevancedConfig
+from src.utils import resource_folder
+
+T = TypeVar("T")
+# Cookies, including Cloudflare clearance, carry over to the next run's browser through this file.
+CLOAK_STORAGE_STATE_FILE_NAME = "cloak-storage-state.json"
+
+
+class CloakBrowserPool(object):
+    """One lazily launched browser and context, driven from a dedicated thread.
+
+    Playwright's sync API binds a browser to the thread that launched it, so every page callback runs on the pool's
+    own thread; callers on worker threads queue their callbacks and wait for the result. Page loads and binary
+    downloads therefore take turns, each on a fresh page of the one context, so clearance earned by either is live
+    for the other.
+    """
+
+    _shared: ClassVar["CloakBrowserPool | None"] = None
+    _shared_lock: ClassVar[Lock] = Lock()
+    _storage_state_file: ClassVar[Path] = Path(resource_folder, CLOAK_STORAGE_STATE_FILE_NAME)
+
+    def __init__(self: Self, start_browser: Callable[[], Any], storage_state_file: Path) -> None:
+        self.start_browser = start_browser
+        self.storage_state_file = storage_state_file
+        self._browser: Any = None
+        self._context: Any = None
+        self._tasks: SimpleQueue[tuple[Future[Any], Callable[[], Any]] | None] = SimpleQueue()
+        self._lock = Lock()
+        self._thread: Thread | None = None
+
+    @classmethod
+    def configure(cls: type["CloakBrowserPool"], config: RevancedConfig) -> None:
+        """Keep the browser cookies in the configured temp folder, next to the run's other caches."""
+        with cls._shared_lock:
+            cls._storage_state_file = config.temp_folder.joinpath(CLOAK_STORAGE_STATE_FILE_NAME)
+
+    @classmethod
+    def shared(cls: type["CloakBrowserPool"], start_browser: Callable[[], Any]) -> "CloakBrowserPool":
+        """Return the run-wide pool, closing its browser when the interpreter exits."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(start_browser, cls._storage_state_file)
+                atexit.register(cls._shared.close)
+            return cls._shared
+
+    def run(self: Self, page_callback: Callable[[Any], T]) -> T:
+        """Run a callback with a fresh page of the shared context and return what it returns."""
+        result: Future[T] = Future()
+        with self._lock:
+            if self._thread is None:
+                # A daemon thread never holds up interpreter exit; the atexit hook still closes the browser first.
+                self._thread = Thread(target=self._serve, name="cloak-browser", daemon=True)
+                self._thread.start()
+            self._tasks.put((result, lambda: self._with_page(page_callback)))
+        return result.result()
+
+    def _serve(self: Self) -> None:
+        """Run queued browser work until close() sends the stop marker."""
+        while (task := self._tasks.get()) is not None:
+            result, work = task
+            try:
+                result.set_result(work())
+            except BaseException as e:  # noqa: BLE001
+                # The caller re-raises the failure on its own thread; this thread keeps serving.
+                result.set_exception(e)
+        self._close_browser()
+
+    def _browser_context(self: Self) -> Any:
+        """Launch the browser and open its context on first use, restoring the previous run's cookies."""
+        if self._context is None:
+            self._browser = self.start_browser()
+            storage_state = str(self.storage_state_file) if self.storage_state_file.exists() else None
+            try:
+                self._context = self._browser.new_context(storage_state=storage_state)
+            except Exception:
+                # Without a context the next call launches again, so this browser must not be left running.
+                self._close_browser()
+                raise
+        return self._context
+
+    def _with_page(self: Self, page_callback: Callable[[Any], T]) -> T:
+        """Open a page, hand it to the callback, then close it and persist the context's cookies."""
+        page = None
+        try:
+            page = self._browser_context().new_page()
+            return page_callback(page)
+        finally:
+            try:
+                if page is not None:
+                    page.close()
+                    self._save_storage_state()
+            except Exception as e:  # noqa: BLE001
+                logger.debug(f"Unable to close CloakBrowser page cleanly: {e}")
+            if self._browser is not None and not self._browser.is_connected():
+                # A crashed browser is replaced on the next fallback instead of failing every later page.
+                logger.warning("CloakBrowser disconnected; it will be relaunched on next use.")
+                self._browser = self._context = None
+
+    def _save_storage_state(self: Self) -> None:
+        """Write the context's cookies so the next run starts with any clearance already earned."""
+        # A reader must never see a half-written file, so each write is published whole.
+        partial_path = self.storage_state_file.with_name(f".{self.storage_state_file.name}.{uuid4().hex}.part")
+        try:
+            self.storage_state_file.parent.mkdir(parents=True, exist_ok=True)
+            self._context.storage_state(path=str(partial_path))
+            partial_path.replace(self.storage_state_file)
+        except Exception as e:  # noqa: BLE001
+            partial_path.unlink(missing_ok=True)
+            # Losing the cookies only costs a fresh challenge next run.
+            logger.debug(f"Unable to persist CloakBrowser cookies to {self.storage_state_file}: {e}")
+
+    def _close_browser(self: Self) -> None:
+        """Close the context and the browser if one was launched."""
+        if self._browser is None:
+            return
+        try:
+            if self._context is not None:
+                self._context.close()
+            self._browser.close()
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"Unable to close CloakBrowser cleanly: {e}")
+        finally:
+            self._browser = self._context = None
+
+    def close(self: Self) -> None:
+        """Stop the browser thread after queued work has finished and close the browser."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._tasks.put(None)
+        if thread is not None:
+            thread.join()
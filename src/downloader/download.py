@@ -1,23 +1,93 @@
 """Downloader Class."""
 
+import hashlib
+import json
 import os
+import re
 import subprocess
 import zipfile
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 from queue import PriorityQueue
+from threading import BoundedSemaphore, Lock
 from time import perf_counter
 from typing import Any, Self
 from urllib.parse import urlparse
 from uuid import uuid4
 
 from loguru import logger
-from requests import Session
+from requests import RequestException, Response, Session
 from tqdm import tqdm
 
 from src.app import APP
+from src.artifact_store import ArtifactStore, response_validators
 from src.config import RevancedConfig
 from src.exceptions import DownloadError
-from src.utils import handle_request_response, implement_method, request_timeout, session
+from src.jvm import ClassDataSharing
+from src.jvm_daemon import JvmDaemonPool
+from src.patches_cache import file_digest
+from src.utils import (
+    handle_request_response,
+    implement_method,
+    possible_archs,
+    request_timeout,
+    session,
+    status_code_206,
+    status_code_304,
+    status_code_416,
+)
+
+# Split APK archives carry each ABI's native libraries in its own `split_config.<abi>.apk` entry.
+ABI_SPLIT_PATTERN = re.compile(
+    r"(?:^|/)split_config\.({})\.apk$".format("|".join(re.escape(arch.replace("-", "_")) for arch in possible_archs)),
+)
+
+# Transfers into the same stable partial file are serialized across worker threads.
+# Each lock is stored with the number of workers holding or waiting for it, so it can be dropped once unused.
+_partial_file_locks: dict[Path, tuple[Lock, int]] = {}
+_partial_file_locks_guard = Lock()
+
+
+@contextmanager
+def _partial_file_lock(partial_file_path: Path) -> Iterator[None]:
+    """Hold the lock that guards one partial download file, forgetting it once no worker needs it."""
+    with _partial_file_locks_guard:
+        lock, users = _partial_file_locks.get(partial_file_path, (Lock(), 0))
+        _partial_file_locks[partial_file_path] = (lock, users + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _partial_file_locks_guard:
+            _, users = _partial_file_locks[partial_file_path]
+            # A lock is only removed when nobody waits on it, so a later worker can never get a second lock.
+            if users > 1:
+                _partial_file_locks[partial_file_path] = (lock, users - 1)
+            else:
+                del _partial_file_locks[partial_file_path]
+
+
+# Segment connections to one host are capped across all concurrent downloads, not just within one artifact.
+_host_connection_slots: dict[str, BoundedSemaphore] = {}
+_host_connection_slots_guard = Lock()
+
+
+def _host_connection_slot(url: str, limit: int) -> BoundedSemaphore:
+    """Return the semaphore that bounds concurrent segment connections to the URL's host."""
+    with _host_connection_slots_guard:
+        return _host_connection_slots.setdefault(urlparse(url).netloc, BoundedSemaphore(max(limit, 1)))
+
+
+@dataclass(frozen=True)
+class _ArtifactRequest(object):
+    """How one artifact is requested, shared by every connection its download opens."""
+
+    http_session: Any
+    url: str
+    headers: dict[str, str]
 
 
 class Downloader(object):
@@ -25,6 +95,8 @@ class Downloader(object):
 
     def __init__(self: Self, config: RevancedConfig) -> None:
         self._CHUNK_SIZE = 10485760
+        # A dropped connection is resumed with a Range request up to this many times before the download fails.
+        self._DOWNLOAD_ATTEMPTS = 3
         self._QUEUE: PriorityQueue[tuple[float, str]] = PriorityQueue()
         self._QUEUE_LENGTH = 0
         self.config = config
@@ -48,6 +120,25 @@ class Downloader(object):
         # Some endpoints omit content length, so a non-empty target is the best safe cache signal in that case.
         return not expected_size or existing_size == expected_size
 
+    def _can_reuse_existing_download(self: Self, file_path: Path, url: str, expected_size: int) -> bool:
+        """Return whether the artifact already at the working path can stand in for this download."""
+        if self.config.disable_caching:
+            if file_path.exists():
+                # DISABLE_CACHING means the caller wants a fresh artifact even when a same-sized file is present.
+                logger.debug(f"Ignoring cached {file_path.name} because caching is disabled.")
+            return False
+        # An interrupted parallel worker can leave a partial artifact, so size must match before reuse.
+        existing_size = self._existing_file_size(file_path)
+        if self._existing_download_is_complete(existing_size, expected_size):
+            logger.debug(f"Skipping download of {file_path.name} from {url}. File already exists with expected size.")
+            return True
+        if existing_size is not None:
+            logger.warning(
+                f"Re-downloading {file_path.name} from {url}; "
+                f"existing size {existing_size} differs from expected {expected_size}.",
+            )
+        return False
+
     def _build_download_headers(self: Self, url: str, extra_headers: dict[str, str] | None) -> dict[str, str]:
         """Build request headers for authenticated and binary artifact downloads."""
         headers: dict[str, str] = {}
@@ -98,65 +189,305 @@ class Downloader(object):
             logger.debug(f"Skipping download of {file_name} from {url}. Dry run is enabled.")
             return
 
-        # Use the caller-supplied session (e.g. cloudscraper for APKMirror) or
-        # fall back to the module-level plain requests session.
-        effective_session = http_session if http_session is not None else session
-
-        response = effective_session.get(
+        request = _ArtifactRequest(
+            # Use the caller-supplied session (e.g. cloudscraper for APKMirror) or
+            # fall back to the module-level plain requests session.
+            http_session if http_session is not None else session,
             url,
-            stream=True,
-            headers=self._build_download_headers(url, extra_headers),
-            # External artifact hosts occasionally hang; bounded requests let CI fail and retry instead of timing out.
-            timeout=request_timeout,
+            self._build_download_headers(url, extra_headers),
         )
-        handle_request_response(response, url)
-        total = int(response.headers.get("content-length", 0))
-
-        if not self.config.disable_caching:
-            # An interrupted parallel worker can leave a partial artifact, so size must match before reuse.
-            existing_size = self._existing_file_size(file_path)
-            if self._existing_download_is_complete(existing_size, total):
-                logger.debug(f"Skipping download of {file_name} from {url}. File already exists with expected size.")
+        partial_file_path = self._partial_download_path(file_path, url)
+        # One worker per URL and name transfers at a time, so the stable partial file is never written twice at once.
+        with _partial_file_lock(partial_file_path):
+            response = self._open_download(request, partial_file_path)
+            if self._reuse_cached_artifact(response, url, file_path):
                 response.close()
                 return
-            if existing_size is not None:
-                logger.warning(
-                    f"Re-downloading {file_name} from {url}; "
-                    f"existing size {existing_size} differs from expected {total}.",
-                )
-        elif file_path.exists():
-            # DISABLE_CACHING means the caller wants a fresh artifact even when a same-sized file is already present.
-            logger.debug(f"Ignoring cached {file_name} because caching is disabled.")
-
-        logger.info(f"Trying to download {file_name} from {url}")
-        self._QUEUE_LENGTH += 1
-        start = perf_counter()
-        bar = tqdm(
-            desc=file_name,
-            total=total,
-            unit="iB",
-            unit_scale=True,
-            unit_divisor=1024,
-            colour="green",
+            _, total = self._response_range(response)
+            source_urls = self._source_urls(response, url)
+            validators = response_validators(response.headers)
+
+            logger.info(f"Trying to download {file_name} from {url}")
+            self._QUEUE_LENGTH += 1
+            start = perf_counter()
+            bar = tqdm(
+                desc=file_name,
+                total=total,
+                unit="iB",
+                unit_scale=True,
+                unit_divisor=1024,
+                colour="green",
+            )
+            with bar:
+                digest = self._download_in_segments(request, response, partial_file_path, bar)
+                if digest is None:
+                    digest = self._stream_download(request, response, partial_file_path, bar)
+            self._verify_download_size(partial_file_path, total, url)
+            if (store := ArtifactStore.shared()) is not None:
+                blob = store.publish(partial_file_path, digest, source_urls, validators)
+                store.link(blob, file_path)
+            else:
+                # Atomic replace publishes the completed download only after all bytes are written.
+                partial_file_path.replace(file_path)
+            self._resume_state_path(partial_file_path).unlink(missing_ok=True)
+        self._QUEUE.put((perf_counter() - start, file_name))
+        logger.debug(f"Downloaded {file_name}")
+
+    def _verify_download_size(self: Self, partial_file_path: Path, total: int, url: str) -> None:
+        """Refuse to publish a transfer that ended short of the size the server announced."""
+        size = self._existing_file_size(partial_file_path) or 0
+        if total and size != total:
+            # A truncated artifact would otherwise be published, and with the store on, reused on later runs.
+            self._discard_partial_download(partial_file_path)
+            msg = f"Downloaded {size} of {total} bytes"
+            raise DownloadError(msg, url=url)
+
+    def _stream_download(
+        self: Self,
+        request: "_ArtifactRequest",
+        response: Response,
+        partial_file_path: Path,
+        bar: tqdm,
+    ) -> str:
+        """Copy the artifact over one connection, resuming with Range requests when it drops."""
+        for attempt in range(1, self._DOWNLOAD_ATTEMPTS + 1):
+            try:
+                return self._write_response(response, partial_file_path, bar)
+            except RequestException as e:
+                # Dropped connections keep the partial file when the server can continue it with a Range.
+                if not self._resume_headers(partial_file_path):
+                    self._discard_partial_download(partial_file_path)
+                    raise
+                if attempt == self._DOWNLOAD_ATTEMPTS:
+                    # The partial file is kept, so the next run continues the transfer instead of restarting.
+                    raise
+                logger.warning(f"Download of {partial_file_path.name} interrupted ({e}); resuming.")
+            except Exception:
+                # Failed downloads should not poison the cache path for the next retry.
+                self._discard_partial_download(partial_file_path)
+                raise
+            finally:
+                # Closing the streamed response releases the connection after body copy or write failure.
+                response.close()
+            response = self._open_download(request, partial_file_path)
+        msg = f"Unable to download {request.url}"
+        raise DownloadError(msg)
+
+    def _segment_ranges(self: Self, response: Response) -> list[tuple[int, int]]:
+        """Split the artifact into byte ranges for concurrent connections, or return nothing to use one stream."""
+        _, total = self._response_range(response)
+        etag = response.headers.get("etag", "")
+        if (
+            self.config.download_segments <= 1
+            or response.status_code == status_code_206
+            or response.headers.get("accept-ranges") != "bytes"
+            # Every segment is pinned to the same version with If-Range, which requires a strong validator.
+            or not (etag and not etag.startswith("W/"))
+        ):
+            return []
+        min_segment_size = self.config.download_min_segment_mb * 1024 * 1024
+        segments = min(self.config.download_segments, total // max(min_segment_size, 1))
+        if segments <= 1:
+            return []
+        step = -(-total // segments)
+        return [(start, min(start + step, total) - 1) for start in range(0, total, step)]
+
+    def _download_in_segments(
+        self: Self,
+        request: "_ArtifactRequest",
+        response: Response,
+        partial_file_path: Path,
+        bar: tqdm,
+    ) -> str | None:
+        """Fetch byte ranges concurrently into a sparse partial file, returning None when the artifact is not split.
+
+        A failed segmented transfer falls back to one stream over a fresh request, as the probe is closed by then.
+        """
+        ranges = self._segment_ranges(response)
+        if not ranges:
+            return None
+        # The probe response already proved range support; its body is not needed once segments take over.
+        response.close()
+        # A sparse file has no contiguous prefix to resume from, so it must never be mistaken for one.
+        self._resume_state_path(partial_file_path).unlink(missing_ok=True)
+        segment_request = _ArtifactRequest(
+            request.http_session,
+            request.url,
+            {**request.headers, "If-Range": response.headers["etag"]},
         )
-        # Each worker writes to a unique temp file so another thread can never observe a half-written final artifact.
-        partial_file_path = file_path.with_name(f".{file_path.name}.{uuid4().hex}.part")
         try:
-            with partial_file_path.open("wb") as dl_file, bar:
+            with partial_file_path.open("wb") as dl_file:
+                # Truncating up to the final size preallocates a sparse file that segments fill at their offsets.
+                dl_file.truncate(ranges[-1][1] + 1)
+                with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                    futures = [
+                        pool.submit(self._fetch_segment, segment_request, dl_file.fileno(), byte_range, bar)
+                        for byte_range in ranges
+                    ]
+                    for future in futures:
+                        future.result()
+        except (RequestException, DownloadError) as e:
+            logger.warning(f"Segmented download of {request.url} failed ({e}); falling back to a single stream.")
+            self._discard_partial_download(partial_file_path)
+            bar.reset()
+            fresh_response = self._open_download(request, partial_file_path)
+            return self._stream_download(request, fresh_response, partial_file_path, bar)
+        return file_digest(partial_file_path)
+
+    def _fetch_segment(
+        self: Self,
+        request: "_ArtifactRequest",
+        file_descriptor: int,
+        byte_range: tuple[int, int],
+        bar: tqdm,
+    ) -> None:
+        """Download one inclusive byte range and write it at its offset in the shared partial file."""
+        start, end = byte_range
+        with _host_connection_slot(request.url, self.config.max_connections_per_host):
+            response = request.http_session.get(
+                request.url,
+                stream=True,
+                headers={**request.headers, "Range": f"bytes={start}-{end}"},
+                timeout=request_timeout,
+            )
+            try:
+                if response.status_code != status_code_206 or self._response_range(response)[0] != start:
+                    msg = f"Server did not honour byte range {start}-{end}"
+                    raise DownloadError(msg)
+                offset = start
                 for chunk in response.iter_content(self._CHUNK_SIZE):
-                    size = dl_file.write(chunk)
-                    bar.update(size)
-            # Atomic replace publishes the completed download only after all bytes are written.
-            partial_file_path.replace(file_path)
-        except Exception:
-            # Failed downloads should not poison the cache path for the next retry.
-            partial_file_path.unlink(missing_ok=True)
-            raise
-        finally:
-            # Closing the streamed response releases the connection after body copy or write failure.
+                    # pwrite keeps each segment at its own offset without sharing a file position between threads.
+                    offset += os.pwrite(file_descriptor, chunk, offset)
+                    bar.update(len(chunk))
+            finally:
+                response.close()
+        if offset != end + 1:
+            msg = f"Byte range {start}-{end} ended early at {offset}"
+            raise DownloadError(msg)
+
+    @staticmethod
+    def _source_urls(response: Response, url: str) -> list[str]:
+        """Return every URL that reached the artifact's bytes."""
+        # Redirects (GitHub API vs browser URL, tag vs latest) are indexed under every URL that reached the bytes.
+        return list(dict.fromkeys([url, getattr(response, "url", None) or url]))
+
+    def _reuse_cached_artifact(self: Self, response: Response, url: str, file_path: Path) -> bool:
+        """Return whether a stored or already present artifact satisfies this response without reading its body."""
+        _, total = self._response_range(response)
+        store = ArtifactStore.shared()
+        if response.status_code == status_code_304:
+            # Only conditional requests reach here with a 304, and those are only sent while the blob exists.
+            if store is None or (blob := store.stored_blob(url)) is None:
+                msg = f"{url} was reported unchanged but its stored copy is gone"
+                raise DownloadError(msg, url=url)
+            logger.debug(f"{file_path.name} is unchanged at {url}; reusing the stored copy")
+            store.link(blob, file_path)
+            return True
+        validators = response_validators(response.headers)
+        if store is not None and (blob := store.lookup(self._source_urls(response, url), validators, total)):
+            # The server still reports the version already stored, so the body is never read.
+            logger.debug(f"Reusing stored artifact for {file_path.name} from {url}")
+            store.link(blob, file_path)
+            return True
+        return self._can_reuse_existing_download(file_path, url, total)
+
+    @staticmethod
+    def _partial_download_path(file_path: Path, url: str) -> Path:
+        """Return the stable partial file for one URL, so a later attempt or run can continue the transfer."""
+        url_key = hashlib.sha256(url.encode()).hexdigest()[:16]
+        return file_path.with_name(f".{file_path.name}.{url_key}.part")
+
+    @staticmethod
+    def _resume_state_path(partial_file_path: Path) -> Path:
+        """Return the sidecar that records which remote version the partial file's bytes belong to."""
+        return partial_file_path.with_name(f"{partial_file_path.name}.json")
+
+    def _discard_partial_download(self: Self, partial_file_path: Path) -> None:
+        """Remove a partial file that can no longer be resumed."""
+        partial_file_path.unlink(missing_ok=True)
+        self._resume_state_path(partial_file_path).unlink(missing_ok=True)
+
+    def _resume_headers(self: Self, partial_file_path: Path) -> dict[str, str]:
+        """Return Range headers that continue an earlier transfer, or nothing when it must start over."""
+        try:
+            validator = json.loads(self._resume_state_path(partial_file_path).read_text())["validator"]
+            offset = partial_file_path.stat().st_size
+        except (OSError, ValueError, KeyError):
+            return {}
+        if not offset:
+            return {}
+        # If-Range makes the server send the whole new file instead of a range when the artifact has changed since.
+        return {"Range": f"bytes={offset}-", "If-Range": validator}
+
+    def _remember_resume_state(self: Self, partial_file_path: Path, response: Response) -> None:
+        """Record how the partial file can be resumed, or forget it when the server cannot serve ranges."""
+        etag = response.headers.get("etag", "")
+        # If-Range only accepts strong validators, so weak ETags fall back to Last-Modified.
+        validator = etag if etag and not etag.startswith("W/") else response.headers.get("last-modified")
+        accepts_ranges = response.status_code == status_code_206 or response.headers.get("accept-ranges") == "bytes"
+        state_path = self._resume_state_path(partial_file_path)
+        if accepts_ranges and validator:
+            state_path.write_text(json.dumps({"validator": validator}))
+        else:
+            state_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _response_range(response: Response) -> tuple[int, int]:
+        """Return where the response body starts within the artifact and the artifact's full size."""
+        length = int(response.headers.get("content-length", 0))
+        if response.status_code != status_code_206:
+            return 0, length
+        # Content-Range is "bytes <start>-<end>/<size>"; an unknown size ("*") falls back to start plus body length.
+        byte_range, _, size = response.headers.get("content-range", "").removeprefix("bytes ").partition("/")
+        start = int(byte_range.partition("-")[0] or 0)
+        return start, int(size) if size.isdigit() else start + length
+
+    def _open_download(self: Self, request: "_ArtifactRequest", partial_file_path: Path) -> Response:
+        """Start the artifact GET, asking only for the missing bytes when a resumable partial file exists."""
+        resume_headers = self._resume_headers(partial_file_path)
+        store = ArtifactStore.shared()
+        # A stored copy lets the server answer 304 instead of resending bytes that have not changed.
+        conditional_headers = store.conditional_headers(request.url) if store and not resume_headers else {}
+        response: Response = request.http_session.get(
+            request.url,
+            stream=True,
+            headers={**request.headers, **resume_headers, **conditional_headers},
+            # External artifact hosts occasionally hang; bounded requests let CI fail and retry instead of timing out.
+            timeout=request_timeout,
+        )
+        if resume_headers and response.status_code == status_code_416:
+            # The partial file no longer lines up with the remote artifact, so the transfer starts over.
             response.close()
-        self._QUEUE.put((perf_counter() - start, file_name))
-        logger.debug(f"Downloaded {file_name}")
+            self._discard_partial_download(partial_file_path)
+            return self._open_download(request, partial_file_path)
+        if conditional_headers and response.status_code == status_code_304:
+            return response
+        if response.status_code != status_code_206:
+            handle_request_response(response, request.url)
+        return response
+
+    def _write_response(self: Self, response: Response, partial_file_path: Path, bar: tqdm) -> str:
+        """Append a range response to the partial file, or rewrite it from a full one, returning the file's SHA-256."""
+        offset, _ = self._response_range(response)
+        resuming = response.status_code == status_code_206
+        if resuming and offset != self._existing_file_size(partial_file_path):
+            msg = f"Server resumed {partial_file_path.name} at byte {offset}, which does not match the partial file"
+            raise DownloadError(msg)
+        self._remember_resume_state(partial_file_path, response)
+        # Hashing while writing gives the store its content address without reading the new bytes a second time.
+        digest = hashlib.sha256()
+        if resuming:
+            with partial_file_path.open("rb") as existing_file:
+                while chunk := existing_file.read(self._CHUNK_SIZE):
+                    digest.update(chunk)
+        bar.reset()
+        bar.update(offset)
+        with partial_file_path.open("ab" if resuming else "wb") as dl_file:
+            for chunk in response.iter_content(self._CHUNK_SIZE):
+                size = dl_file.write(chunk)
+                digest.update(chunk)
+                bar.update(size)
+        return digest.hexdigest()
 
     def extract_download_link(self: Self, page: str, app: str) -> tuple[str, str]:
         """Extract download link from web page."""
@@ -187,20 +518,24 @@ class Downloader(object):
         input_file_name, output_apk_file = self._prepare_merge_input(file_name)
         output_path = f"{self.config.temp_folder}/{output_apk_file}"
         Path(output_path).unlink(missing_ok=True)
-        subprocess.run(
-            [
-                "java",
-                "-jar",
-                f"{self.config.temp_folder}/{self.config.apk_editor}",
-                "m",
-                "-i",
-                f"{self.config.temp_folder}/{input_file_name}",
-                "-o",
-                output_path,
-            ],
-            capture_output=True,
-            check=True,
-        )
+        merge_command = [
+            "java",
+            "-jar",
+            f"{self.config.temp_folder}/{self.config.apk_editor}",
+            "m",
+            "-i",
+            f"{self.config.temp_folder}/{input_file_name}",
+            "-o",
+            output_path,
+        ]
+        # APKEditor output is only needed for failures, so the daemon path keeps it for the raised error.
+        merge_output: list[str] = []
+        return_code = JvmDaemonPool.run_shared(merge_command[1:], lambda _channel, text: merge_output.append(text))
+        if return_code is None:
+            with ClassDataSharing.java_options(Path(merge_command[2])) as cds_options:
+                subprocess.run([merge_command[0], *cds_options, *merge_command[1:]], capture_output=True, check=True)
+        elif return_code != 0:
+            raise subprocess.CalledProcessError(return_code, merge_command, "\n".join(merge_output))
         logger.info("Converted zip to apk.")
         return output_apk_file
 
@@ -259,7 +594,44 @@ class Downloader(object):
         if self._should_patch_download_directly(file_name, app):
             # The patcher can consume this input as-is, so conversion would remove the split-package shape it needs.
             return file_name, app_dl
-        return self.convert_to_apk(file_name), app_dl
+        return self.convert_to_apk(self.prune_abi_splits(file_name, app.archs_to_build)), app_dl
+
+    def prune_abi_splits(self: Self, file_name: str, archs: list[str]) -> str:
+        """Copy a split APK archive without the ABI splits that are not built, returning the name to merge.
+
+        The downloaded archive is left untouched so its size still matches the source on the next run's reuse check.
+        """
+        if not archs:
+            return file_name
+        wanted = {arch.replace("-", "_") for arch in archs}
+        source_path = self.config.temp_folder.joinpath(file_name)
+        try:
+            with zipfile.ZipFile(source_path) as archive:
+                entries = archive.infolist()
+                split_abis = {
+                    info.filename: match[1] for info in entries if (match := ABI_SPLIT_PATTERN.search(info.filename))
+                }
+                unwanted = {name for name, abi in split_abis.items() if abi not in wanted}
+                # Without a split for a wanted ABI, pruning would leave the merged APK with no native libraries at all.
+                if not unwanted or not wanted & set(split_abis.values()):
+                    return file_name
+                base_name, extension = os.path.splitext(file_name)
+                pruned_name = f"{base_name}-{'-'.join(sorted(archs))}{extension}"
+                pruned_path = self.config.temp_folder.joinpath(pruned_name)
+                partial_path = pruned_path.with_name(f".{pruned_name}.{uuid4().hex}.part")
+                try:
+                    with zipfile.ZipFile(partial_path, "w") as pruned:
+                        for info in entries:
+                            if info.filename not in unwanted:
+                                pruned.writestr(info, archive.read(info))
+                    partial_path.replace(pruned_path)
+                except OSError:
+                    partial_path.unlink(missing_ok=True)
+                    raise
+        except zipfile.BadZipFile:
+            return file_name
+        logger.info(f"Dropped {len(unwanted)} ABI splits from {file_name} before merging for {', '.join(archs)}.")
+        return pruned_name
 
     def direct_download(self: Self, dl: str, file_name: str) -> None:
         """Download from DL."""
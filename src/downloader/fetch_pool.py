@@ -0,0 +1,95 @@
+"""Run-wide pool that runs resource downloads with a per-host concurrency limit."""
+
+from collections import defaultdict, deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, ClassVar, Self
+from urllib.parse import urlparse
+
+from src.config import RevancedConfig
+
+# Used until main() configures the pool; they match the default MAX_* settings.
+DEFAULT_FETCH_WORKERS = 12
+DEFAULT_FETCHES_PER_HOST = 6
+
+
+class FetchPool(object):
+    """One set of fetch threads shared by every app, with fetches beyond a host's limit queued without a thread.
+
+    Only resource downloads (CLI jars, patch bundles and their extras) go through it. Page scrapes and APK
+    downloads stay on their app's pipeline worker, bounded by MAX_DOWNLOAD_WORKERS instead.
+    """
+
+    _shared: ClassVar["FetchPool | None"] = None
+    _shared_lock: ClassVar[Lock] = Lock()
+
+    def __init__(self: Self, max_workers: int, per_host: int) -> None:
+        self.per_host = max(per_host, 1)
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="fetch")
+        self._lock = Lock()
+        self._active: dict[str, int] = defaultdict(int)
+        self._waiting: dict[str, deque[tuple[Future[Any], Callable[[], Any]]]] = defaultdict(deque)
+
+    @classmethod
+    def configure(cls: type["FetchPool"], config: RevancedConfig) -> None:
+        """Size the run-wide pool for the configured resource and download workers."""
+        # Every resource-stage worker used to own max_resource_workers threads; the same peak is now shared.
+        pool = cls(config.max_resource_workers * max(config.max_download_workers, 1), config.max_connections_per_host)
+        with cls._shared_lock:
+            previous, cls._shared = cls._shared, pool
+        if previous is not None:
+            previous.shutdown()
+
+    @classmethod
+    def shared(cls: type["FetchPool"]) -> "FetchPool":
+        """Return the run-wide pool, creating one with default limits for callers outside main()."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(DEFAULT_FETCH_WORKERS, DEFAULT_FETCHES_PER_HOST)
+            return cls._shared
+
+    def submit(self: Self, url: str, func: Callable[[], Any]) -> Future[Any]:
+        """Run a fetch of url on the pool once its host has a free slot."""
+        host = urlparse(url).netloc
+        result: Future[Any] = Future()
+        with self._lock:
+            if self._active[host] >= self.per_host:
+                # Queued fetches hold no thread, so one busy host never starves fetches to other hosts.
+                self._waiting[host].append((result, func))
+                return result
+            self._active[host] += 1
+        self._start(host, result, func)
+        return result
+
+    def _start(self: Self, host: str, result: Future[Any], func: Callable[[], Any]) -> None:
+        """Hand a fetch to a pool thread and release its host slot when it finishes."""
+        try:
+            future = self._executor.submit(func)
+        except RuntimeError as e:
+            # The pool only refuses work after shutdown, which happens when main() reconfigures it.
+            result.set_exception(e)
+            self._release(host)
+            return
+        future.add_done_callback(lambda done: self._finish(host, result, done))
+
+    def _finish(self: Self, host: str, result: Future[Any], done: Future[Any]) -> None:
+        """Publish a fetch's outcome and start the next fetch waiting for the same host."""
+        if (error := done.exception()) is not None:
+            result.set_exception(error)
+        else:
+            result.set_result(done.result())
+        self._release(host)
+
+    def _release(self: Self, host: str) -> None:
+        """Give a host slot to the next queued fetch, or free it."""
+        with self._lock:
+            if not self._waiting[host]:
+                self._active[host] -= 1
+                return
+            next_result, next_func = self._waiting[host].popleft()
+        self._start(host, next_result, next_func)
+
+    def shutdown(self: Self) -> None:
+        """Stop accepting fetches and let running ones finish in the background."""
+        self._executor.shutdown(wait=False)
@@ -4,15 +4,15 @@ import re
 from typing import Self
 from urllib.parse import urlparse
 
-import requests
 from lastversion import latest
 from loguru import logger
 
 from src.app import APP
 from src.config import RevancedConfig
 from src.downloader.download import Downloader
+from src.downloader.release_cache import ReleaseMetadataCache
 from src.exceptions import DownloadError
-from src.utils import handle_request_response, request_timeout, update_changelog
+from src.utils import session, update_changelog
 
 
 class Github(Downloader):
@@ -38,13 +38,12 @@ class Github(Downloader):
         if self.config.personal_access_token:
             logger.debug("Using personal access token")
             headers["Authorization"] = f"Bearer {self.config.personal_access_token}"
-        response = requests.get(repo_url, headers=headers, timeout=request_timeout)
-        handle_request_response(response, repo_url)
+        release = ReleaseMetadataCache.get_json(repo_url, headers, session.get)
         if repo_name == "revanced-patches":
-            download_url = response.json()["assets"][1]["browser_download_url"]
+            download_url = release["assets"][1]["browser_download_url"]
         else:
-            download_url = response.json()["assets"][0]["browser_download_url"]
-        update_changelog(f"{owner}/{repo_name}", response.json())
+            download_url = release["assets"][0]["browser_download_url"]
+        update_changelog(f"{owner}/{repo_name}", release)
         self._download(download_url, file_name=app.app_name)
         return app.app_name, download_url
 
@@ -85,10 +84,9 @@ class Github(Downloader):
         }
         if config.personal_access_token:
             headers["Authorization"] = f"Bearer {config.personal_access_token}"
-        response = requests.get(api_url, headers=headers, timeout=request_timeout)
-        handle_request_response(response, api_url)
-        update_changelog(f"{github_repo_owner}/{github_repo_name}", response.json())
-        assets = response.json()["assets"]
+        release = ReleaseMetadataCache.get_json(api_url, headers, session.get)
+        update_changelog(f"{github_repo_owner}/{github_repo_name}", release)
+        assets = release["assets"]
         try:
             filter_pattern = re.compile(asset_filter)
         except re.error as e:
@@ -101,7 +99,7 @@ class Github(Downloader):
                 logger.debug(f"Found {assets_name} to be downloaded from {assets_url}")
                 # Return the full asset URL directly rather than the regex match group.
                 # This decouples the filter pattern from URL extraction and aligns with GitLab's behavior.
-                return response.json()["tag_name"], assets_url
+                return release["tag_name"], assets_url
         return "", ""
 
     @staticmethod
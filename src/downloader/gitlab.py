@@ -5,14 +5,14 @@ from collections.abc import Iterator
 from typing import Any, Self
 from urllib.parse import quote, urlparse
 
-import requests
 from loguru import logger
 
 from src.app import APP
 from src.config import RevancedConfig
 from src.downloader.download import Downloader
+from src.downloader.release_cache import ReleaseMetadataCache
 from src.exceptions import DownloadError
-from src.utils import handle_request_response, request_timeout, update_changelog
+from src.utils import session, update_changelog
 
 
 class Gitlab(Downloader):
@@ -161,9 +161,7 @@ class Gitlab(Downloader):
     ) -> tuple[str, str]:
         """Get matching assets from a GitLab release."""
         api_url = Gitlab._get_release_api_url(base_url, project_path, release_ref)
-        response = requests.get(api_url, headers=Gitlab._get_headers(config), timeout=request_timeout)
-        handle_request_response(response, api_url)
-        release = response.json()
+        release = ReleaseMetadataCache.get_json(api_url, Gitlab._get_headers(config), session.get)
         update_changelog(
             f"{urlparse(base_url).netloc}/{project_path}",
             Gitlab._normalize_changelog_response(base_url, project_path, release),
@@ -0,0 +1,72 @@
+"""Run-wide cache of scraped pages and the elements already parsed out of them."""
+
+from collections.abc import Callable, Iterable
+from threading import Lock
+from typing import Self, cast
+
+from bs4 import BeautifulSoup, Tag
+from bs4.filter import SoupStrainer
+
+from src.html_parsing import has_class, parse_html
+from src.patches_cache import SingleFlight
+
+
+class CachedPage(object):
+    """A fetched page parsed once, on its first lookup, into a tree that serves every later lookup."""
+
+    def __init__(self: Self, url: str, html: str, class_names: frozenset[str]) -> None:
+        self.url = url
+        self.html = html
+        self.class_names = class_names
+        self._tree: BeautifulSoup | None = None
+        self._lock = Lock()
+
+    def _parsed(self: Self) -> BeautifulSoup:
+        """Parse the page once, keeping only the subtrees of elements carrying a class the scrapers read."""
+        with self._lock:
+            if self._tree is None:
+                # One strainer for every class is cheaper than a full parse, while a strainer per class
+                # would parse the page again for each lookup.
+                strainer = SoupStrainer(class_=has_class(*self.class_names)) if self.class_names else None
+                self._tree = parse_html(self.html, strainer)
+            return self._tree
+
+    def find_by_class(self: Self, class_name: str) -> Tag | None:
+        """Return the first element carrying a class from the page's single parsed tree."""
+        if self.class_names and class_name not in self.class_names:
+            # The strained tree does not contain other classes, so a lookup outside the set would silently miss.
+            msg = f"{class_name!r} is not among the classes kept when parsing {self.url}"
+            raise ValueError(msg)
+        element = self._parsed().find(class_=class_name)
+        return element if isinstance(element, Tag) else None
+
+
+class PageCache(object):
+    """Pages keyed by URL, fetched at most once per run even when several workers ask for one at the same time.
+
+    Pages are parsed keeping only elements that carry one of class_names; an empty set keeps the whole page.
+    """
+
+    def __init__(self: Self, class_names: Iterable[str] = ()) -> None:
+        self.class_names = frozenset(class_names)
+        self._pages: dict[str, CachedPage] = {}
+        self._lock = Lock()
+        self._flight = SingleFlight()
+
+    def get(self: Self, url: str, fetch: Callable[[str], str]) -> CachedPage:
+        """Return the cached page for a URL, fetching it with fetch on first use."""
+        with self._lock:
+            if (page := self._pages.get(url)) is not None:
+                return page
+        return cast("CachedPage", self._flight.do(url, lambda: self._load(url, fetch)))
+
+    def _load(self: Self, url: str, fetch: Callable[[str], str]) -> CachedPage:
+        """Fetch a page unless a caller that finished just before this one already stored it."""
+        with self._lock:
+            if (page := self._pages.get(url)) is not None:
+                return page
+        # A failed fetch raises before anything is stored, so the next caller tries the network again.
+        page = CachedPage(url, fetch(url), self.class_names)
+        with self._lock:
+            self._pages[url] = page
+        return page
@@ -0,0 +1,111 @@
+"""Run-wide cache of GitHub and GitLab release API responses."""
+
+import json
+from collections.abc import Callable
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Any, ClassVar, Self
+from uuid import uuid4
+
+from loguru import logger
+from requests import Response
+
+from src.config import RevancedConfig
+from src.patches_cache import SingleFlight
+from src.utils import handle_request_response, request_timeout, status_code_304
+
+
+class ReleaseMetadataCache(object):
+    """Release JSON keyed by API URL, reused for the rest of a run and revalidated with ETags by the next run.
+
+    A release API URL already encodes the host, the repository and the release ref, so it is the cache key.
+    "latest" URLs move without notice, so persisted entries are only trusted across runs for an opt-in TTL.
+    """
+
+    _shared: ClassVar["ReleaseMetadataCache | None"] = None
+    # Parallel resource and app workers share the cache file, so reads and rewrites are serialized in-process.
+    _lock: ClassVar[Lock] = Lock()
+
+    def __init__(self: Self, cache_file: Path, ttl_seconds: int) -> None:
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, dict[str, Any]] | None = None
+        # URLs fetched or revalidated during this run are served from memory regardless of the TTL.
+        self._current: set[str] = set()
+        self._flight = SingleFlight()
+
+    @classmethod
+    def configure(cls: type["ReleaseMetadataCache"], config: RevancedConfig) -> None:
+        """Enable the run-wide cache unless the operator opted out or disabled caching altogether."""
+        if config.release_metadata_cache and not config.disable_caching:
+            cache_file = config.temp_folder.joinpath(config.release_metadata_cache_file_name)
+            cls._shared = cls(cache_file, config.release_metadata_ttl_seconds)
+        else:
+            cls._shared = None
+
+    @classmethod
+    def get_json(
+        cls: type["ReleaseMetadataCache"],
+        api_url: str,
+        headers: dict[str, str],
+        fetch: Callable[..., Response],
+    ) -> Any:
+        """Return the parsed JSON for a release API URL, through the run-wide cache when it is enabled."""
+        if (cache := cls._shared) is None:
+            response = fetch(api_url, headers=headers, timeout=request_timeout)
+            handle_request_response(response, api_url)
+            return response.json()
+        return cache.lookup(api_url, headers, fetch)
+
+    def _load(self: Self) -> dict[str, dict[str, Any]]:
+        """Read cached releases once per run; an unreadable file only costs fresh API calls."""
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.cache_file.read_text())
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable release metadata cache {self.cache_file}: {e}")
+                self._entries = {}
+        return self._entries
+
+    def _save(self: Self, entries: dict[str, dict[str, Any]]) -> None:
+        """Publish the cache file atomically so an interrupted run never leaves it truncated."""
+        partial_path = self.cache_file.with_name(f".{self.cache_file.name}.{uuid4().hex}.part")
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            partial_path.write_text(json.dumps(entries))
+            partial_path.replace(self.cache_file)
+        except OSError as e:
+            # Failing to cache must never fail the build; the release JSON is still returned to the caller.
+            partial_path.unlink(missing_ok=True)
+            logger.warning(f"Unable to write release metadata cache {self.cache_file}: {e}")
+
+    def lookup(self: Self, api_url: str, headers: dict[str, str], fetch: Callable[..., Response]) -> Any:
+        """Return release JSON for an API URL from the cache or the network."""
+        # Apps and resources that share a repository wait for one in-flight request instead of issuing their own.
+        return self._flight.do(api_url, lambda: self._revalidate(api_url, headers, fetch))
+
+    def _revalidate(self: Self, api_url: str, headers: dict[str, str], fetch: Callable[..., Response]) -> Any:
+        """Return this run's release JSON, or revalidate a persisted entry with If-None-Match once its TTL passed."""
+        with self._lock:
+            entry = self._load().get(api_url)
+        now = time()
+        if entry is not None and (api_url in self._current or now - entry["fetched_at"] < self.ttl_seconds):
+            return entry["payload"]
+        conditional_headers = {"If-None-Match": entry["etag"]} if entry is not None and entry.get("etag") else {}
+        response = fetch(api_url, headers={**headers, **conditional_headers}, timeout=request_timeout)
+        if entry is not None and conditional_headers and response.status_code == status_code_304:
+            # GitHub does not count 304 answers against the rate limit, which matters most for token-less runs.
+            logger.debug(f"Release metadata for {api_url} is unchanged")
+        else:
+            handle_request_response(response, api_url)
+            entry = {"payload": response.json(), "etag": response.headers.get("etag")}
+        entry["fetched_at"] = now
+        with self._lock:
+            entries = self._load()
+            entries[api_url] = entry
+            self._current.add(api_url)
+            self._save(entries)
+        return entry["payload"]
@@ -0,0 +1,106 @@
+"""Per-host request pacing that adapts to server pushback."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Condition, Lock
+from time import monotonic
+from typing import ClassVar, Self
+from urllib.parse import urlparse
+
+
+class HostThrottle(object):
+    """Token bucket that paces request starts, plus an AIMD window that bounds requests in flight.
+
+    Every successful response widens the window by roughly one request per window's worth of successes; pushback
+    halves it and empties the bucket, so workers that share a host slow down together instead of each escalating.
+    """
+
+    _registry: ClassVar[dict[str, "HostThrottle"]] = {}
+    _registry_lock: ClassVar[Lock] = Lock()
+
+    def __init__(self: Self, requests_per_second: float, burst: int, max_concurrency: int) -> None:
+        self.requests_per_second = requests_per_second
+        self.burst = max(burst, 1)
+        self.max_concurrency = max(max_concurrency, 1)
+        self._condition = Condition()
+        self._tokens = float(self.burst)
+        self._refilled_at = monotonic()
+        self._window = float(self.max_concurrency)
+        self._in_flight = 0
+        # Requests started before the last decrease report the same congestion event, so they must not halve again.
+        self._epoch = 0
+
+    @classmethod
+    def for_url(
+        cls: type["HostThrottle"],
+        url: str,
+        requests_per_second: float,
+        burst: int,
+        max_concurrency: int,
+    ) -> "HostThrottle":
+        """Return the run-wide throttle of a URL's host, creating it with the given limits on first use."""
+        host = urlparse(url).netloc
+        with cls._registry_lock:
+            if host not in cls._registry:
+                cls._registry[host] = cls(requests_per_second, burst, max_concurrency)
+            return cls._registry[host]
+
+    @property
+    def concurrency_limit(self: Self) -> int:
+        """Return how many requests may currently be in flight."""
+        return int(self._window)
+
+    def _refill(self: Self) -> None:
+        """Add the tokens earned since the last refill, up to the burst size."""
+        now = monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.requests_per_second)
+        self._refilled_at = now
+
+    def _acquire(self: Self) -> int:
+        """Block until the window has room and a token is available, then take both."""
+        with self._condition:
+            while True:
+                self._refill()
+                if self._in_flight < self.concurrency_limit and self._tokens >= 1:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    return self._epoch
+                # A full window waits for a release; otherwise only the time until the next token matters.
+                timeout = (
+                    None if self._in_flight >= self.concurrency_limit else (1 - self._tokens) / self.requests_per_second
+                )
+                self._condition.wait(timeout)
+
+    def _release(self: Self, epoch: int, outcome: "ThrottledRequest") -> None:
+        """Return a request's slot and adapt the window to how the server answered, if it answered at all."""
+        with self._condition:
+            self._in_flight -= 1
+            if outcome.pushed_back and epoch == self._epoch:
+                self._epoch += 1
+                self._window = max(1.0, self._window / 2)
+                self._tokens = 0.0
+            elif outcome.pushed_back is False:
+                self._window = min(float(self.max_concurrency), self._window + 1 / self._window)
+            self._condition.notify_all()
+
+    @contextmanager
+    def request(self: Self) -> Iterator["ThrottledRequest"]:
+        """Hold a request slot for the duration of the block; mark pushback on the yielded handle."""
+        handle = ThrottledRequest()
+        epoch = self._acquire()
+        try:
+            yield handle
+        except BaseException:
+            # A connection error says nothing about the server's rate limit, so the window is left as it is.
+            handle.pushed_back = None
+            raise
+        finally:
+            self._release(epoch, handle)
+
+
+class ThrottledRequest(object):
+    """Outcome of one throttled request, reported back to its host's throttle."""
+
+    def __init__(self: Self) -> None:
+        # None means no answer arrived, which neither widens nor narrows the window.
+        self.pushed_back: bool | None = False
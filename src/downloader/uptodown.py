@@ -2,14 +2,14 @@
 
 from typing import Any, Self
 
-import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 from loguru import logger
 
 from src.app import APP
 from src.downloader.download import Downloader
 from src.exceptions import UptoDownAPKDownloadError
-from src.utils import bs4_parser, handle_request_response, request_header, request_timeout
+from src.html_parsing import find_by_id
+from src.utils import handle_request_response, request_header, request_timeout, session
 
 
 class UptoDown(Downloader):
@@ -39,10 +39,9 @@ class UptoDown(Downloader):
 
     def extract_download_link(self: Self, page: str, app: str) -> tuple[str, str]:
         """Extract download link from uptodown url."""
-        r = requests.get(page, headers=request_header, allow_redirects=True, timeout=request_timeout)
+        r = session.get(page, headers=request_header, allow_redirects=True, timeout=request_timeout)
         handle_request_response(r, page)
-        soup = BeautifulSoup(r.text, bs4_parser)
-        detail_download_button = soup.find("button", id="detail-download-button")
+        detail_download_button = find_by_id(r.text, "button", "detail-download-button")
 
         if not isinstance(detail_download_button, Tag):
             msg = f"Unable to download {app} from uptodown."
@@ -81,9 +80,8 @@ class UptoDown(Downloader):
         """
         logger.debug("downloading specified version of app from uptodown.")
         url = f"{app.download_source}/versions"
-        html = requests.get(url, headers=request_header, timeout=request_timeout).text
-        soup = BeautifulSoup(html, bs4_parser)
-        detail_app_name = soup.find("h1", id="detail-app-name")
+        html = session.get(url, headers=request_header, timeout=request_timeout).text
+        detail_app_name = find_by_id(html, "h1", "detail-app-name")
 
         if not isinstance(detail_app_name, Tag):
             msg = f"Unable to download {app} from uptodown."
@@ -96,7 +94,7 @@ class UptoDown(Downloader):
 
         while not version_found:
             version_url = f"{app.download_source}/apps/{app_code}/versions/{version_page}"
-            r = requests.get(version_url, headers=request_header, timeout=request_timeout)
+            r = session.get(version_url, headers=request_header, timeout=request_timeout)
             handle_request_response(r, version_url)
             json = r.json()
 
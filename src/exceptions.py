@@ -84,6 +84,10 @@ class PatchingFailedError(BuilderError):
     """Patching Failed."""
 
 
+class JvmDaemonError(BuilderError):
+    """Warm JVM host could not start or stopped answering."""
+
+
 class AppNotFoundError(BuilderError):
     """Not a valid Revanced App."""
 
@@ -0,0 +1,34 @@
+"""HTML parsing for scraped pages, limited to the elements a caller actually needs."""
+
+from collections.abc import Callable
+
+from bs4 import BeautifulSoup, Tag
+from bs4.filter import SoupStrainer
+
+# The standard-library parser needs no extra dependency in the Docker image.
+html_parser = "html.parser"
+
+
+def parse_html(markup: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """Parse a page, keeping only the subtrees matched by parse_only."""
+    return BeautifulSoup(markup, html_parser, parse_only=parse_only)
+
+
+def has_class(*class_names: str) -> Callable[[str | list[str] | None], bool]:
+    """Match a class attribute the way find(class_=...) does for any of the names: the full value or one class."""
+
+    def matches(value: str | list[str] | None) -> bool:
+        if value is None:
+            return False
+        # The strainer sees the raw attribute before BeautifulSoup splits it into a class list.
+        classes = value.split() if isinstance(value, str) else list(value)
+        return any(class_name in classes or " ".join(classes) == class_name for class_name in class_names)
+
+    return matches
+
+
+def find_by_id(markup: str, tag_name: str, element_id: str) -> Tag | None:
+    """Return the element with an id, building only its subtree."""
+    soup = parse_html(markup, SoupStrainer(tag_name, id=element_id))
+    element = soup.find(tag_name, id=element_id)
+    return element if isinstance(element, Tag) else None
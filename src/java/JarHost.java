@@ -0,0 +1,207 @@
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.security.Permission;
+import java.util.Base64;
+import java.util.HashMap;
+import java.util.Map;
+import java.util.jar.Attributes;
+import java.util.jar.JarFile;
+
+/**
+ * Warm JVM host for the builder's jar invocations.
+ *
+ * <p>Launched as a single-file source program (`java -Djava.security.manager=allow JarHost.java`). Each stdin line is
+ * one request: a sentinel token followed by the Base64-encoded jar path and arguments, separated by tabs. Output of
+ * the hosted jar is framed as `O <line>` (stdout) or `E <line>` (stderr), and the request ends with
+ * `X <token> <exit code>`. Jars stay loaded between requests so later runs skip class loading and JIT warm-up.
+ */
+public final class JarHost {
+    private JarHost() {}
+
+    /** Carries the status a hosted jar passed to System.exit back to the request loop. */
+    private static final class ExitTrap extends SecurityException {
+        private static final long serialVersionUID = 1L;
+        private final int status;
+
+        ExitTrap(int status) {
+            super("System.exit(" + status + ")");
+            this.status = status;
+        }
+    }
+
+    /** Frames everything written to one standard stream as complete, channel-tagged protocol lines. */
+    private static final class LineFramer extends OutputStream {
+        private final PrintStream protocol;
+        private final char channel;
+        private final ByteArrayOutputStream line = new ByteArrayOutputStream();
+
+        LineFramer(PrintStream protocol, char channel) {
+            this.protocol = protocol;
+            this.channel = channel;
+        }
+
+        @Override
+        public void write(int b) {
+            synchronized (protocol) {
+                if (b == '\n') {
+                    emit();
+                } else {
+                    line.write(b);
+                }
+            }
+        }
+
+        @Override
+        public void write(byte[] bytes, int offset, int length) {
+            synchronized (protocol) {
+                for (int index = offset; index < offset + length; index++) {
+                    write(bytes[index]);
+                }
+            }
+        }
+
+        void finish() {
+            synchronized (protocol) {
+                if (line.size() > 0) {
+                    emit();
+                }
+            }
+        }
+
+        private void emit() {
+            String text = line.toString(StandardCharsets.UTF_8);
+            // Carriage returns from Windows-style logging would otherwise corrupt the line protocol.
+            if (text.endsWith("\r")) {
+                text = text.substring(0, text.length() - 1);
+            }
+            protocol.print(channel);
+            protocol.print(' ');
+            protocol.print(text);
+            protocol.print('\n');
+            protocol.flush();
+            line.reset();
+        }
+    }
+
+    public static void main(String[] args) throws Exception {
+        PrintStream protocol = new PrintStream(new FileOutputStream(FileDescriptor.out), false, StandardCharsets.UTF_8);
+        try {
+            System.setSecurityManager(new SecurityManager() {
+                @Override
+                public void checkExit(int status) {
+                    throw new ExitTrap(status);
+                }
+
+                @Override
+                public void checkPermission(Permission permission) {
+                    // Hosted jars keep every permission; the manager exists only to intercept System.exit.
+                }
+
+                @Override
+                public void checkPermission(Permission permission, Object context) {
+                    // See checkPermission(Permission).
+                }
+            });
+        } catch (UnsupportedOperationException | SecurityException e) {
+            // JDKs without a usable SecurityManager cannot trap System.exit, so the caller falls back to subprocesses.
+            protocol.println("UNSUPPORTED " + e);
+            protocol.flush();
+            return;
+        }
+
+        LineFramer out = new LineFramer(protocol, 'O');
+        LineFramer err = new LineFramer(protocol, 'E');
+        System.setOut(new PrintStream(out, true, StandardCharsets.UTF_8));
+        System.setErr(new PrintStream(err, true, StandardCharsets.UTF_8));
+        protocol.println("READY");
+        protocol.flush();
+
+        Map<String, Method> mains = new HashMap<>();
+        BufferedReader requests = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String request;
+        while ((request = requests.readLine()) != null) {
+            String[] fields = request.split("\t", -1);
+            String token = fields[0];
+            String jar = decode(fields[1]);
+            String[] jarArgs = new String[fields.length - 2];
+            for (int index = 2; index < fields.length; index++) {
+                jarArgs[index - 2] = decode(fields[index]);
+            }
+            int status = run(mains, jar, jarArgs);
+            System.out.flush();
+            System.err.flush();
+            out.finish();
+            err.finish();
+            synchronized (protocol) {
+                protocol.println("X " + token + " " + status);
+                protocol.flush();
+            }
+        }
+        // halt skips the exit trap and any non-daemon threads a hosted jar left behind.
+        Runtime.getRuntime().halt(0);
+    }
+
+    private static String decode(String field) {
+        return new String(Base64.getDecoder().decode(field), StandardCharsets.UTF_8);
+    }
+
+    private static int run(Map<String, Method> mains, String jar, String[] jarArgs) {
+        Thread current = Thread.currentThread();
+        ClassLoader previousLoader = current.getContextClassLoader();
+        try {
+            File jarFile = new File(jar);
+            // A re-downloaded jar at the same path must not reuse classes loaded from the old bytes.
+            String key = jarFile.getCanonicalPath() + ":" + jarFile.length() + ":" + jarFile.lastModified();
+            Method main = mains.get(key);
+            if (main == null) {
+                main = loadMain(jarFile);
+                mains.put(key, main);
+            }
+            current.setContextClassLoader(main.getDeclaringClass().getClassLoader());
+            main.invoke(null, (Object) jarArgs);
+            return 0;
+        } catch (InvocationTargetException e) {
+            for (Throwable cause = e.getCause(); cause != null; cause = cause.getCause()) {
+                if (cause instanceof ExitTrap trap) {
+                    return trap.status;
+                }
+            }
+            e.getCause().printStackTrace();
+            return 1;
+        } catch (ExitTrap trap) {
+            return trap.status;
+        } catch (Exception | LinkageError e) {
+            e.printStackTrace();
+            return 1;
+        } finally {
+            current.setContextClassLoader(previousLoader);
+        }
+    }
+
+    private static Method loadMain(File jarFile) throws Exception {
+        String mainClass;
+        try (JarFile jar = new JarFile(jarFile)) {
+            mainClass = jar.getManifest().getMainAttributes().getValue(Attributes.Name.MAIN_CLASS);
+        }
+        if (mainClass == null) {
+            throw new IllegalArgumentException(jarFile + " has no Main-Class manifest attribute");
+        }
+        // Each jar gets its own loader under the platform loader so jars never see each other's classes.
+        URLClassLoader loader = new URLClassLoader(
+            new URL[] {jarFile.toURI().toURL()},
+            ClassLoader.getPlatformClassLoader()
+        );
+        return Class.forName(mainClass, true, loader).getMethod("main", String[].class);
+    }
+}
@@ -0,0 +1,273 @@
+"""Memory-aware admission of JVM patch jobs."""
+
+import json
+import math
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Condition, Lock
+from typing import Any, ClassVar, Self
+from uuid import uuid4
+
+from loguru import logger
+
+from src.config import RevancedConfig
+from src.patches_cache import file_digest
+
+# Metaspace, code cache, thread stacks and GC structures live outside -Xmx, so every job reserves this on top.
+JVM_NON_HEAP_OVERHEAD_MB = 256
+# Patching a real app never fits below this heap, so tight budgets clamp here instead of starting doomed JVMs.
+MINIMUM_HEAP_MB = 512
+# Learned peaks are scaled up so a slightly larger app release does not run straight into OutOfMemoryError.
+HEAP_HEADROOM_FACTOR = 1.25
+# cgroup v1 reports an unlimited memory controller as a huge page-aligned number instead of "max".
+_CGROUP_V1_UNLIMITED_BYTES = 1 << 60
+_BYTES_PER_MB = 1024 * 1024
+
+# Unified JVM logging defaults to stdout, where CDS mismatch warnings would corrupt parsed list-patches output.
+CDS_LOGGING_OPTIONS = ("-Xlog:disable", "-Xlog:all=warning:stderr")
+# Archive names carry a prefix of the jar digest so a re-downloaded jar never maps classes from old bytes.
+_CDS_DIGEST_LENGTH = 16
+
+MEMINFO_PATH = Path("/proc/meminfo")
+CGROUP_V2_ROOT = Path("/sys/fs/cgroup")
+CGROUP_V1_MEMORY_ROOT = Path("/sys/fs/cgroup/memory")
+
+
+def _read_int(path: Path) -> int | None:
+    """Return the integer stored in a kernel pseudo-file, or None when it is missing or unlimited."""
+    try:
+        value = path.read_text().strip()
+    except OSError:
+        return None
+    if not value.isdigit():
+        # cgroup v2 writes "max" for unlimited controllers.
+        return None
+    return int(value)
+
+
+def _meminfo_available_mb() -> int | None:
+    """Return MemAvailable from /proc/meminfo in MiB."""
+    try:
+        lines = MEMINFO_PATH.read_text().splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        if line.startswith("MemAvailable:"):
+            # The kernel always reports this field in kB.
+            return int(line.split()[1]) // 1024
+    return None
+
+
+def _cgroup_available_mb() -> int | None:
+    """Return the memory still available to this container under its cgroup limit in MiB."""
+    limit = _read_int(CGROUP_V2_ROOT.joinpath("memory.max"))
+    usage = _read_int(CGROUP_V2_ROOT.joinpath("memory.current"))
+    if limit is None:
+        limit = _read_int(CGROUP_V1_MEMORY_ROOT.joinpath("memory.limit_in_bytes"))
+        usage = _read_int(CGROUP_V1_MEMORY_ROOT.joinpath("memory.usage_in_bytes"))
+        if limit is not None and limit >= _CGROUP_V1_UNLIMITED_BYTES:
+            limit = None
+    if limit is None:
+        return None
+    return max(limit - (usage or 0), 0) // _BYTES_PER_MB
+
+
+def available_memory_mb() -> int | None:
+    """Return the memory the builder may use for JVMs, honouring both host and container limits."""
+    candidates = [value for value in (_meminfo_available_mb(), _cgroup_available_mb()) if value is not None]
+    return min(candidates) if candidates else None
+
+
+def available_cpus() -> int:
+    """Return how many CPUs this process may use, honouring a cgroup v2 CPU quota."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        quota, period = CGROUP_V2_ROOT.joinpath("cpu.max").read_text().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota.isdigit() and period.isdigit() and int(period) > 0:
+        # A fractional quota still allows one JVM, so the slot count is rounded up.
+        cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    return cpus
+
+
+def wait_for_exit(process: Any) -> tuple[int, int | None]:
+    """Reap a finished child and return its exit code plus peak resident memory in MiB when measurable."""
+    pid = getattr(process, "pid", None)
+    if not isinstance(pid, int) or not hasattr(os, "wait4"):
+        return process.wait(), None
+    # wait4 reports the child's own rusage, unlike RUSAGE_CHILDREN which mixes every concurrent JVM together.
+    _, status, rusage = os.wait4(pid, 0)
+    return_code = os.waitstatus_to_exitcode(status)
+    # Popen must learn the exit code here because the child can no longer be reaped a second time.
+    process.returncode = return_code
+    # Linux reports ru_maxrss in KiB.
+    return return_code, rusage.ru_maxrss // 1024
+
+
+def daemon_pool_mb(config: RevancedConfig) -> int:
+    """Return the memory the warm daemon pool can hold, since its fixed heaps are never handed back to patch jobs."""
+    if not config.jvm_daemon:
+        return 0
+    return config.jvm_daemon_pool_size * (config.jvm_default_heap_mb + JVM_NON_HEAP_OVERHEAD_MB)
+
+
+class JvmAdmission(object):
+    """Admit patch JVMs only while their estimated memory fits the runner and a CPU slot is free."""
+
+    _instances: ClassVar[dict[Path, "JvmAdmission"]] = {}
+    _instances_lock: ClassVar[Lock] = Lock()
+
+    def __init__(
+        self: Self,
+        estimates_file: Path,
+        default_heap_mb: int,
+        memory_budget_mb: int | None,
+        cpus: int,
+    ) -> None:
+        self.estimates_file = estimates_file
+        self.default_heap_mb = default_heap_mb
+        self.memory_budget_mb = memory_budget_mb
+        self.cpus = cpus
+        self._condition = Condition()
+        self._reserved_mb = 0
+        self._running = 0
+        self._estimates: dict[str, int] = self._load_estimates()
+
+    @classmethod
+    def shared(cls: type["JvmAdmission"], config: RevancedConfig) -> "JvmAdmission":
+        """Return the run-wide controller so every app worker draws from one memory budget."""
+        estimates_file = config.temp_folder.joinpath(config.jvm_heap_estimates_file_name)
+        with cls._instances_lock:
+            if estimates_file not in cls._instances:
+                available_mb = available_memory_mb()
+                # The budget is sampled once up front so memory held by our own running JVMs is not counted twice.
+                reserved_mb = config.jvm_memory_reserve_mb + daemon_pool_mb(config)
+                budget_mb = None if available_mb is None else max(available_mb - reserved_mb, 0)
+                cpus = available_cpus()
+                logger.info(f"JVM admission budget: {budget_mb} MiB of memory and {cpus} CPUs")
+                cls._instances[estimates_file] = cls(estimates_file, config.jvm_default_heap_mb, budget_mb, cpus)
+            return cls._instances[estimates_file]
+
+    def _load_estimates(self: Self) -> dict[str, int]:
+        """Read peak memory learned from earlier runs."""
+        try:
+            data = json.loads(self.estimates_file.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable JVM heap estimates {self.estimates_file.name}: {e}")
+            return {}
+        return {str(app_name): int(peak_mb) for app_name, peak_mb in data.items()}
+
+    def heap_mb(self: Self, app_name: str) -> int:
+        """Return the -Xmx value for an app from its learned peak, or the configured default when unseen."""
+        if (peak_mb := self._estimates.get(app_name)) is None:
+            heap_mb = self.default_heap_mb
+        else:
+            heap_mb = math.ceil(max(peak_mb - JVM_NON_HEAP_OVERHEAD_MB, 0) * HEAP_HEADROOM_FACTOR)
+        if self.memory_budget_mb is not None:
+            # A job larger than the whole runner would never be admitted, so its heap is capped at the budget.
+            heap_mb = min(heap_mb, self.memory_budget_mb - JVM_NON_HEAP_OVERHEAD_MB)
+        return max(heap_mb, MINIMUM_HEAP_MB)
+
+    def _fits(self: Self, cost_mb: int) -> bool:
+        """Check whether another job with this cost may start now."""
+        if self._running == 0:
+            # The first job always starts, otherwise an undersized runner would deadlock instead of trying.
+            return True
+        if self._running >= self.cpus:
+            return False
+        return self.memory_budget_mb is None or self._reserved_mb + cost_mb <= self.memory_budget_mb
+
+    @contextmanager
+    def admit(self: Self, app_name: str) -> Iterator[int]:
+        """Block until the app's JVM fits, then yield the heap size it must be started with."""
+        heap_mb = self.heap_mb(app_name)
+        cost_mb = heap_mb + JVM_NON_HEAP_OVERHEAD_MB
+        with self._condition:
+            if not self._fits(cost_mb):
+                logger.info(f"Waiting for {cost_mb} MiB of JVM memory to patch {app_name}")
+                self._condition.wait_for(lambda: self._fits(cost_mb))
+            self._reserved_mb += cost_mb
+            self._running += 1
+        try:
+            yield heap_mb
+        finally:
+            with self._condition:
+                self._reserved_mb -= cost_mb
+                self._running -= 1
+                self._condition.notify_all()
+
+    def record(self: Self, app_name: str, peak_mb: int | None) -> None:
+        """Persist a finished job's peak resident memory as the next run's estimate."""
+        if peak_mb is None:
+            return
+        with self._condition:
+            self._estimates[app_name] = peak_mb
+            estimates = dict(self._estimates)
+        partial_path = self.estimates_file.with_name(f".{self.estimates_file.name}.{uuid4().hex}.part")
+        try:
+            self.estimates_file.parent.mkdir(parents=True, exist_ok=True)
+            partial_path.write_text(json.dumps(estimates, indent=2, sort_keys=True))
+            partial_path.replace(self.estimates_file)
+        except OSError as e:
+            # Losing an estimate only costs the default heap next run, so it must never fail the build.
+            partial_path.unlink(missing_ok=True)
+            logger.warning(f"Unable to save JVM heap estimates: {e}")
+
+
+class ClassDataSharing(object):
+    """Per-jar AppCDS archives that let repeated CLI and APKEditor launches skip class parsing."""
+
+    enabled: ClassVar[bool] = False
+    _lock: ClassVar[Lock] = Lock()
+    # Archives being dumped by a running JVM; concurrent launches skip CDS rather than read a half-written file.
+    _creating: ClassVar[set[Path]] = set()
+
+    @classmethod
+    def configure(cls: type["ClassDataSharing"], config: RevancedConfig) -> None:
+        """Enable archive generation for this run when the operator has not turned it off."""
+        cls.enabled = config.jvm_class_data_sharing
+
+    @staticmethod
+    def archive_path(jar_file: Path) -> Path:
+        """Return the archive stored next to a jar for its current contents."""
+        return jar_file.with_name(f"{jar_file.name}.{file_digest(jar_file)[:_CDS_DIGEST_LENGTH]}.jsa")
+
+    @classmethod
+    @contextmanager
+    def java_options(cls: type["ClassDataSharing"], jar_file: Path) -> Iterator[list[str]]:
+        """Yield the JVM options that use or create the jar's archive for the duration of one launch."""
+        if not cls.enabled or not jar_file.is_file():
+            yield []
+            return
+        archive = cls.archive_path(jar_file)
+        # Auto-creation is always requested so an archive the JVM rejects (e.g. after a JDK update) is dumped again.
+        options = [f"-XX:SharedArchiveFile={archive}", "-XX:+AutoCreateSharedArchive", *CDS_LOGGING_OPTIONS]
+        creating = False
+        with cls._lock:
+            if archive in cls._creating:
+                options = []
+            elif not archive.is_file():
+                # The first launch of a jar dumps its loaded classes at exit; later launches map them read-only.
+                creating = True
+                cls._creating.add(archive)
+                cls._remove_stale_archives(jar_file, archive)
+        try:
+            yield options
+        finally:
+            if creating:
+                # Only the creating launch clears the guard, so a skipped launch ending early cannot lift it.
+                with cls._lock:
+                    cls._creating.discard(archive)
+
+    @staticmethod
+    def _remove_stale_archives(jar_file: Path, archive: Path) -> None:
+        """Delete archives created for earlier versions of a jar stored under the same name."""
+        for stale_archive in jar_file.parent.glob(f"{jar_file.name}.*.jsa"):
+            if stale_archive != archive:
+                logger.debug(f"Removing stale class-data archive {stale_archive.name}")
+                stale_archive.unlink(missing_ok=True)
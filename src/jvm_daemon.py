@@ -0,0 +1,177 @@
+"""Optional pool of warm JVMs that run the builder's jar commands without per-invocation startup."""
+
+import atexit
+import base64
+from collections.abc import Callable
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from subprocess import PIPE, Popen, TimeoutExpired
+from threading import Lock
+from typing import ClassVar, Self
+from uuid import uuid4
+
+from loguru import logger
+
+from src.config import RevancedConfig
+from src.exceptions import JvmDaemonError
+
+JAR_HOST_SOURCE = Path(__file__).parent.joinpath("java", "JarHost.java")
+# The host relies on SecurityManager to turn System.exit into an exit code instead of killing the daemon.
+JAR_HOST_JVM_OPTIONS = ("-Djava.security.manager=allow",)
+# Output callbacks receive "O" for the jar's stdout and "E" for its stderr.
+STDOUT_CHANNEL = "O"
+STDERR_CHANNEL = "E"
+_SHUTDOWN_TIMEOUT = 10
+# Waiting workers wake up periodically so a host that died while they queued cannot strand them.
+_IDLE_POLL_SECONDS = 1
+
+
+def _encode(value: str) -> str:
+    """Base64-encode a protocol field so tabs and newlines in arguments cannot break request framing."""
+    return base64.b64encode(value.encode()).decode()
+
+
+class JvmDaemon(object):
+    """One warm JVM host process that runs jar main methods one request at a time."""
+
+    def __init__(self: Self, java_options: list[str]) -> None:
+        self._process = Popen(
+            ["java", *java_options, *JAR_HOST_JVM_OPTIONS, str(JAR_HOST_SOURCE)],
+            stdin=PIPE,
+            stdout=PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        handshake = self._readline()
+        if handshake != "READY":
+            self.close()
+            msg = f"JVM daemon did not start: {handshake or 'no handshake'}"
+            raise JvmDaemonError(msg)
+
+    def _readline(self: Self) -> str | None:
+        """Return the next protocol line without its newline, or None once the host has exited."""
+        if self._process.stdout is None:
+            return None
+        line = self._process.stdout.readline()
+        return line.rstrip("\n") if line else None
+
+    def run(self: Self, jar_file: str, jar_args: list[str], on_output: Callable[[str, str], None]) -> int:
+        """Run a jar's main method in the host and return the status it exited with."""
+        if self._process.stdin is None:
+            msg = "JVM daemon stdin is closed"
+            raise JvmDaemonError(msg)
+        # A fresh token per request means stray raw output from the jar can never end the request early.
+        token = uuid4().hex
+        self._process.stdin.write("\t".join([token, _encode(jar_file), *map(_encode, jar_args)]) + "\n")
+        self._process.stdin.flush()
+        end_marker = f"X {token} "
+        while (line := self._readline()) is not None:
+            if line.startswith(end_marker):
+                return int(line.removeprefix(end_marker))
+            channel, _, text = line.partition(" ")
+            if channel not in {STDOUT_CHANNEL, STDERR_CHANNEL}:
+                # Writes that bypass System.out reach the protocol unframed, so they are treated as stdout.
+                channel, text = STDOUT_CHANNEL, line
+            on_output(channel, text)
+        msg = f"JVM daemon exited while running {Path(jar_file).name}"
+        raise JvmDaemonError(msg)
+
+    def close(self: Self) -> None:
+        """Ask the host to exit by closing its stdin, killing it if it does not stop in time."""
+        if self._process.stdin is not None:
+            self._process.stdin.close()
+        try:
+            self._process.wait(timeout=_SHUTDOWN_TIMEOUT)
+        except TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+
+class JvmDaemonPool(object):
+    """Bounded set of warm JVM hosts shared by all app workers, started lazily on first use."""
+
+    _shared: ClassVar["JvmDaemonPool | None"] = None
+
+    def __init__(self: Self, size: int, java_options: list[str]) -> None:
+        self.size = size
+        self.java_options = java_options
+        self._idle: SimpleQueue[JvmDaemon] = SimpleQueue()
+        self._daemons: list[JvmDaemon] = []
+        self._lock = Lock()
+        self._disabled = False
+
+    def _acquire(self: Self) -> JvmDaemon | None:
+        """Return an idle host, start a new one while below the pool size, or wait for one to be released."""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except Empty:
+                pass
+            with self._lock:
+                if self._disabled:
+                    return None
+                if len(self._daemons) < self.size:
+                    try:
+                        daemon = JvmDaemon(self.java_options)
+                    except (OSError, JvmDaemonError) as e:
+                        # A JDK that cannot host jars will never succeed, so the whole run uses subprocesses instead.
+                        logger.warning(f"Disabling JVM daemon mode and falling back to subprocesses: {e}")
+                        self._disabled = True
+                        return None
+                    self._daemons.append(daemon)
+                    return daemon
+            try:
+                return self._idle.get(timeout=_IDLE_POLL_SECONDS)
+            except Empty:
+                continue
+
+    def run(self: Self, java_args: list[str], on_output: Callable[[str, str], None]) -> int | None:
+        """Run `java <java_args>` in a warm host, returning None when the caller must use a subprocess instead."""
+        if "-jar" not in java_args:
+            return None
+        # Per-invocation JVM options such as -Xmx cannot change a running host, so only the jar command is forwarded.
+        jar_index = java_args.index("-jar") + 1
+        jar_file, jar_args = java_args[jar_index], java_args[jar_index + 1 :]
+        if (daemon := self._acquire()) is None:
+            return None
+        try:
+            return_code = daemon.run(jar_file, jar_args, on_output)
+        except (OSError, ValueError, JvmDaemonError) as e:
+            # A host closed during shutdown raises ValueError on its stdin, which is handled like a crashed host.
+            logger.warning(f"JVM daemon failed running {Path(jar_file).name}; retrying in a subprocess: {e}")
+            daemon.close()
+            with self._lock:
+                if daemon in self._daemons:
+                    self._daemons.remove(daemon)
+            return None
+        self._idle.put(daemon)
+        return return_code
+
+    def close(self: Self) -> None:
+        """Stop every host started by this pool."""
+        with self._lock:
+            daemons, self._daemons = self._daemons, []
+            self._disabled = True
+        for daemon in daemons:
+            daemon.close()
+
+    @classmethod
+    def configure(cls: type["JvmDaemonPool"], config: RevancedConfig) -> None:
+        """Enable the run-wide pool when the operator opted into daemon mode."""
+        if not config.jvm_daemon or cls._shared is not None:
+            return
+        logger.info(f"Running jar commands in up to {config.jvm_daemon_pool_size} warm JVM daemons")
+        cls._shared = cls(config.jvm_daemon_pool_size, [f"-Xmx{config.jvm_default_heap_mb}m"])
+        atexit.register(cls._shared.close)
+
+    @classmethod
+    def run_shared(
+        cls: type["JvmDaemonPool"],
+        java_args: list[str],
+        on_output: Callable[[str, str], None],
+    ) -> int | None:
+        """Run a java command in the run-wide pool, or return None when daemon mode is off or unavailable."""
+        if cls._shared is None:
+            return None
+        return cls._shared.run(java_args, on_output)
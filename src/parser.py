@@ -1,6 +1,7 @@
 """Revanced Parser."""
 
 import json
+from pathlib import Path
 from subprocess import PIPE, STDOUT, Popen
 from time import perf_counter
 from typing import Any, Self
@@ -11,6 +12,8 @@ from src.app import APP
 from src.cli_args import DEFAULT_PATCH_ARGS, append_cli_argument
 from src.config import RevancedConfig
 from src.exceptions import PatchingFailedError
+from src.jvm import ClassDataSharing, JvmAdmission, wait_for_exit
+from src.jvm_daemon import JvmDaemonPool
 from src.patches import Patches
 from src.utils import possible_archs
 
@@ -445,6 +448,40 @@ class Parser(object):
             app.get_cli_temporary_files_path(self.config),
         )
 
+    @staticmethod
+    def _run_patch_subprocess(args: list[str]) -> tuple[int, int | None]:
+        """Run the CLI in a java subprocess, stream its log and return the exit code with the JVM's peak memory."""
+        with ClassDataSharing.java_options(Path(args[args.index("-jar") + 1])) as cds_options:
+            # stderr is merged into stdout so CLI failures are visible in the existing build log stream.
+            process = Popen(["java", *cds_options, *args], stdout=PIPE, stderr=STDOUT)
+            output = process.stdout
+            if not output:
+                msg = "Failed to send request for patching."
+                raise PatchingFailedError(msg)
+            for line in output:
+                logger.debug(line.decode(), flush=True, end="")
+            return wait_for_exit(process)
+
+    def _run_patch_command(self: Self, args: list[str], app: APP) -> tuple[int, float]:
+        """Run the CLI with java and return the exit code with the seconds spent patching."""
+        logger.debug(f"Sending request to revanced cli for building with args java {args}")
+        start = perf_counter()
+        # Daemon output is logged like subprocess output. A warm host's heap was fixed when it started, so it bypasses
+        # admission instead of reserving memory for an -Xmx it would ignore.
+        return_code = JvmDaemonPool.run_shared(args, lambda _channel, text: logger.debug(text))
+        if return_code is not None:
+            return return_code, perf_counter() - start
+        if not self.config.jvm_admission_control:
+            return_code, _ = self._run_patch_subprocess(args)
+            return return_code, perf_counter() - start
+        # Parallel patch workers queue here until their learned heap fits the runner's free memory.
+        admission = JvmAdmission.shared(self.config)
+        with admission.admit(app.app_name) as heap_mb:
+            start = perf_counter()
+            return_code, peak_mb = self._run_patch_subprocess([f"-Xmx{heap_mb}m", *args])
+        admission.record(app.app_name, peak_mb)
+        return return_code, perf_counter() - start
+
     # noinspection IncorrectFormatting
     def patch_app(
         self: Self,
@@ -483,18 +520,8 @@ class Parser(object):
             # Removing the target first prevents a stale APK from masking a failed patch command.
             output_file_path.unlink()
 
-        start = perf_counter()
-        logger.debug(f"Sending request to revanced cli for building with args java {args}")
-        # stderr is merged into stdout so CLI failures are visible in the existing build log stream.
-        process = Popen(["java", *args], stdout=PIPE, stderr=STDOUT)
-        output = process.stdout
-        if not output:
-            msg = "Failed to send request for patching."
-            raise PatchingFailedError(msg)
-        for line in output:
-            logger.debug(line.decode(), flush=True, end="")
+        return_code, elapsed = self._run_patch_command(args, app)
         # A non-zero CLI exit means the APK was not patched even if the command produced log output.
-        return_code = process.wait()
         if return_code != 0:
             output_was_written = output_file_path.is_file() and output_file_path.stat().st_size > 0
             if self._patch_args["CONTINUE_ON_ERROR"] and output_was_written:
@@ -506,4 +533,4 @@ class Parser(object):
                 return
             msg = f"ReVanced CLI exited with code {return_code} for {app.app_name}."
             raise PatchingFailedError(msg)
-        logger.info(f"Patching completed for app {app} in {perf_counter() - start:.2f} seconds.")
+        logger.info(f"Patching completed for app {app} in {elapsed:.2f} seconds.")
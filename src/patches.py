@@ -2,6 +2,7 @@
 
 import contextlib
 import re
+from threading import Lock
 from typing import Any, ClassVar, Self
 
 from loguru import logger
@@ -10,9 +11,46 @@ from packaging.version import InvalidVersion, Version
 from src.app import APP
 from src.config import RevancedConfig
 from src.exceptions import AppNotFoundError
+from src.patches_cache import PatchesMetadataCache
 from src.patches_gen import convert_command_output_to_json
 
 
+class PatchIndex(object):
+    """Package-keyed view of one bundle's parsed patches, built once and shared by every app in a run."""
+
+    # Index builds are memoized by list identity; parsed lists are shared in-run by the list-patches caches.
+    _max_indexes: ClassVar[int] = 16
+    _indexes: ClassVar[dict[int, tuple[list[dict[Any, Any]], "PatchIndex"]]] = {}
+    _lock: ClassVar[Lock] = Lock()
+
+    def __init__(self: Self, patches: list[dict[Any, Any]]) -> None:
+        self.universal: list[dict[Any, Any]] = []
+        self.by_package: dict[str, list[tuple[dict[Any, Any], list[str]]]] = {}
+        for patch in patches:
+            if not patch["compatiblePackages"]:
+                self.universal.append(patch)
+                continue
+            for compatible_package in patch["compatiblePackages"]:
+                # Bundle order is preserved per package so the first advertised entry still wins de-duplication.
+                self.by_package.setdefault(compatible_package["name"], []).append(
+                    (patch, compatible_package["versions"]),
+                )
+
+    @classmethod
+    def for_patches(cls: type["PatchIndex"], patches: list[dict[Any, Any]]) -> "PatchIndex":
+        """Return the shared index for a parsed bundle, building it on first use."""
+        with cls._lock:
+            cached = cls._indexes.get(id(patches))
+            # The list is kept alongside its index so its id cannot be recycled by another bundle during the run.
+            if cached is None or cached[0] is not patches:
+                cached = (patches, cls(patches))
+                cls._indexes[id(patches)] = cached
+                # Runs only touch a handful of bundles, so the oldest index is dropped once the bound is exceeded.
+                if len(cls._indexes) > cls._max_indexes:
+                    cls._indexes.pop(next(iter(cls._indexes)))
+            return cached[1]
+
+
 class Patches(object):
     """Revanced Patches."""
 
@@ -144,6 +182,8 @@ class Patches(object):
             The `app` parameter is of type `APP`. It represents an instance of the `APP` class.
         """
         self.patches_dict[app.app_name] = []
+        self._patch_names[app.app_name] = set()
+        metadata_cache = self._metadata_cache(config)
 
         # Handle multiple patch bundles
         if hasattr(app, "patch_bundles") and app.patch_bundles:
@@ -153,6 +193,7 @@ class Patches(object):
                     f"{config.temp_folder}/{bundle["file_name"]}",
                     app.cli_lp_args,
                     app.get_cli_temporary_files_path(config),
+                    metadata_cache=metadata_cache,
                 )
                 self._process_patches(patches, app)
         elif "patches" in app.resource:
@@ -162,11 +203,20 @@ class Patches(object):
                 f"{config.temp_folder}/{app.resource["patches"]["file_name"]}",
                 app.cli_lp_args,
                 app.get_cli_temporary_files_path(config),
+                metadata_cache=metadata_cache,
             )
             self._process_patches(patches, app)
 
         app.no_of_patches = len(self.patches_dict[app.app_name])
 
+    @staticmethod
+    def _metadata_cache(config: RevancedConfig) -> PatchesMetadataCache | None:
+        """Return the persistent list-patches cache unless the operator disabled caching for this run."""
+        if config.disable_caching or config.patches_metadata_cache_size <= 0:
+            return None
+        cache_dir = config.temp_folder.joinpath(config.patches_metadata_cache_folder_name)
+        return PatchesMetadataCache(cache_dir, config.patches_metadata_cache_size)
+
     def _create_patch_dict(
         self: Self,
         patch: dict[Any, Any],
@@ -254,7 +304,7 @@ class Patches(object):
         bool
             True if patch already exists
         """
-        return any(existing["name"] == patch_name for existing in self.patches_dict[app_name])
+        return patch_name in self._patch_names[app_name]
 
     def _process_universal_patch(self: Self, patch: dict[Any, Any]) -> None:
         """Process a universal patch (no compatible packages).
@@ -267,25 +317,23 @@ class Patches(object):
         patch_dict = self._create_patch_dict(patch, "universal", "all")
         self.patches_dict["universal_patch"].append(patch_dict)
 
-    def _process_app_specific_patch(self: Self, patch: dict[Any, Any], app: APP) -> None:
-        """Process patches that are specific to certain apps.
+    def _process_app_specific_patch(self: Self, patch: dict[Any, Any], versions: list[str], app: APP) -> None:
+        """Process a patch that is compatible with the app's package.
 
         Parameters
         ----------
         patch : dict[Any, Any]
             The patch data
+        versions : list[str]
+            The versions the patch supports for the app's package
         app : APP
             The app instance
         """
-        for compatible_package in patch["compatiblePackages"]:
-            package_name = compatible_package["name"]
-            versions = compatible_package["versions"]
-
-            if app.package_name == package_name:
-                patch_dict = self._create_patch_dict(patch, package_name, versions)
-
-                if not self._is_duplicate_patch(patch_dict["name"], app.app_name):
-                    self.patches_dict[app.app_name].append(patch_dict)
+        if self._is_duplicate_patch(patch["name"], app.app_name):
+            return
+        patch_dict = self._create_patch_dict(patch, app.package_name, versions)
+        self.patches_dict[app.app_name].append(patch_dict)
+        self._patch_names[app.app_name].add(patch_dict["name"])
 
     def _process_patches(self: Self, patches: list[dict[Any, Any]], app: APP) -> None:
         """Process patches from a single bundle and add them to the patches dict.
@@ -297,14 +345,17 @@ class Patches(object):
         app : APP
             The app instance
         """
-        for patch in patches:
-            if not patch["compatiblePackages"]:
-                self._process_universal_patch(patch)
-            else:
-                self._process_app_specific_patch(patch, app)
+        patch_index = PatchIndex.for_patches(patches)
+        for patch in patch_index.universal:
+            self._process_universal_patch(patch)
+        # Only this app's package is visited instead of every compatible package of every patch in the bundle.
+        for patch, versions in patch_index.by_package.get(app.package_name, []):
+            self._process_app_specific_patch(patch, versions, app)
 
     def __init__(self: Self, config: RevancedConfig, app: APP) -> None:
         self.patches_dict: dict[str, list[dict[str, str]]] = {"universal_patch": []}
+        # Names mirror patches_dict so duplicate checks across bundles stay constant-time.
+        self._patch_names: dict[str, set[str]] = {}
         self.fetch_patches(config, app)
 
     def get(self: Self, app: str) -> tuple[list[dict[str, str]], str]:
@@ -0,0 +1,151 @@
+"""Content-addressed cache for parsed list-patches metadata."""
+
+import hashlib
+import json
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any, ClassVar, Self
+from uuid import uuid4
+
+from loguru import logger
+
+# Hashing reads artifacts in bounded chunks so large CLI jars never need to fit in memory at once.
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Bump when the parsed dict schema changes so stale entries from older builders are never served.
+_CACHE_SCHEMA_VERSION = "1"
+
+
+@lru_cache(maxsize=64)
+def _file_digest(file_identity: tuple[str, int, int]) -> str:
+    """Hash a file once per (path, size, mtime) so apps sharing a bundle do not re-read it."""
+    digest = hashlib.sha256()
+    with Path(file_identity[0]).open("rb") as file:
+        while chunk := file.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 of a file, reusing earlier results while the file is unchanged."""
+    stat = path.stat()
+    # Size and mtime are part of the memo key, so a re-downloaded artifact is always hashed again.
+    return _file_digest((str(path.resolve()), stat.st_size, stat.st_mtime_ns))
+
+
+class SingleFlight(object):
+    """Collapse concurrent calls that share a key into one execution whose result every caller receives."""
+
+    def __init__(self: Self) -> None:
+        self._lock = Lock()
+        self._in_flight: dict[Hashable, Future[Any]] = {}
+
+    def do(self: Self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Run func for key unless another thread is already running it, in which case wait for that result."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+        if not is_leader:
+            # Followers block on the leader instead of starting a second identical JVM.
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # Only in-flight work is shared; once settled, later callers go through the persistent cache again.
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+
+class PatchesMetadataCache(object):
+    """Size-bounded on-disk store of list-patches output keyed by CLI, bundle and argument digests."""
+
+    # Parallel app workers share one cache folder, so eviction and publishing are serialized in-process.
+    _lock: ClassVar[Lock] = Lock()
+    # Entries already read this run are handed out as the same list, letting apps share one patch index per bundle.
+    _max_loaded: ClassVar[int] = 16
+    _loaded: ClassVar[dict[str, list[dict[Any, Any]]]] = {}
+
+    def __init__(self: Self, cache_dir: Path, max_entries: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(cli_file: Path, patches_file: Path, list_patches_args: dict[str, str]) -> str:
+        """Build the content address for one list-patches invocation."""
+        key_material = {
+            "schema": _CACHE_SCHEMA_VERSION,
+            "cli": file_digest(cli_file),
+            "patches": file_digest(patches_file),
+            # Different flag maps produce different CLI output, so the resolved map is part of the address.
+            "args": sorted(list_patches_args.items()),
+        }
+        return hashlib.sha256(json.dumps(key_material, sort_keys=True).encode()).hexdigest()
+
+    def _entry_path(self: Self, key: str) -> Path:
+        """Return the JSON file that stores one cache entry."""
+        return self.cache_dir.joinpath(f"{key}.json")
+
+    def load(self: Self, key: str) -> list[dict[Any, Any]] | None:
+        """Return cached metadata for a key, or None when it is missing or unreadable."""
+        if key in self._loaded:
+            return self._loaded[key]
+        entry_path = self._entry_path(key)
+        try:
+            with entry_path.open() as file:
+                data: list[dict[Any, Any]] = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            # A truncated entry is treated as a miss so the next CLI run rewrites it.
+            logger.warning(f"Ignoring unreadable patches metadata cache entry {entry_path.name}: {e}")
+            entry_path.unlink(missing_ok=True)
+            return None
+        # Touching the entry makes eviction least-recently-used instead of least-recently-written.
+        entry_path.touch(exist_ok=True)
+        self._remember(key, data)
+        return data
+
+    def store(self: Self, key: str, data: list[dict[Any, Any]]) -> None:
+        """Publish metadata for a key atomically and evict the oldest entries beyond the size bound."""
+        if self.max_entries <= 0:
+            return
+        self._remember(key, data)
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entry_path = self._entry_path(key)
+            partial_path = entry_path.with_name(f".{entry_path.name}.{uuid4().hex}.part")
+            try:
+                partial_path.write_text(json.dumps(data))
+                partial_path.replace(entry_path)
+            except OSError as e:
+                # Failing to cache must never fail the build; the parsed data is still returned to the caller.
+                partial_path.unlink(missing_ok=True)
+                logger.warning(f"Unable to write patches metadata cache entry {entry_path.name}: {e}")
+                return
+            self._evict()
+
+    def _remember(self: Self, key: str, data: list[dict[Any, Any]]) -> None:
+        """Keep a parsed entry for the rest of the run, dropping the oldest once the in-memory bound is exceeded."""
+        with self._lock:
+            self._loaded[key] = data
+            # Runs only touch a handful of bundles, matching the bound on the patch indexes built from these lists.
+            if len(self._loaded) > self._max_loaded:
+                self._loaded.pop(next(iter(self._loaded)))
+
+    def _evict(self: Self) -> None:
+        """Remove least-recently-used entries until the cache fits its configured size."""
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda path: path.stat().st_mtime_ns, reverse=True)
+        for stale_entry in entries[self.max_entries :]:
+            logger.debug(f"Evicting patches metadata cache entry {stale_entry.name}")
+            stale_entry.unlink(missing_ok=True)
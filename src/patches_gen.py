@@ -2,10 +2,20 @@
 
 import json
 import subprocess
+from collections.abc import Iterable, Iterator
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from tempfile import TemporaryFile
+from typing import Any, Self
 
+from loguru import logger
+
+from src.bundle_metadata import BundleMetadataReader
 from src.cli_args import DEFAULT_LIST_PATCHES_ARGS, append_cli_argument
+from src.jvm import ClassDataSharing
+from src.jvm_daemon import STDOUT_CHANNEL, JvmDaemonPool
+from src.patches_cache import PatchesMetadataCache, SingleFlight
 
 # Patch fields are only section delimiters when they are emitted at column zero.
 PATCH_DESCRIPTION_STOP_LABELS = ("Enabled:", "Options:", "Compatible packages:")
@@ -25,6 +35,9 @@ OPTION_FIELD_LABELS = (
 # Java logging can prefix the first data line, but the actual patch payload remains unchanged.
 LOG_PREFIXES = ("INFO: ",)
 
+# Parallel app workers that share a CLI and bundle wait on one list-patches JVM instead of each starting their own.
+_list_patches_flight = SingleFlight()
+
 
 def _normalise_cli_line(line: str) -> str:
     """Remove wrapper logging noise while preserving indentation that signals parser scope."""
@@ -80,86 +93,38 @@ def _collect_multiline_field(
     return "\n".join(values).strip(), index
 
 
-def _split_patch_sections(text: str) -> list[str]:
-    """Split only on top-level patch names so indented option names remain inside a patch."""
-    sections: list[str] = []
-    current_section: list[str] = []
-
-    for raw_line in text.splitlines():
-        line = _normalise_cli_line(raw_line)
-        if _has_label(line, "Name:", top_level_only=True):
-            if current_section:
-                sections.append("\n".join(current_section))
-            current_section = [line]
-            continue
-
-        # Lines before the first patch are command noise and should not become empty patches.
-        if current_section:
-            current_section.append(line)
-
-    if current_section:
-        sections.append("\n".join(current_section))
-
-    return sections
-
-
 def _starts_option_block(line: str) -> bool:
     """Recognise both Morphe/Anddea option titles and ReVanced v6 option names."""
     return _has_any_label(line, OPTION_TITLE_LABELS, top_level_only=False)
 
 
-def _split_option_blocks(option_lines: list[str]) -> list[list[str]]:
-    """Split options by their first title/name field while keeping multiline bodies attached."""
-    option_blocks: list[list[str]] = []
-    current_block: list[str] = []
-
-    for line in option_lines:
-        if _starts_option_block(line):
-            if current_block:
-                option_blocks.append(current_block)
-            current_block = [line]
-            continue
-
-        # Ignore leading spacer lines, but keep spacers once an option block has started.
-        if current_block:
-            current_block.append(line)
-
-    if current_block:
-        option_blocks.append(current_block)
-
-    return option_blocks
+@lru_cache(maxsize=64)
+def _parse_section(section: str) -> dict[str, Any]:
+    """Run one section through the streaming parser once, however many fields are extracted from it."""
+    lines = _section_lines(section)
+    header_line = next((line for line in lines if _has_label(line, "Name:", top_level_only=True)), None)
+    parser = _PatchSectionParser(header_line)
+    for line in lines:
+        parser.feed(line)
+    return parser.result()
 
 
 def extract_name_from_section(section: str) -> str | None:
     """Extract the patch name from a top-level section header."""
-    for line in _section_lines(section):
-        if _has_label(line, "Name:", top_level_only=True):
-            return _field_value(line, "Name:")
-    return None
+    name: str | None = _parse_section(section)["name"]
+    return name
 
 
 def extract_description_from_section(section: str) -> str:
     """Extract the patch description without consuming later patch fields."""
-    lines = _section_lines(section)
-    for index, line in enumerate(lines):
-        if _has_label(line, "Description:", top_level_only=True):
-            description, _ = _collect_multiline_field(
-                lines,
-                index,
-                "Description:",
-                PATCH_DESCRIPTION_STOP_LABELS,
-                stop_at_top_level=True,
-            )
-            return description
-    return ""
+    description: str = _parse_section(section)["description"]
+    return description
 
 
 def extract_enabled_state_from_section(section: str) -> bool:
     """Extract the patch enabled flag from the top-level metadata."""
-    for line in _section_lines(section):
-        if _has_label(line, "Enabled:", top_level_only=True):
-            return _field_value(line, "Enabled:").lower() == "true"
-    return False
+    enabled: bool = _parse_section(section)["use"]
+    return enabled
 
 
 def extract_package_info(package_section: str) -> dict[str, Any]:
@@ -169,72 +134,17 @@ def extract_package_info(package_section: str) -> dict[str, Any]:
         return {"name": "", "versions": None}
 
     # The helper accepts both raw split text and a full `Package name:` line for compatibility.
-    first_line = lines[0]
-    package_name = (
-        _field_value(first_line, "Package name:")
-        if _has_label(first_line, "Package name:", top_level_only=False)
-        else first_line.strip()
-    )
-    versions: list[str] = []
-    collecting_versions = False
-
-    for line in lines[1:]:
-        if _has_label(line, "Compatible versions:", top_level_only=False):
-            inline_versions = _field_value(line, "Compatible versions:")
-            if inline_versions:
-                versions.extend(inline_versions.split())
-            collecting_versions = True
-            continue
-
-        if collecting_versions:
-            versions.extend(line.strip().split())
-
-    return {"name": package_name, "versions": versions or None}
+    if not _has_label(lines[0], "Package name:", top_level_only=False):
+        lines[0] = f"Package name: {lines[0].strip()}"
+    packages = extract_compatible_packages_from_section("\n".join(["Compatible packages:", *lines]))
+    return packages[0]
 
 
 def extract_compatible_packages_from_section(section: str) -> list[dict[str, Any]]:
     """Extract all compatible packages from a patch section."""
-    lines = _section_lines(section)
-    compatible_index = next(
-        (index for index, line in enumerate(lines) if _has_label(line, "Compatible packages:", top_level_only=True)),
-        None,
-    )
-    if compatible_index is None:
-        return []
-
-    packages: list[dict[str, Any]] = []
-    current_name: str | None = None
-    current_versions: list[str] = []
-    collecting_versions = False
-
-    def flush_package() -> None:
-        """Commit the current package once its following package or section boundary appears."""
-        if current_name is not None:
-            packages.append({"name": current_name, "versions": current_versions or None})
-
-    for line in lines[compatible_index + 1 :]:
-        if _has_label(line, "Package name:", top_level_only=False):
-            flush_package()
-            current_name = _field_value(line, "Package name:")
-            current_versions = []
-            collecting_versions = False
-            continue
-
-        if current_name is None:
-            continue
-
-        if _has_label(line, "Compatible versions:", top_level_only=False):
-            inline_versions = _field_value(line, "Compatible versions:")
-            if inline_versions:
-                current_versions.extend(inline_versions.split())
-            collecting_versions = True
-            continue
-
-        if collecting_versions and line.strip():
-            current_versions.extend(line.strip().split())
-
-    flush_package()
-    return packages
+    packages: list[dict[str, Any]] | None = _parse_section(section)["compatiblePackages"]
+    # The parse is shared between helpers, so callers get copies they may mutate freely.
+    return deepcopy(packages) or []
 
 
 def parse_option_match(option_lines: list[str]) -> dict[str, Any]:
@@ -347,50 +257,181 @@ def parse_option_match(option_lines: list[str]) -> dict[str, Any]:
 
 def extract_options_from_section(section: str) -> list[dict[str, Any]]:
     """Extract options from a patch section without reading compatible package metadata."""
-    lines = _section_lines(section)
-    options_index = next(
-        (index for index, line in enumerate(lines) if _has_label(line, "Options:", top_level_only=True)),
-        None,
-    )
-    if options_index is None:
-        return []
+    options: list[dict[str, Any]] = deepcopy(_parse_section(section)["options"])
+    return options
+
+
+class _PatchSectionParser(object):
+    """Incremental parser for one patch section that reads each line exactly once.
+
+    It is the only patch parser: streamed list-patches output and the whole-section helpers above both feed it.
+    """
 
-    option_lines: list[str] = []
-    for line in lines[options_index + 1 :]:
+    def __init__(self: Self, header_line: str | None) -> None:
+        self.name = _field_value(header_line, "Name:") if header_line is not None else None
+        self.description_lines: list[str] | None = None
+        self.description_done = False
+        self.enabled: bool | None = None
+        # Compatible packages run from their first top-level label to the end of the section.
+        self.packages_started = False
+        self.packages: list[dict[str, Any]] = []
+        self.package_name: str | None = None
+        self.package_versions: list[str] = []
+        self.collecting_versions = False
+        # Options run from their first top-level label to the next top-level compatible packages label.
+        self.options_started = False
+        self.options_done = False
+        self.option_blocks: list[list[str]] = []
+
+    def feed(self: Self, line: str) -> None:
+        """Hand one normalised section line to every field collector that is interested in it."""
+        self._feed_description(line)
+        if self.enabled is None and _has_label(line, "Enabled:", top_level_only=True):
+            self.enabled = _field_value(line, "Enabled:").lower() == "true"
+        self._feed_options(line)
+        self._feed_packages(line)
+
+    def _feed_description(self: Self, line: str) -> None:
+        """Collect the description and its continuation lines up to the next patch-level field."""
+        if self.description_done:
+            return
+        if self.description_lines is None:
+            if _has_label(line, "Description:", top_level_only=True):
+                self.description_lines = [_field_value(line, "Description:")]
+            return
+        if _has_any_label(line, PATCH_DESCRIPTION_STOP_LABELS, top_level_only=True):
+            self.description_done = True
+            return
+        self.description_lines.append(line.strip())
+
+    def _feed_options(self: Self, line: str) -> None:
+        """Split option lines into blocks as they arrive."""
+        if self.options_done:
+            return
+        if not self.options_started:
+            self.options_started = _has_label(line, "Options:", top_level_only=True)
+            return
         if _has_label(line, "Compatible packages:", top_level_only=True):
-            break
-        option_lines.append(line)
+            self.options_done = True
+            return
+        if _starts_option_block(line):
+            self.option_blocks.append([line])
+        elif self.option_blocks:
+            # Leading spacer lines are ignored, but spacers inside an option block are kept.
+            self.option_blocks[-1].append(line)
+
+    def _feed_packages(self: Self, line: str) -> None:
+        """Track package names and their possibly multiline version lists."""
+        if not self.packages_started:
+            self.packages_started = _has_label(line, "Compatible packages:", top_level_only=True)
+            return
+        if _has_label(line, "Package name:", top_level_only=False):
+            self._flush_package()
+            self.package_name = _field_value(line, "Package name:")
+            self.package_versions = []
+            self.collecting_versions = False
+            return
+        if self.package_name is None:
+            return
+        if _has_label(line, "Compatible versions:", top_level_only=False):
+            inline_versions = _field_value(line, "Compatible versions:")
+            if inline_versions:
+                self.package_versions.extend(inline_versions.split())
+            self.collecting_versions = True
+            return
+        if self.collecting_versions and line.strip():
+            self.package_versions.extend(line.strip().split())
 
-    return [parse_option_match(option_block) for option_block in _split_option_blocks(option_lines)]
+    def _flush_package(self: Self) -> None:
+        """Commit the current package once its following package or section boundary appears."""
+        if self.package_name is not None:
+            self.packages.append({"name": self.package_name, "versions": self.package_versions or None})
+
+    def result(self: Self) -> dict[str, Any]:
+        """Return the parsed patch once the section has ended."""
+        self._flush_package()
+        description = "\n".join(self.description_lines).strip() if self.description_lines is not None else ""
+        return {
+            "name": self.name,
+            "description": description,
+            "compatiblePackages": self.packages or None,
+            "use": bool(self.enabled),
+            "options": [parse_option_match(option_block) for option_block in self.option_blocks],
+        }
+
+
+def iter_patches(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Parse list-patches output line by line, yielding each patch as soon as its section ends."""
+    section: _PatchSectionParser | None = None
+    for raw_chunk in lines:
+        # Stream chunks end in newlines, while whole-text callers may pass any line-break variant.
+        for raw_line in raw_chunk.splitlines():
+            line = _normalise_cli_line(raw_line)
+            if _has_label(line, "Name:", top_level_only=True):
+                if section is not None:
+                    yield section.result()
+                section = _PatchSectionParser(line)
+            # Lines before the first patch are command noise and should not become empty patches.
+            if section is not None:
+                section.feed(line)
+    if section is not None:
+        yield section.result()
 
 
 def parse_single_section(section: str) -> dict[str, Any]:
     """Parse a single patch section into a dictionary."""
-    name = extract_name_from_section(section)
-    description = extract_description_from_section(section)
-    enabled = extract_enabled_state_from_section(section)
-    compatible_packages = extract_compatible_packages_from_section(section)
-    options = extract_options_from_section(section)
-
-    return {
-        "name": name,
-        "description": description,
-        "compatiblePackages": compatible_packages or None,
-        "use": enabled,
-        "options": options,
-    }
+    return deepcopy(_parse_section(section))
 
 
 def run_command_and_capture_output(patches_command: list[str]) -> str:
     """Run command and capture its output."""
-    result = subprocess.run(patches_command, capture_output=True, text=True, check=True)
-    return result.stdout
+    return "".join(stream_command_output(patches_command))
+
+
+def stream_command_output(patches_command: list[str]) -> Iterator[str]:
+    """Yield a java command's stdout lines while it is still running, raising if it exits non-zero."""
+    stdout_lines: list[str] = []
+
+    def collect_stdout(channel: str, text: str) -> None:
+        # Only stdout carries the patch listing; stderr is dropped just like capture_output did.
+        if channel == STDOUT_CHANNEL:
+            stdout_lines.append(f"{text}\n")
+
+    return_code = JvmDaemonPool.run_shared(patches_command[1:], collect_stdout)
+    if return_code is not None:
+        if return_code != 0:
+            raise subprocess.CalledProcessError(return_code, patches_command, "".join(stdout_lines))
+        yield from stdout_lines
+        return
+    # stderr goes to a file rather than a pipe so a chatty JVM can never block while stdout is being consumed.
+    with (
+        TemporaryFile() as stderr_file,
+        subprocess.Popen(
+            patches_command,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True,
+        ) as process,
+    ):
+        if process.stdout is None:
+            msg = "Failed to read list-patches output."
+            raise subprocess.SubprocessError(msg)
+        yield from process.stdout
+        return_code = process.wait()
+        if return_code != 0:
+            stderr_file.seek(0)
+            raise subprocess.CalledProcessError(return_code, patches_command, stderr=stderr_file.read().decode())
 
 
 def parse_text_to_json(text: str) -> list[dict[Any, Any]]:
     """Parse text output into JSON format."""
-    sections = _split_patch_sections(text)
-    return [parse_single_section(section) for section in sections]
+    return list(iter_patches(text.splitlines()))
+
+
+def _write_patches_json(parsed_data: list[dict[Any, Any]]) -> None:
+    """Keep writing the last parsed patch list to patches.json for users who inspect it after a run."""
+    with Path("patches.json").open("w") as file:
+        json.dump(parsed_data, file, indent=2)
 
 
 def convert_command_output_to_json(
@@ -398,6 +439,7 @@ def convert_command_output_to_json(
     patches_file: str,
     cli_lp_args: dict[str, str] | None = None,
     temporary_files_path: str | None = None,
+    metadata_cache: PatchesMetadataCache | None = None,
 ) -> list[dict[Any, Any]]:
     """
     Runs the ReVanced CLI command, processes the output, and saves it as a sorted JSON file.
@@ -405,12 +447,71 @@ def convert_command_output_to_json(
     Args:
         jar_file_name (str): Name or path of the JAR file to run.
         patches_file (str): The patches file name or path to pass to the command.
+        metadata_cache (PatchesMetadataCache | None): Optional on-disk cache consulted before launching Java.
     """
     # We start from defaults and then overlay resolved per-app profile/override values.
     list_patches_args = dict(DEFAULT_LIST_PATCHES_ARGS)
     if cli_lp_args:
         list_patches_args.update(cli_lp_args)
 
+    def list_patches() -> list[dict[Any, Any]]:
+        return _list_patches(jar_file_name, patches_file, list_patches_args, temporary_files_path, metadata_cache)
+
+    # Only concurrent identical calls are joined, so this stays correct even when persistent caching is disabled.
+    # The temporary path is per app but never changes the printed patch list, so it stays out of the key.
+    flight_key = (
+        str(Path(jar_file_name).resolve()),
+        str(Path(patches_file).resolve()),
+        tuple(sorted(list_patches_args.items())),
+    )
+    parsed_data: list[dict[Any, Any]] = _list_patches_flight.do(flight_key, list_patches)
+    return parsed_data
+
+
+def _list_patches(
+    jar_file_name: str,
+    patches_file: str,
+    list_patches_args: dict[str, str],
+    temporary_files_path: str | None,
+    metadata_cache: PatchesMetadataCache | None,
+) -> list[dict[Any, Any]]:
+    """Return parsed list-patches output from the persistent cache, embedded bundle metadata or a CLI run."""
+    cache_key = None
+    if metadata_cache is not None:
+        cache_key = metadata_cache.key(Path(jar_file_name), Path(patches_file), list_patches_args)
+        if (cached_data := metadata_cache.load(cache_key)) is not None:
+            # Identical CLI, bundle and flags always print the same patch list, so Java does not need to run.
+            logger.debug(f"Reusing cached list-patches output for {patches_file}")
+            _write_patches_json(cached_data)
+            return cached_data
+
+    parsed_data = BundleMetadataReader.read(Path(patches_file), list_patches_args)
+    if parsed_data is None:
+        parsed_data = _run_list_patches(jar_file_name, patches_file, list_patches_args, temporary_files_path)
+    else:
+        logger.debug(f"Read patch metadata embedded in {patches_file} without launching the CLI")
+
+    # Filter out invalid entries where "name" is None
+    parsed_data = [entry for entry in parsed_data if entry["name"] is not None]
+
+    # Sort the data by the "name" field
+    parsed_data.sort(key=lambda x: x["name"])
+
+    if metadata_cache is not None and cache_key is not None:
+        metadata_cache.store(cache_key, parsed_data)
+
+    _write_patches_json(parsed_data)
+
+    return parsed_data
+
+
+def _run_list_patches(
+    jar_file_name: str,
+    patches_file: str,
+    list_patches_args: dict[str, str],
+    temporary_files_path: str | None,
+) -> list[dict[Any, Any]]:
+    """Launch the CLI's list-patches command and parse its printed output."""
     # We construct the command from the configurable map to support multiple CLI syntaxes.
     command = ["java", "-jar", jar_file_name, list_patches_args["CMD"]]
     # These toggles reproduce existing behavior and remain configurable for future CLI changes.
@@ -425,17 +526,8 @@ def convert_command_output_to_json(
     # Some CLI families require a companion flag per patches file group (e.g., v6 `-b` bypass verification).
     append_cli_argument(command, list_patches_args.get("PATCHES_POST", ""))
 
-    output = run_command_and_capture_output(command)
-
-    parsed_data = parse_text_to_json(output)
-
-    # Filter out invalid entries where "name" is None
-    parsed_data = [entry for entry in parsed_data if entry["name"] is not None]
-
-    # Sort the data by the "name" field
-    parsed_data.sort(key=lambda x: x["name"])
-
-    with Path("patches.json").open("w") as file:
-        json.dump(parsed_data, file, indent=2)
-
-    return parsed_data
+    with ClassDataSharing.java_options(Path(jar_file_name)) as cds_options:
+        # Class-data sharing options must precede -jar, so they are spliced in right after the launcher.
+        output = stream_command_output([command[0], *cds_options, *command[1:]])
+        # Patches are parsed as the CLI prints them, so parsing overlaps with the JVM instead of following it.
+        return list(iter_patches(output))
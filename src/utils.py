@@ -1,5 +1,6 @@
 """Utilities."""
 
+import copy
 import html
 import inspect
 import json
@@ -7,19 +8,19 @@ import re
 import subprocess
 import sys
 import time
-import urllib.error
-import urllib.request
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from threading import Lock
+from typing import TYPE_CHECKING, Any, cast
 from urllib.parse import quote
 from zoneinfo import ZoneInfo
 
 import cloudscraper
-import requests
 from environs import Env
 from loguru import logger
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 if TYPE_CHECKING:
     from src.app import APP
@@ -47,12 +48,51 @@ default_cli = "https://github.com/revanced/revanced-cli/releases/latest"
 # Prefer ReVanced's API-hosted patch bundle because it exposes the `.rvp` file directly without relying on
 # release pages whose asset metadata may be unavailable or may only contain source archives.
 default_patches = "https://api.revanced.app/v5/patches.rvp"
-bs4_parser = "html.parser"
 changelog_file = "changelog.md"
 changelog_json_file = "changelog.json"
 request_timeout = 60
-session = Session()
-session.headers["User-Agent"] = request_header["User-Agent"]
+# Host pools kept per session; resource, app-store and API hosts together stay well below this.
+http_pool_hosts = 16
+# Idempotent requests are retried on connection failures and transient statuses with exponential backoff.
+# raise_on_status=False hands the last response back so handle_request_response still reports the failure.
+http_retry = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    raise_on_status=False,
+)
+# APKMirror's 403/429/503 pushback must reach HostThrottle on the first answer, so its scraper only retries
+# connections that failed before any status came back, and never sleeps on Retry-After below the throttle.
+scraper_retry = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status=0,
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    raise_on_status=False,
+    respect_retry_after_header=False,
+)
+
+
+def tune_http_session(http_session: Session, pool_maxsize: int, retry: Retry = http_retry) -> Session:
+    """Give every adapter of a session shared retries and keep-alive pools sized for the builder's workers."""
+    for adapter in http_session.adapters.values():
+        if isinstance(adapter, HTTPAdapter):
+            adapter.max_retries = retry
+            # Re-initialising keeps adapter subclasses (such as cloudscraper's TLS adapter) and their pool options.
+            adapter.init_poolmanager(http_pool_hosts, pool_maxsize)
+    return http_session
+
+
+def build_http_session() -> Session:
+    """Create a pooled session that carries the builder's User-Agent."""
+    http_session = Session()
+    http_session.headers["User-Agent"] = request_header["User-Agent"]
+    return tune_http_session(http_session, 10)
+
+
+# Shared by every downloader so keep-alive connections are reused across apps, resources and API calls.
+session = build_http_session()
 
 # Singleton cloudscraper session used for all APKMirror requests.
 # APKMirror is protected by Cloudflare, which blocks plain requests with a 403
@@ -60,6 +100,17 @@ session.headers["User-Agent"] = request_header["User-Agent"]
 # JS/cookie challenges and returns the real HTML response.
 apkmirror_scraper = cloudscraper.create_scraper()
 apkmirror_scraper.headers.update({"User-Agent": request_header["User-Agent"]})
+tune_http_session(apkmirror_scraper, 10, scraper_retry)
+
+
+def configure_http_sessions(config: "RevancedConfig") -> None:
+    """Size the shared sessions' per-host pools to the number of threads that can use them at once."""
+    # Resource and APK workers each hold one connection, or one per segment when segmented downloads are on.
+    pool_maxsize = config.max_resource_workers + config.max_download_workers * max(config.download_segments, 1)
+    tune_http_session(session, pool_maxsize)
+    tune_http_session(apkmirror_scraper, pool_maxsize, scraper_retry)
+
+
 updates_file = "updates.json"
 updates_file_url = "https://raw.githubusercontent.com/{github_repository}/{branch_name}/{updates_file}"
 obtainium_source_url = "https://raw.githubusercontent.com/{github_repository}/{branch_name}/obtainium_sources/{file_name}"
@@ -70,6 +121,12 @@ patches_versions_key = "patches_versions"
 cli_version_key = "cli_version"
 implement_method = "Please implement the method"
 status_code_200 = 200
+status_code_206 = 206
+status_code_304 = 304
+status_code_416 = 416
+# Statuses APKMirror's Cloudflare front answers with when it wants clients to slow down.
+status_code_403 = 403
+status_code_429 = 429
 resource_folder = "apks"
 branch_name = "changelogs"
 app_dump_key = "app_dump"
@@ -256,7 +313,7 @@ def apkmirror_status_check(package_name: str) -> Any:
         the response from the APKMirror API as a JSON object.
     """
     body = {"pnames": [package_name]}
-    response = requests.post(APK_MIRROR_APK_CHECK, json=body, headers=request_header, timeout=60)
+    response = session.post(APK_MIRROR_APK_CHECK, json=body, headers=request_header, timeout=request_timeout)
     return response.json()
 
 
@@ -271,16 +328,48 @@ def datetime_to_ms_epoch(dt: datetime) -> int:
     return round(microseconds / float(1000))
 
 
+# updates.json is consulted for every app and resource, so each source is parsed once and shared by the whole run.
+_updates_documents: dict[str, dict[str, Any]] = {}
+_updates_documents_lock = Lock()
+
+
+def updates_document_url(env: Env) -> str:
+    """Return where the published updates.json of this repository lives."""
+    return updates_file_url.format(
+        github_repository=env.str("GITHUB_REPOSITORY"),
+        branch_name=branch_name,
+        updates_file=updates_file,
+    )
+
+
+def _fetch_updates_document(source: str) -> dict[str, Any]:
+    """Download and parse the published updates.json."""
+    response = session.get(source, timeout=request_timeout)
+    handle_request_response(response, source)
+    return cast("dict[str, Any]", response.json())
+
+
+def read_updates_document(source: str) -> dict[str, Any]:
+    """Return the parsed updates.json from a URL or a local path, loading each source only once per run.
+
+    The returned document is shared; callers that modify it must copy it first.
+    """
+    with _updates_documents_lock:
+        # Holding the lock across the fetch makes concurrent first readers wait for one download.
+        if source not in _updates_documents:
+            if source.startswith(("http://", "https://")):
+                _updates_documents[source] = _fetch_updates_document(source)
+            else:
+                with Path(source).open() as file:
+                    _updates_documents[source] = json.load(file)
+        return _updates_documents[source]
+
+
 def load_older_updates(env: Env) -> dict[str, Any]:
     """Load older updated from updates.json."""
     try:
-        update_file_url = updates_file_url.format(
-            github_repository=env.str("GITHUB_REPOSITORY"),
-            branch_name=branch_name,
-            updates_file=updates_file,
-        )
-        with urllib.request.urlopen(update_file_url) as url:
-            return json.load(url)  # type: ignore[no-any-return]
+        # The build adds its own results to this dict, so it gets a private copy of the shared document.
+        return copy.deepcopy(read_updates_document(updates_document_url(env)))
     except Exception as e:  # noqa: BLE001
         logger.error(f"Failed to retrieve update file: {e}")
         return {}
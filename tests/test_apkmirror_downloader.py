@@ -4,22 +4,30 @@
 # Private helper coverage is intentional because the public path would perform live APKMirror downloads.
 # ruff: noqa: PT009, PT027, SLF001
 
+import json
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from threading import Event
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, Self, cast
 from unittest import TestCase
 from unittest.mock import patch
 
 from src.config import RevancedConfig
-from src.downloader.apkmirror import ApkMirror
+from src.downloader.apkmirror import APKMIRROR_PAGE_CLASSES, ApkMirror
+from src.downloader.apkmirror_index import ApkMirrorIndex
+from src.downloader.cloak_pool import CloakBrowserPool
+from src.downloader.page_cache import PageCache
 from src.downloader.sources import APK_MIRROR_BASE_URL
+from src.downloader.throttle import HostThrottle
 from src.exceptions import APKMirrorAPKDownloadError, ScrapingError
-from src.utils import request_header
+from src.utils import apkmirror_scraper, request_header
 
 if TYPE_CHECKING:
     from src.app import APP
 
+FIXTURES = Path(__file__).parent.joinpath("fixtures", "html")
+
 
 class _APKMirrorResponse(SimpleNamespace):
     """Small response double with only the fields used by the APKMirror source fetcher."""
@@ -46,36 +54,76 @@ class _CloakPage:
         """Return a non-challenge page so the fallback can complete successfully."""
         return "<html>real app page</html>"
 
+    def close(self: Self) -> None:
+        """Accept page cleanup after each fallback."""
+
+
+class _CloakContext:
+    """Browser context double that hands out pages and records persisted cookies."""
+
+    def __init__(self: Self, storage_state: str | None) -> None:
+        """Remember which cookie file the context was restored from."""
+        self.restored_from = storage_state
+        self.pages_opened = 0
+
+    def new_page(self: Self) -> _CloakPage:
+        """Return the fake page used by the CloakBrowser fallbacks."""
+        self.pages_opened += 1
+        return _CloakPage()
+
+    def storage_state(self: Self, path: str) -> None:
+        """Write a cookie file the way Playwright persists a context."""
+        Path(path).write_text('{"cookies": []}')
+
+    def close(self: Self) -> None:
+        """Accept context cleanup when the pool shuts down."""
+
 
 class _CloakBrowser:
-    """Browser double that records closure while exposing one page instance."""
+    """Browser double that records closure while exposing one context."""
 
     def __init__(self: Self) -> None:
         """Create state used to verify fallback cleanup."""
         self.closed = False
-        self.page = _CloakPage()
+        self.context: _CloakContext | None = None
 
-    def new_page(self: Self) -> _CloakPage:
-        """Return the fake page used by the CloakBrowser source fallback."""
-        return self.page
+    def new_context(self: Self, storage_state: str | None = None) -> _CloakContext:
+        """Return the fake context that the pool reuses for every page."""
+        self.context = _CloakContext(storage_state)
+        return self.context
+
+    def is_connected(self: Self) -> bool:
+        """Report a healthy browser so the pool keeps reusing it."""
+        return not self.closed
 
     def close(self: Self) -> None:
-        """Record cleanup because browser processes must not leak after fallback fetches."""
+        """Record cleanup because browser processes must not leak after the run."""
         self.closed = True
 
 
-def _config(temp_folder: Path) -> RevancedConfig:
+def _config(temp_folder: Path, variant_probes: int = 1) -> RevancedConfig:
     """Build the downloader config surface needed before patching out network downloads."""
     return cast(
         "RevancedConfig",
         # The browser download fallback needs these policy fields without constructing the full env config.
-        SimpleNamespace(dry_run=False, temp_folder=temp_folder),
+        SimpleNamespace(
+            dry_run=False,
+            temp_folder=temp_folder,
+            disable_caching=False,
+            apkmirror_variant_probes=variant_probes,
+        ),
     )
 
 
 class APKMirrorDownloaderTests(TestCase):
     """Verify APKMirror can fall back from HTTP scraping to CloakBrowser."""
 
+    def setUp(self: Self) -> None:
+        """Give every test its own page cache so pages stubbed by one test never answer another."""
+        page_cache_patch = patch.object(ApkMirror, "_pages", new=PageCache(APKMIRROR_PAGE_CLASSES))
+        page_cache_patch.start()
+        self.addCleanup(page_cache_patch.stop)
+
     def test_default_user_agent_uses_valid_khtml_token(self: Self) -> None:
         """A typo in the shared UA made requests look like an impossible browser."""
         user_agent = request_header["User-Agent"]
@@ -109,6 +157,34 @@ class APKMirrorDownloaderTests(TestCase):
         self.assertEqual("<html>real app page</html>", source)
         cloak.assert_called_once_with("https://www.apkmirror.com/apk/example/app/")
 
+    def test_extract_source_retries_pushback_before_launching_cloak(self: Self) -> None:
+        """A 429 should slow the shared throttle and be retried over HTTP instead of starting a browser."""
+        responses = [
+            _APKMirrorResponse(status_code=429, text="Too Many Requests"),
+            _APKMirrorResponse(status_code=200, text="<html>real app page</html>"),
+        ]
+
+        with (
+            patch.dict(HostThrottle._registry, clear=True),
+            patch("src.downloader.apkmirror.apkmirror_scraper.get", side_effect=responses) as get,
+            patch.object(ApkMirror, "_extract_source_with_cloak") as cloak,
+        ):
+            source = ApkMirror._extract_source("https://www.apkmirror.com/apk/example/app/")
+            throttle = HostThrottle._registry["www.apkmirror.com"]
+
+        self.assertEqual("<html>real app page</html>", source)
+        self.assertEqual(2, get.call_count)
+        cloak.assert_not_called()
+        self.assertLess(throttle.concurrency_limit, throttle.max_concurrency)
+
+    def test_scraper_leaves_pushback_statuses_to_the_throttle(self: Self) -> None:
+        """urllib3 must not retry Cloudflare pushback below HostThrottle, which would hide it from the AIMD window."""
+        retries = {adapter.max_retries for adapter in apkmirror_scraper.adapters.values()}
+
+        for status in (403, 429, 503):
+            with self.subTest(status=status):
+                self.assertFalse(any(retry.is_retry("GET", status, has_retry_after=True) for retry in retries))
+
     def test_extract_source_with_cloak_keeps_cloakbrowser_user_agent(self: Self) -> None:
         """CloakBrowser should keep a coherent browser fingerprint instead of receiving a forced UA header."""
         browser = _CloakBrowser()
@@ -117,12 +193,119 @@ class APKMirrorDownloaderTests(TestCase):
             """Return the fake browser while accepting the real launch options."""
             return browser
 
-        with patch.object(ApkMirror, "_cloak_dependencies", return_value=(launch_browser, TimeoutError)):
-            source = ApkMirror._extract_source_with_cloak("https://www.apkmirror.com/apk/example/app/")
+        with TemporaryDirectory() as tmp_dir:
+            pool = CloakBrowserPool(launch_browser, Path(tmp_dir, "cookies.json"))
+            with (
+                patch.object(CloakBrowserPool, "_shared", pool),
+                patch.object(ApkMirror, "_cloak_dependencies", return_value=(launch_browser, TimeoutError)),
+            ):
+                source = ApkMirror._extract_source_with_cloak("https://www.apkmirror.com/apk/example/app/")
+            pool.close()
 
         self.assertEqual("<html>real app page</html>", source)
         self.assertTrue(browser.closed)
 
+    def test_cloak_fallbacks_share_one_browser_and_persist_cookies(self: Self) -> None:
+        """Every challenged URL in a run must reuse one Chromium, and its cookies must seed the next run."""
+        launched: list[_CloakBrowser] = []
+
+        def launch_browser(*_args: object, **_kwargs: object) -> _CloakBrowser:
+            """Record every browser launch."""
+            launched.append(_CloakBrowser())
+            return launched[-1]
+
+        with TemporaryDirectory() as tmp_dir:
+            cookie_file = Path(tmp_dir, "cookies.json")
+            pool = CloakBrowserPool(launch_browser, cookie_file)
+            with (
+                patch.object(CloakBrowserPool, "_shared", pool),
+                patch.object(ApkMirror, "_cloak_dependencies", return_value=(launch_browser, TimeoutError)),
+            ):
+                for app in ("first", "second", "third"):
+                    ApkMirror._extract_source_with_cloak(f"https://www.apkmirror.com/apk/example/{app}/")
+            pool.close()
+
+            next_run = CloakBrowserPool(launch_browser, cookie_file)
+            next_run.run(lambda page: page.content())
+            next_run.close()
+
+        self.assertEqual(2, len(launched))
+        self.assertEqual(3, getattr(launched[0].context, "pages_opened", None))
+        self.assertTrue(launched[0].closed)
+        self.assertEqual(str(cookie_file), getattr(launched[1].context, "restored_from", None))
+
+    def test_cloak_page_and_download_fallbacks_share_one_browser(self: Self) -> None:
+        """A challenged page and a challenged download in one run must not launch Chromium twice."""
+        launched: list[_CloakBrowser] = []
+
+        def launch_browser(*_args: object, **_kwargs: object) -> _CloakBrowser:
+            """Record every browser launch."""
+            launched.append(_CloakBrowser())
+            return launched[-1]
+
+        with TemporaryDirectory() as tmp_dir:
+            downloader = ApkMirror(_config(Path(tmp_dir)))
+            with (
+                patch.object(CloakBrowserPool, "_shared", None),
+                patch.object(CloakBrowserPool, "_storage_state_file", Path(tmp_dir, "cookies.json")),
+                patch("src.downloader.cloak_pool.atexit.register"),
+                patch.object(ApkMirror, "_cloak_dependencies", return_value=(launch_browser, TimeoutError)),
+            ):
+                ApkMirror._extract_source_with_cloak("https://www.apkmirror.com/apk/example/app/")
+                # The page double rejects the referer header, which is enough to reach the shared browser.
+                with self.assertRaises(APKMirrorAPKDownloadError):
+                    downloader._download_file_with_cloak(
+                        f"{APK_MIRROR_BASE_URL}/download.php?id=1",
+                        "app.apk",
+                        "https://www.apkmirror.com/apk/example/app/download/",
+                    )
+                pool = CloakBrowserPool._shared
+            cast("CloakBrowserPool", pool).close()
+
+        self.assertEqual(1, len(launched))
+        self.assertEqual(2, getattr(launched[0].context, "pages_opened", None))
+
+    def test_cloak_pool_relaunches_when_new_page_fails_on_dead_browser(self: Self) -> None:
+        """A browser that crashed between fallbacks must be replaced even though opening its page fails."""
+        launched: list[_CloakBrowser] = []
+
+        def launch_browser(*_args: object, **_kwargs: object) -> _CloakBrowser:
+            """Record every browser launch."""
+            launched.append(_CloakBrowser())
+            return launched[-1]
+
+        with TemporaryDirectory() as tmp_dir:
+            pool = CloakBrowserPool(launch_browser, Path(tmp_dir, "cookies.json"))
+            pool.run(lambda page: page.content())
+            # Chromium crashes between fallbacks, so the next page cannot even be opened.
+            launched[0].closed = True
+            with patch.object(_CloakContext, "new_page", side_effect=RuntimeError("Target closed")):
+                self.assertRaises(RuntimeError, pool.run, lambda page: page.content())
+            source = pool.run(lambda page: page.content())
+            pool.close()
+
+        self.assertEqual("<html>real app page</html>", source)
+        self.assertEqual(2, len(launched))
+
+    def test_cloak_pool_closes_browser_when_context_fails(self: Self) -> None:
+        """A browser whose context cannot be opened must be closed rather than leaked on every retry."""
+        launched: list[_CloakBrowser] = []
+
+        def launch_browser(*_args: object, **_kwargs: object) -> _CloakBrowser:
+            """Record every browser launch."""
+            launched.append(_CloakBrowser())
+            return launched[-1]
+
+        with TemporaryDirectory() as tmp_dir:
+            pool = CloakBrowserPool(launch_browser, Path(tmp_dir, "cookies.json"))
+            with patch.object(_CloakBrowser, "new_context", side_effect=RuntimeError("bad storage state")):
+                self.assertRaises(RuntimeError, pool.run, lambda page: page.content())
+                self.assertRaises(RuntimeError, pool.run, lambda page: page.content())
+            pool.close()
+
+        self.assertEqual(2, len(launched))
+        self.assertTrue(all(browser.closed for browser in launched))
+
     def test_guess_release_url_constructs_correct_slug(self: Self) -> None:
         """The guessed URL should combine the app slug with the version in APKMirror's dash-separated format."""
         url = ApkMirror._guess_release_url(
@@ -184,6 +367,8 @@ class APKMirrorDownloaderTests(TestCase):
                 </div>
             </div>
         """
+        variant_page = '<div class="center"><a href="/apk/x-corp/twitter/download/?key=abc">Download</a></div>'
+        force_download_page = '<span class="apkm-badge">BUNDLE</span>'
         app = cast(
             "APP",
             # Only these APP fields are read while network and download methods are patched in this test.
@@ -192,17 +377,19 @@ class APKMirrorDownloaderTests(TestCase):
                 app_version="11.95.1-release-ripped.0",
                 download_source="https://www.apkmirror.com/apk/x-corp/twitter/",
                 effective_cli_argsf="morphe-cli",
+                archs_to_build=[],
             ),
         )
 
         with TemporaryDirectory() as tmp_dir:
             downloader = ApkMirror(_config(Path(tmp_dir)))
             # The guessed URL fails (ScrapingError), then the listing page is scraped successfully.
+            # The variant and force-download pages are read afterwards to index the resolved download link.
             with (
                 patch.object(
                     downloader,
                     "_extract_source",
-                    side_effect=[ScrapingError("404 not found"), listing_page],
+                    side_effect=[ScrapingError("404 not found"), listing_page, variant_page, force_download_page],
                 ),
                 patch.object(
                     downloader,
@@ -219,10 +406,36 @@ class APKMirrorDownloaderTests(TestCase):
 
         get_page.assert_called_once_with(
             "https://www.apkmirror.com/apk/x-corp/twitter/x-11-95-1-release-0-release/",
+            [],
+            "TWITTER_PIKO",
         )
         self.assertEqual("TWITTER_PIKO.apkm", file_name)
         self.assertEqual("https://example.test/download.php?id=1", download_url)
 
+    def test_release_page_is_fetched_once_across_steps(self: Self) -> None:
+        """Validating the guessed release URL and reading its variants must share one request."""
+        release_page = """
+            <div class="tab-pane noPadding">
+                <div class="table-row headerFont">
+                    <a class="accent_color" href="/apk/google-inc/youtube/youtube-20-51-39-release/variant/">APK</a>
+                    <span class="apkm-badge">BUNDLE</span>
+                </div>
+            </div>
+        """
+        app = cast(
+            "APP",
+            SimpleNamespace(app_name="YOUTUBE", download_source="https://www.apkmirror.com/apk/google-inc/youtube/"),
+        )
+
+        with TemporaryDirectory() as tmp_dir:
+            downloader = ApkMirror(_config(Path(tmp_dir)))
+            with patch.object(downloader, "_extract_source", return_value=release_page) as extract:
+                release_url = downloader._find_specific_version_page(app, "20.51.39")
+                download_page = ApkMirror(_config(Path(tmp_dir))).get_download_page(release_url)
+
+        extract.assert_called_once_with(release_url)
+        self.assertEqual(f"{release_url}variant/", download_page)
+
     def test_get_download_page_rejects_missing_release_table(self: Self) -> None:
         """A normal APKMirror 404 page should fail as a download error instead of a NoneType parser crash."""
         with TemporaryDirectory() as tmp_dir:
@@ -282,3 +495,308 @@ class APKMirrorDownloaderTests(TestCase):
         self.assertEqual("PIKO_TWITTER.apkm", file_name)
         self.assertEqual(f"{APK_MIRROR_BASE_URL}/download.php?id=67890", download_url)
         download.assert_called_once()
+
+    def test_indexed_release_downloads_without_fetching_pages(self: Self) -> None:
+        """A pinned version resolved by an earlier run must download from the indexed link alone."""
+        release_url = "https://www.apkmirror.com/apk/google-inc/youtube/youtube-20-51-39-release/"
+        pages = {
+            release_url: """
+                <div class="tab-pane noPadding">
+                    <div class="table-row headerFont">
+                        <a class="accent_color" href="/apk/google-inc/youtube/youtube-20-51-39-release/variant/">v</a>
+                        <span class="apkm-badge">APK</span> arm64-v8a
+                    </div>
+                </div>
+            """,
+            f"{release_url}variant/": '<div class="center"><a href="/apk/google-inc/youtube/download/?key=k">D</a>',
+            f"{APK_MIRROR_BASE_URL}/apk/google-inc/youtube/download/?key=k": """
+                <span class="apkm-badge">APK</span>
+                <div class="tab-pane"><a href="/download.php?id=42">Download APK</a></div>
+            """,
+        }
+        app = cast(
+            "APP",
+            SimpleNamespace(
+                app_name="YOUTUBE",
+                app_version="20.51.39",
+                download_source="https://www.apkmirror.com/apk/google-inc/youtube/",
+                effective_cli_argsf="revanced-cli",
+                archs_to_build=[],
+            ),
+        )
+
+        with TemporaryDirectory() as tmp_dir, patch.dict(ApkMirrorIndex._instances, clear=True):
+            downloader = ApkMirror(_config(Path(tmp_dir)))
+            with (
+                patch.object(downloader, "_extract_source", side_effect=pages.__getitem__),
+                patch.object(downloader, "_download"),
+            ):
+                first = downloader.specific_version(app, "20.51.39")
+
+            # A new run starts with empty in-memory caches and only the index file left on disk.
+            ApkMirrorIndex._instances.clear()
+            next_run = ApkMirror(_config(Path(tmp_dir)))
+            with (
+                patch.object(ApkMirror, "_pages", new=PageCache(APKMIRROR_PAGE_CLASSES)),
+                patch.object(next_run, "_extract_source") as extract,
+                patch.object(
+                    next_run,
+                    "_download",
+                    side_effect=lambda _url, name, **_kwargs: Path(tmp_dir, name).write_bytes(b"PK\x03\x04apk"),
+                ) as download,
+            ):
+                second = next_run.specific_version(app, "20.51.39")
+
+        self.assertEqual(("YOUTUBE.apk", f"{APK_MIRROR_BASE_URL}/download.php?id=42"), first)
+        self.assertEqual(first, second)
+        extract.assert_not_called()
+        self.assertEqual(
+            {"Referer": f"{APK_MIRROR_BASE_URL}/apk/google-inc/youtube/download/?key=k"},
+            download.call_args.kwargs["extra_headers"],
+        )
+
+    def test_indexed_link_serving_a_page_is_resolved_again(self: Self) -> None:
+        """An expired indexed link that answers 200 with HTML must be forgotten instead of saved as the APK."""
+        release_url = "https://www.apkmirror.com/apk/google-inc/youtube/youtube-20-51-39-release/"
+        pages = {
+            release_url: """
+                <div class="tab-pane noPadding">
+                    <div class="table-row headerFont">
+                        <a class="accent_color" href="/apk/google-inc/youtube/youtube-20-51-39-release/variant/">v</a>
+                        <span class="apkm-badge">APK</span> arm64-v8a
+                    </div>
+                </div>
+            """,
+            f"{release_url}variant/": '<div class="center"><a href="/apk/google-inc/youtube/download/?key=k">D</a>',
+            f"{APK_MIRROR_BASE_URL}/apk/google-inc/youtube/download/?key=k": """
+                <span class="apkm-badge">APK</span>
+                <div class="tab-pane"><a href="/download.php?id=42">Download APK</a></div>
+            """,
+        }
+        app = cast(
+            "APP",
+            SimpleNamespace(
+                app_name="YOUTUBE",
+                app_version="20.51.39",
+                download_source="https://www.apkmirror.com/apk/google-inc/youtube/",
+                effective_cli_argsf="revanced-cli",
+                archs_to_build=[],
+            ),
+        )
+        payloads = [b"<html>Link expired</html>", b"PK\x03\x04apk"]
+
+        with TemporaryDirectory() as tmp_dir, patch.dict(ApkMirrorIndex._instances, clear=True):
+            downloader = ApkMirror(_config(Path(tmp_dir)))
+            index = cast("ApkMirrorIndex", downloader._index())
+            index.record_resolved(
+                app.download_source,
+                release_url,
+                {
+                    "variant_page": f"{release_url}variant/",
+                    "force_download_page": f"{APK_MIRROR_BASE_URL}/apk/google-inc/youtube/download/?key=k",
+                    "download_url": f"{APK_MIRROR_BASE_URL}/download.php?id=41",
+                    "apk_type": "APK",
+                    "version": "20.51.39",
+                    "archs": [],
+                },
+            )
+            with (
+                patch.object(downloader, "_extract_source", side_effect=pages.__getitem__) as extract,
+                patch.object(
+                    downloader,
+                    "_download",
+                    side_effect=lambda _url, name, **_kwargs: Path(tmp_dir, name).write_bytes(payloads.pop(0)),
+                ),
+            ):
+                file_name, download_url = downloader.specific_version(app, "20.51.39", release_url)
+            payload = Path(tmp_dir, file_name).read_bytes()
+
+        self.assertEqual(f"{APK_MIRROR_BASE_URL}/download.php?id=42", download_url)
+        self.assertEqual(b"PK\x03\x04apk", payload)
+        extract.assert_called()
+
+    def test_listing_index_saves_only_changes_and_keeps_recent_releases(self: Self) -> None:
+        """Repeated listing scrapes must not rewrite the index, and old releases are pruned past the bound."""
+        with TemporaryDirectory() as tmp_dir:
+            index = ApkMirrorIndex(Path(tmp_dir, "index.json"))
+            with (
+                patch("src.downloader.apkmirror_index.MAX_LISTED_RELEASES", 2),
+                patch.object(index, "_save", wraps=index._save) as save,
+            ):
+                index.record_listing("source", [("App 1.0", "/1/"), ("App 1.1", "/2/")])
+                index.record_listing("source", [("App 1.0", "/1/"), ("App 1.1", "/2/")])
+                index.record_listing("source", [("App 1.2", "/3/")])
+
+            releases = json.loads(Path(tmp_dir, "index.json").read_text())["source"]["releases"]
+
+        self.assertEqual(2, save.call_count)
+        self.assertEqual(["/2/", "/3/"], sorted(releases))
+
+    def test_release_with_unknown_version_is_not_indexed(self: Self) -> None:
+        """A chain whose version could not be guessed must not be indexed under the "latest" placeholder."""
+        release_url = "https://www.apkmirror.com/apk/google-inc/youtube/youtube-20-51-39-release/"
+        pages = {
+            release_url: """
+                <div class="tab-pane noPadding">
+                    <div class="table-row headerFont">
+                        <a class="accent_color" href="/apk/google-inc/youtube/youtube-20-51-39-release/variant/">v</a>
+                        <span class="apkm-badge">APK</span> arm64-v8a
+                    </div>
+                </div>
+            """,
+            f"{release_url}variant/": '<div class="center"><a href="/apk/google-inc/youtube/download/?key=k">D</a>',
+            f"{APK_MIRROR_BASE_URL}/apk/google-inc/youtube/download/?key=k": """
+                <span class="apkm-badge">APK</span>
+                <div class="tab-pane"><a href="/download.php?id=42">Download APK</a></div>
+            """,
+        }
+        app = cast(
+            "APP",
+            SimpleNamespace(
+                app_name="YOUTUBE",
+                app_version="latest",
+                download_source="https://www.apkmirror.com/apk/google-inc/youtube/",
+                effective_cli_argsf="revanced-cli",
+                archs_to_build=[],
+            ),
+        )
+
+        with TemporaryDirectory() as tmp_dir, patch.dict(ApkMirrorIndex._instances, clear=True):
+            downloader = ApkMirror(_config(Path(tmp_dir)))
+            with (
+                patch.object(downloader, "_extract_source", side_effect=pages.__getitem__),
+                patch.object(downloader, "_download"),
+            ):
+                downloader.specific_version(app, "latest", release_url)
+            index = downloader._index()
+
+        self.assertEqual("latest", app.app_version)
+        self.assertIsNotNone(index)
+        self.assertIsNone(cast("ApkMirrorIndex", index).resolved(app.download_source, release_url))
+
+    def test_get_download_page_falls_back_to_next_variant_when_preferred_fails(self: Self) -> None:
+        """A challenged variant page must not fail the app while another variant links to a download key."""
+        release_url = "https://www.apkmirror.com/apk/example/app/app-1-0-release/"
+        rows = [
+            ("universal", "APK", "universal/"),
+            ("arm64-v8a", "APK", "arm64/"),
+            ("arm64-v8a", "BUNDLE", "bundle/"),
+        ]
+        pages = {
+            release_url: '<div class="tab-pane noPadding">{}</div>'.format(
+                "".join(
+                    f'<div class="table-row headerFont"><a class="accent_color" href="/apk/example/app/{href}">v</a>'
+                    f'<span class="apkm-badge">{apk_type}</span> {arch}</div>'
+                    for arch, apk_type, href in rows
+                ),
+            ),
+            f"{APK_MIRROR_BASE_URL}/apk/example/app/universal/": '<div class="center"><a href="/download/?key=u">D</a>',
+            f"{APK_MIRROR_BASE_URL}/apk/example/app/bundle/": '<div class="center"><a href="/download/?key=b">D</a>',
+        }
+
+        def extract_source(url: str) -> str:
+            """Serve the saved pages, with the preferred arm64 variant page challenged."""
+            if url not in pages:
+                msg = "Cloudflare captcha"
+                raise ScrapingError(msg)
+            return pages[url]
+
+        with TemporaryDirectory() as tmp_dir:
+            downloader = ApkMirror(_config(Path(tmp_dir), variant_probes=3))
+            with (
+                patch.object(downloader, "_extract_source", side_effect=extract_source) as extract,
+            ):
+                download_page = downloader.get_download_page(release_url)
+
+        # The challenged arm64 APK loses to the next APK rather than to the bundle, even if the bundle loaded first.
+        self.assertEqual(f"{APK_MIRROR_BASE_URL}/apk/example/app/universal/", download_page)
+        # The universal page answered at once, so the bundle page was never requested.
+        requested = [call.args[0] for call in extract.call_args_list]
+        self.assertNotIn(f"{APK_MIRROR_BASE_URL}/apk/example/app/bundle/", requested)
+
+    def test_get_download_page_hedges_slow_preferred_variant(self: Self) -> None:
+        """A slow preferred page starts the next probe after the hedge delay but still wins once it loads."""
+        release_url = "https://www.apkmirror.com/apk/example/app/app-1-0-release/"
+        preferred = f"{APK_MIRROR_BASE_URL}/apk/example/app/arm64/"
+        hedge = f"{APK_MIRROR_BASE_URL}/apk/example/app/universal/"
+        hedge_requested = Event()
+        pages = {
+            release_url: """
+                <div class="tab-pane noPadding">
+                    <div class="table-row headerFont">
+                        <a class="accent_color" href="/apk/example/app/universal/">v</a>
+                        <span class="apkm-badge">APK</span> universal
+                    </div>
+                    <div class="table-row headerFont">
+                        <a class="accent_color" href="/apk/example/app/arm64/">v</a>
+                        <span class="apkm-badge">APK</span> arm64-v8a
+                    </div>
+                </div>
+            """,
+            preferred: '<div class="center"><a href="/download/?key=a">D</a>',
+            hedge: '<div class="center"><a href="/download/?key=u">D</a>',
+        }
+
+        def extract_source(url: str) -> str:
+            """Hold the preferred page until the hedged probe has been sent."""
+            if url == hedge:
+                hedge_requested.set()
+            if url == preferred:
+                hedge_requested.wait(timeout=5)
+            return pages[url]
+
+        with TemporaryDirectory() as tmp_dir:
+            downloader = ApkMirror(_config(Path(tmp_dir), variant_probes=2))
+            with (
+                patch("src.downloader.apkmirror.APKMIRROR_VARIANT_HEDGE_SECONDS", 0.01),
+                patch.object(downloader, "_extract_source", side_effect=extract_source),
+            ):
+                download_page = downloader.get_download_page(release_url)
+
+        self.assertEqual(preferred, download_page)
+        self.assertTrue(hedge_requested.is_set())
+
+    def test_get_download_page_does_not_probe_variants_by_default(self: Self) -> None:
+        """Without APKMIRROR_VARIANT_PROBES the preferred variant is returned without fetching any variant page."""
+        release_page = """
+            <div class="tab-pane noPadding">
+                <div class="table-row headerFont">
+                    <a class="accent_color" href="/apk/example/app/universal/">v</a><span class="apkm-badge">APK</span>
+                    universal
+                </div>
+                <div class="table-row headerFont">
+                    <a class="accent_color" href="/apk/example/app/arm64/">v</a><span class="apkm-badge">APK</span>
+                    arm64-v8a
+                </div>
+            </div>
+        """
+
+        with TemporaryDirectory() as tmp_dir:
+            downloader = ApkMirror(_config(Path(tmp_dir)))
+            with patch.object(downloader, "_extract_source", return_value=release_page) as extract:
+                download_page = downloader.get_download_page("https://www.apkmirror.com/apk/example/app/release/")
+
+        self.assertEqual(f"{APK_MIRROR_BASE_URL}/apk/example/app/arm64/", download_page)
+        extract.assert_called_once()
+
+    def test_variant_candidates_prefer_smallest_apk_for_wanted_abis(self: Self) -> None:
+        """APKs built for the wanted ABIs must win, with bundles only as the fallback when no APK fits."""
+        release_url = "https://www.apkmirror.com/apk/google-inc/youtube/youtube-20-51-39-release/"
+        release_page = FIXTURES.joinpath("apkmirror_release.html").read_text()
+        # The fixture alternates arm64 APK, armeabi-v7a bundle, x86 APK and x86_64 bundle rows, twice.
+        expected = {
+            (): [4, 0, 7, 5, 3, 1],
+            ("arm64-v8a",): [4, 0, 7, 5, 3, 1],
+            ("x86",): [6, 2, 7, 5, 3, 1],
+            ("x86_64",): [7, 3, 5, 1],
+        }
+
+        with TemporaryDirectory() as tmp_dir:
+            downloader = ApkMirror(_config(Path(tmp_dir)))
+            with patch.object(downloader, "_extract_source", return_value=release_page):
+                for archs, rows in expected.items():
+                    with self.subTest(archs=archs):
+                        self.assertEqual(
+                            [f"{release_url}youtube-20-51-39-{row}-android-apk-download/" for row in rows],
+                            downloader._variant_candidates(release_url, archs),
+                        )
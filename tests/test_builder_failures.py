@@ -6,8 +6,10 @@
 
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from threading import Event, Lock
+from time import sleep
 from types import SimpleNamespace
-from typing import TYPE_CHECKING, Self, cast
+from typing import TYPE_CHECKING, Any, Self, cast
 from unittest import TestCase
 from unittest.mock import patch
 
@@ -113,6 +115,7 @@ def _config(temp_folder: Path = Path("apks")) -> RevancedConfig:
         SimpleNamespace(
             ci_test=False,
             cli_temp_folder_name="patch-source-temporary-files",
+            jvm_admission_control=False,
             rip_libs_apps=[],
             temp_folder=temp_folder,
         ),
@@ -159,15 +162,42 @@ class BuilderFailureTests(TestCase):
             with patch("src.parser.Popen", return_value=_FailedProcessProducingOutput(output_file)):
                 parser.patch_app(app)
 
+    def test_daemon_hosted_patch_bypasses_admission_and_heap_flag(self: Self) -> None:
+        """A warm daemon's heap is fixed, so admission must not reserve memory or size an -Xmx for it."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            config.jvm_admission_control = True
+            parser = Parser(cast("Patches", object()), config)
+            Path(tmp_dir, "youtube-output.apk").write_bytes(b"apk")
+
+            with (
+                patch("src.parser.JvmDaemonPool.run_shared", return_value=0) as run_shared,
+                patch("src.parser.JvmAdmission.shared") as admission,
+            ):
+                parser.patch_app(_patch_app())
+
+        admission.assert_not_called()
+        self.assertFalse(any(arg.startswith("-Xmx") for arg in run_shared.call_args.args[0]))
+
     def test_main_continues_after_writing_partial_metadata_for_failed_apps(self: Self) -> None:
         """The builder should keep partial output usable when at least one app patches successfully."""
         env = SimpleNamespace(read_env=lambda: None)
         config = SimpleNamespace(
             apps=["youtube", "reddit"],
+            artifact_store=False,
             ci_test=True,
             disable_caching=False,
+            download_segments=1,
             dry_run=False,
+            jvm_class_data_sharing=False,
+            jvm_daemon=False,
+            max_connections_per_host=6,
+            max_download_workers=4,
             max_parallel_apps=4,
+            max_resource_workers=3,
+            patches_native_metadata=False,
+            release_metadata_cache=False,
+            temp_folder=Path("apks"),
         )
         side_effects = [{"youtube": {"output_file_name": "youtube.apk"}}, PatchingFailedError("reddit failed")]
 
@@ -192,10 +222,20 @@ class BuilderFailureTests(TestCase):
         env = SimpleNamespace(read_env=lambda: None)
         config = SimpleNamespace(
             apps=["youtube", "reddit"],
+            artifact_store=False,
             ci_test=True,
             disable_caching=False,
+            download_segments=1,
             dry_run=False,
+            jvm_class_data_sharing=False,
+            jvm_daemon=False,
+            max_connections_per_host=6,
+            max_download_workers=4,
             max_parallel_apps=4,
+            max_resource_workers=3,
+            patches_native_metadata=False,
+            release_metadata_cache=False,
+            temp_folder=Path("apks"),
         )
 
         with (
@@ -211,3 +251,124 @@ class BuilderFailureTests(TestCase):
             self.assertRaisesRegex(PatchingFailedError, "reddit, youtube"),
         ):
             builder_main.main()
+
+    def test_parallel_pipeline_keeps_successful_apps_when_one_stage_fails(self: Self) -> None:
+        """A failure in one app's download stage must not stop other apps from reaching the patch stage."""
+        config = cast(
+            "RevancedConfig",
+            SimpleNamespace(apps=["youtube", "reddit"], max_download_workers=2, max_parallel_apps=1),
+        )
+
+        def acquire_apk(build: builder_main.AppBuild, *_args: object) -> builder_main.AppBuild:
+            if build.app.app_name == "reddit":
+                msg = "reddit apk unavailable"
+                raise PatchingFailedError(msg)
+            return build
+
+        with (
+            patch(
+                "main.fetch_app_resources",
+                side_effect=lambda app_name, *_: builder_main.AppBuild(cast("APP", SimpleNamespace(app_name=app_name))),
+            ),
+            patch("main.load_app_patches", side_effect=lambda build, _config: build),
+            patch("main.acquire_app_apk", side_effect=acquire_apk),
+            patch(
+                "main.patch_app_build",
+                side_effect=lambda build: {build.app.app_name: {"output_file_name": f"{build.app.app_name}.apk"}},
+            ) as patch_stage,
+            builder_main.AppPipeline(config, ({}, {}, Lock(), Lock())) as pipeline,
+        ):
+            results = {app_name: pipeline.submit(app_name) for app_name in config.apps}
+
+        # Only the app that cleared every earlier stage should occupy the JVM patch stage.
+        patch_stage.assert_called_once()
+        self.assertEqual({"youtube": {"output_file_name": "youtube.apk"}}, results["youtube"].result())
+        self.assertIsInstance(results["reddit"].exception(), PatchingFailedError)
+
+    def test_parallel_pipeline_shares_jvm_slots_between_list_patches_and_patching(self: Self) -> None:
+        """MAX_PARALLEL_APPS must cap list-patches and patch JVMs together, not each stage separately."""
+        config = cast(
+            "RevancedConfig",
+            SimpleNamespace(apps=["youtube", "reddit", "tiktok"], max_download_workers=3, max_parallel_apps=1),
+        )
+        running = 0
+        peak = 0
+        counter_lock = Lock()
+
+        def jvm_stage(build: builder_main.AppBuild, *_args: object) -> builder_main.AppBuild:
+            nonlocal running, peak
+            with counter_lock:
+                running += 1
+                peak = max(peak, running)
+            sleep(0.02)
+            with counter_lock:
+                running -= 1
+            return build
+
+        with (
+            patch(
+                "main.fetch_app_resources",
+                side_effect=lambda app_name, *_: builder_main.AppBuild(cast("APP", SimpleNamespace(app_name=app_name))),
+            ),
+            patch("main.load_app_patches", side_effect=jvm_stage),
+            patch("main.acquire_app_apk", side_effect=lambda build, *_: build),
+            patch(
+                "main.patch_app_build",
+                side_effect=lambda build: jvm_stage(build) and {build.app.app_name: {}},
+            ),
+            builder_main.AppPipeline(config, ({}, {}, Lock(), Lock())) as pipeline,
+        ):
+            results = [pipeline.submit(app_name) for app_name in config.apps]
+
+        self.assertEqual(1, peak)
+        self.assertTrue(all(result.exception() is None for result in results))
+
+    def test_parallel_pipeline_bounds_apks_waiting_for_patching(self: Self) -> None:
+        """The APK stage may only run one batch ahead of patching instead of downloading every app up front."""
+        config = cast(
+            "RevancedConfig",
+            SimpleNamespace(
+                apps=["youtube", "reddit", "tiktok", "twitter"],
+                max_download_workers=4,
+                max_parallel_apps=1,
+            ),
+        )
+        release_patching = Event()
+        metadata_loaded = Event()
+        loaded: list[str] = []
+        downloaded: list[str] = []
+
+        def load_patches(build: builder_main.AppBuild, _config: object) -> builder_main.AppBuild:
+            loaded.append(build.app.app_name)
+            if len(loaded) == len(config.apps):
+                metadata_loaded.set()
+            return build
+
+        def acquire_apk(build: builder_main.AppBuild, *_args: object) -> builder_main.AppBuild:
+            # Downloads finish only after every app is ready for them, so only the APK slots can hold them back.
+            metadata_loaded.wait(timeout=5)
+            downloaded.append(build.app.app_name)
+            return build
+
+        def patch_build(build: builder_main.AppBuild) -> dict[str, Any]:
+            release_patching.wait(timeout=5)
+            return {build.app.app_name: {}}
+
+        with (
+            patch(
+                "main.fetch_app_resources",
+                side_effect=lambda app_name, *_: builder_main.AppBuild(cast("APP", SimpleNamespace(app_name=app_name))),
+            ),
+            patch("main.load_app_patches", side_effect=load_patches),
+            patch("main.acquire_app_apk", side_effect=acquire_apk),
+            patch("main.patch_app_build", side_effect=patch_build),
+            builder_main.AppPipeline(config, ({}, {}, Lock(), Lock())) as pipeline,
+        ):
+            results = [pipeline.submit(app_name) for app_name in config.apps]
+            sleep(0.2)
+            # One APK is being patched and one more is ready; the other apps wait before downloading.
+            self.assertEqual(2, len(downloaded))
+            release_patching.set()
+
+        self.assertEqual(4, len(downloaded))
+        self.assertTrue(all(result.exception() is None for result in results))
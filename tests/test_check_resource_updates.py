@@ -0,0 +1,55 @@
+"""Tests for the scheduled resource-update check."""
+
+# The scheduled job runs for every app on each trigger, so the requests it issues per bundle URL are pinned here.
+# unittest keeps this coverage aligned with the existing project test style.
+# ruff: noqa: PT009
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Self, cast
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from check_resource_updates import BuildReason, ReleaseTagResolver, ResourceCheck, _check_app
+from src.manager.github import GitHubManager
+
+if TYPE_CHECKING:
+    from src.config import RevancedConfig
+
+PATCHES_URL = "https://github.com/ReVanced/revanced-patches/releases/latest"
+
+
+class ResourceCheckTests(TestCase):
+    """Verify release tags are resolved once per URL and without downloading resources."""
+
+    def test_concurrent_apps_share_one_release_lookup(self: Self) -> None:
+        """Apps that use the same bundle URL must wait for one release API request."""
+
+        def resolve(*_: object) -> tuple[str, str]:
+            return "v5.1.0", "https://github.com/ReVanced/revanced-patches/releases/download/v5.1.0/patches.rvp"
+
+        resolver = ReleaseTagResolver(cast("RevancedConfig", SimpleNamespace()))
+        with patch("check_resource_updates.APP.resolve_release", side_effect=resolve) as resolve_release:
+            with ThreadPoolExecutor(4) as executor:
+                tags = list(executor.map(resolver.tag, [PATCHES_URL] * 8))
+            tags.append(resolver.tag(f" {PATCHES_URL} "))
+
+        self.assertEqual(["v5.1.0"] * 9, tags)
+        resolve_release.assert_called_once()
+
+    def test_metadata_check_compares_tags_without_downloading(self: Self) -> None:
+        """A changed bundle tag must be reported from release metadata alone."""
+        app = MagicMock(app_name="youtube", patches_dl_list=[PATCHES_URL])
+        manager = MagicMock(spec=GitHubManager)
+        manager.get_last_version.return_value = "v5.0.0"
+        manager.get_last_version_source.return_value = PATCHES_URL
+        resolver = MagicMock(spec=ReleaseTagResolver)
+        resolver.tag.return_value = "v5.1.0"
+        check = ResourceCheck(cast("RevancedConfig", SimpleNamespace()), manager, resolver)
+
+        with patch("check_resource_updates.get_app", return_value=app):
+            build_info = _check_app("youtube", check)
+
+        app.download_patch_resources.assert_not_called()
+        self.assertEqual(BuildReason.VERSION_UPDATE, getattr(build_info, "reason", None))
+        self.assertEqual(["v5.1.0"], getattr(build_info, "new_versions", None))
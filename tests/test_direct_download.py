@@ -2,18 +2,24 @@
 
 # Direct download headers are part of the integration contract with binary bundle endpoints.
 # unittest keeps this test consistent with the existing test suite dependencies.
-# ruff: noqa: PT009
+# ruff: noqa: PT009, PT027, SLF001
 
+from collections.abc import Iterator
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from types import SimpleNamespace
-from typing import TYPE_CHECKING, Self, cast
+from typing import TYPE_CHECKING, Any, Self, cast
 from unittest import TestCase
 from unittest.mock import patch
 from zipfile import ZipFile
 
+from requests.exceptions import ChunkedEncodingError
+
+from src.artifact_store import ArtifactStore
 from src.config import RevancedConfig
+from src.downloader import download
 from src.downloader.download import Downloader
+from src.exceptions import DownloadError
 
 if TYPE_CHECKING:
     from src.app import APP
@@ -25,21 +31,53 @@ class _BinaryResponse:
     status_code = 200
     text = ""
 
-    def __init__(self: Self, body: bytes) -> None:
+    def __init__(self: Self, body: bytes, etag: str | None = None) -> None:
         """Store bytes so the downloader writes a real file during the test."""
         self._body = body
         self.headers = {"content-length": str(len(body))}
+        if etag is not None:
+            self.headers["etag"] = etag
         self.closed = False
+        self.body_read = False
 
-    def iter_content(self: Self, chunk_size: int) -> list[bytes]:
+    def iter_content(self: Self, chunk_size: int) -> Iterator[bytes]:
         """Return one chunk because chunking behavior is not what this test is verifying."""
-        return [self._body]
+        self.body_read = True
+        # Like requests, a closed response has no body left to stream.
+        return iter([] if self.closed else [self._body])
 
     def close(self: Self) -> None:
         """Record close calls because streamed responses must release their connection."""
         self.closed = True
 
 
+class _InterruptedResponse(_BinaryResponse):
+    """Response double whose connection drops after part of the body, as a reset mid-transfer would."""
+
+    def __init__(self: Self, body: bytes, delivered: int) -> None:
+        """Advertise a resumable artifact but deliver only the first bytes before failing."""
+        super().__init__(body, etag='"v1"')
+        self.headers["accept-ranges"] = "bytes"
+        self._delivered = delivered
+
+    def iter_content(self: Self, chunk_size: int) -> Iterator[bytes]:
+        """Yield the delivered prefix and then fail like a reset connection."""
+        self.body_read = True
+        yield self._body[: self._delivered]
+        raise ChunkedEncodingError
+
+
+class _RangeResponse(_BinaryResponse):
+    """Response double for a 206 answer that continues an artifact from an offset."""
+
+    status_code = 206
+
+    def __init__(self: Self, body: bytes, start: int) -> None:
+        """Serve the remainder of the artifact with the matching Content-Range."""
+        super().__init__(body[start:], etag='"v1"')
+        self.headers["content-range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+
+
 def _config(temp_folder: Path) -> RevancedConfig:
     """Build only the config fields needed by the direct downloader."""
     return cast(
@@ -51,6 +89,9 @@ def _config(temp_folder: Path) -> RevancedConfig:
             personal_access_token=None,
             dry_run=False,
             disable_caching=False,
+            download_segments=1,
+            download_min_segment_mb=16,
+            max_connections_per_host=6,
             temp_folder=temp_folder,
         ),
     )
@@ -125,6 +166,162 @@ class DirectDownloadTests(TestCase):
             self.assertEqual([], list(Path(tmp_dir).glob(".patches.rvp.*.part")))
             self.assertTrue(response.closed)
 
+    def test_store_keeps_one_blob_for_identical_bytes_from_different_urls(self: Self) -> None:
+        """The same artifact fetched via two URLs must be stored once and hardlinked to both working names."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            responses = [_BinaryResponse(b"cli-jar", etag='"a"'), _BinaryResponse(b"cli-jar", etag='"b"')]
+
+            with (
+                patch.object(ArtifactStore, "_shared", new=ArtifactStore(Path(tmp_dir, ".cas"))),
+                patch("src.downloader.download.session.get", side_effect=responses),
+            ):
+                Downloader(config).direct_download("https://github.com/cli/releases/latest/cli.jar", "cli.jar")
+                Downloader(config).direct_download("https://api.github.com/assets/1", "cli-latest.jar")
+
+            blobs = list(Path(tmp_dir, ".cas", "blobs").rglob("*"))
+            self.assertEqual(1, len([blob for blob in blobs if blob.is_file()]))
+            self.assertTrue(Path(tmp_dir, "cli.jar").samefile(Path(tmp_dir, "cli-latest.jar")))
+
+    def test_store_reuses_unchanged_artifact_without_reading_body(self: Self) -> None:
+        """A matching ETag means the stored blob is current, so the response body must not be downloaded."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            url = "https://api.revanced.app/v5/patches.rvp"
+            first, second = _BinaryResponse(b"bundle", etag='"v1"'), _BinaryResponse(b"bundle", etag='"v1"')
+
+            with (
+                patch.object(ArtifactStore, "_shared", new=ArtifactStore(Path(tmp_dir, ".cas"))),
+                patch("src.downloader.download.session.get", side_effect=[first, second]),
+            ):
+                Downloader(config).direct_download(url, "patches.rvp")
+                Path(tmp_dir, "patches.rvp").unlink()
+                Downloader(config).direct_download(url, "patches.rvp")
+
+            self.assertEqual(b"bundle", Path(tmp_dir, "patches.rvp").read_bytes())
+            self.assertTrue(first.body_read)
+            self.assertFalse(second.body_read)
+            self.assertTrue(second.closed)
+
+    def test_unchanged_artifact_is_revalidated_with_conditional_get(self: Self) -> None:
+        """A stored artifact is revalidated with If-None-Match, and a 304 reuses it without a body."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            url = "https://api.revanced.app/v5/patches.rvp"
+            not_modified = _BinaryResponse(b"", etag='"v1"')
+            not_modified.status_code = 304
+            responses = [_BinaryResponse(b"bundle", etag='"v1"'), not_modified]
+
+            with (
+                patch.object(ArtifactStore, "_shared", new=ArtifactStore(Path(tmp_dir, ".cas"))),
+                patch("src.downloader.download.session.get", side_effect=responses) as request_get,
+            ):
+                Downloader(config).direct_download(url, "patches.rvp")
+                Downloader(config).direct_download(url, "patches-copy.rvp")
+
+            self.assertNotIn("If-None-Match", request_get.call_args_list[0].kwargs["headers"])
+            self.assertEqual('"v1"', request_get.call_args_list[1].kwargs["headers"]["If-None-Match"])
+            self.assertEqual(b"bundle", Path(tmp_dir, "patches-copy.rvp").read_bytes())
+            self.assertFalse(not_modified.body_read)
+
+    def test_interrupted_download_resumes_with_range_request(self: Self) -> None:
+        """A dropped connection must continue from the partial file instead of downloading everything again."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            body = b"0123456789"
+            responses = [_InterruptedResponse(body, delivered=4), _RangeResponse(body, start=4)]
+
+            with patch("src.downloader.download.session.get", side_effect=responses) as request_get:
+                Downloader(config).direct_download("https://github.com/cli/releases/latest/cli.jar", "cli.jar")
+
+            resume_headers = request_get.call_args_list[1].kwargs["headers"]
+            self.assertEqual(body, Path(tmp_dir, "cli.jar").read_bytes())
+            self.assertEqual("bytes=4-", resume_headers["Range"])
+            self.assertEqual('"v1"', resume_headers["If-Range"])
+            self.assertEqual([], list(Path(tmp_dir).glob(".cli.jar.*")))
+
+    def test_segmented_download_fetches_ranges_into_one_file(self: Self) -> None:
+        """Range-capable artifacts are split across connections and reassembled at their byte offsets."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            config.download_segments = 3
+            config.download_min_segment_mb = 0
+            body = b"segmented-artifact-body"
+            requested_ranges: list[str] = []
+
+            def serve(_url: str, **kwargs: Any) -> _BinaryResponse:
+                byte_range = kwargs["headers"].get("Range")
+                if byte_range is None:
+                    probe = _BinaryResponse(body, etag='"v1"')
+                    probe.headers["accept-ranges"] = "bytes"
+                    return probe
+                requested_ranges.append(byte_range)
+                start, end = map(int, byte_range.removeprefix("bytes=").split("-"))
+                segment = _RangeResponse(body[: end + 1], start=start)
+                segment.headers["content-range"] = f"bytes {start}-{end}/{len(body)}"
+                return segment
+
+            with patch("src.downloader.download.session.get", side_effect=serve):
+                Downloader(config).direct_download("https://github.com/cli/releases/latest/cli.jar", "cli.jar")
+
+            self.assertEqual(body, Path(tmp_dir, "cli.jar").read_bytes())
+            self.assertEqual({"bytes=0-7", "bytes=8-15", "bytes=16-22"}, set(requested_ranges))
+
+    def test_failed_segments_fall_back_to_a_fresh_stream(self: Self) -> None:
+        """Segments answered with 200 must fall back to a new request, not to the probe closed before segmenting."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            config.download_segments = 3
+            config.download_min_segment_mb = 0
+            body = b"segmented-artifact-body"
+            probes: list[_BinaryResponse] = []
+
+            def serve(_url: str, **kwargs: Any) -> _BinaryResponse:
+                response = _BinaryResponse(body, etag='"v1"')
+                response.headers["accept-ranges"] = "bytes"
+                if "Range" not in kwargs["headers"]:
+                    probes.append(response)
+                # Ignoring the Range header makes every segment fail its 206 check.
+                return response
+
+            with patch("src.downloader.download.session.get", side_effect=serve):
+                Downloader(config).direct_download("https://github.com/cli/releases/latest/cli.jar", "cli.jar")
+
+            self.assertEqual(body, Path(tmp_dir, "cli.jar").read_bytes())
+            self.assertEqual(2, len(probes))
+
+    def test_short_download_is_not_published(self: Self) -> None:
+        """A body shorter than Content-Length must fail instead of leaving a truncated artifact in place."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            response = _BinaryResponse(b"partial")
+            response.headers["content-length"] = "100"
+
+            with (
+                patch("src.downloader.download.session.get", return_value=response),
+                self.assertRaises(DownloadError),
+            ):
+                Downloader(config).direct_download("https://github.com/cli/releases/latest/cli.jar", "cli.jar")
+
+            self.assertEqual([], list(Path(tmp_dir).iterdir()))
+
+    def test_partial_file_locks_are_dropped_after_downloads_finish(self: Self) -> None:
+        """Per-URL locks must not accumulate once their successful or failed downloads end."""
+        with TemporaryDirectory() as tmp_dir:
+            config = _config(Path(tmp_dir))
+            short_response = _BinaryResponse(b"partial")
+            short_response.headers["content-length"] = "100"
+
+            with patch("src.downloader.download.session.get", return_value=_BinaryResponse(b"cli")):
+                Downloader(config).direct_download("https://github.com/cli/releases/latest/cli.jar", "cli.jar")
+            with (
+                patch("src.downloader.download.session.get", return_value=short_response),
+                self.assertRaises(DownloadError),
+            ):
+                Downloader(config).direct_download("https://github.com/cli/releases/latest/apk.jar", "apk.jar")
+
+        self.assertEqual({}, download._partial_file_locks)
+
     def test_convert_to_apk_keeps_real_apk_without_apkeditor(self: Self) -> None:
         """A proper APK should not be passed through APKEditor just because APKs are zip archives."""
         with TemporaryDirectory() as tmp_dir:
@@ -185,7 +382,7 @@ class DirectDownloadTests(TestCase):
             app = cast(
                 "APP",
                 # The non-Morphe profile keeps the historical merge behavior even if the source suffix is APKM.
-                SimpleNamespace(app_name="INSTAGRAM_REVANCED", effective_cli_argsf="revanced-cli"),
+                SimpleNamespace(app_name="INSTAGRAM_REVANCED", effective_cli_argsf="revanced-cli", archs_to_build=[]),
             )
             downloader = Downloader(config)
 
@@ -202,3 +399,31 @@ class DirectDownloadTests(TestCase):
         self.assertEqual("INSTAGRAM_REVANCED.apk", output_file)
         self.assertEqual("https://example/apkm", download_url)
         convert_to_apk.assert_called_once_with("INSTAGRAM_REVANCED.apkm")
+
+    def test_prune_abi_splits_drops_unbuilt_abis_and_keeps_download(self: Self) -> None:
+        """Only the built ABIs' splits reach APKEditor, while the downloaded bundle stays intact for reuse checks."""
+        names = [
+            "base.apk",
+            "split_config.arm64_v8a.apk",
+            "split_config.armeabi_v7a.apk",
+            "split_config.x86_64.apk",
+            "split_config.xxhdpi.apk",
+            "info.json",
+        ]
+        with TemporaryDirectory() as tmp_dir:
+            _write_zip(Path(tmp_dir, "youtube.apkm"), names)
+            downloader = Downloader(_config(Path(tmp_dir)))
+
+            pruned_name = downloader.prune_abi_splits("youtube.apkm", ["arm64-v8a"])
+            missing_abi_name = downloader.prune_abi_splits("youtube.apkm", ["x86"])
+
+            with ZipFile(Path(tmp_dir, pruned_name)) as pruned:
+                pruned_names = pruned.namelist()
+            with ZipFile(Path(tmp_dir, "youtube.apkm")) as original:
+                original_names = original.namelist()
+
+        self.assertEqual("youtube-arm64-v8a.apkm", pruned_name)
+        self.assertEqual([name for name in names if "armeabi" not in name and "x86" not in name], pruned_names)
+        self.assertEqual(names, original_names)
+        # Pruning every ABI split would leave the merged APK without native libraries, so the bundle is merged as-is.
+        self.assertEqual("youtube.apkm", missing_abi_name)
@@ -0,0 +1,47 @@
+"""Tests for the run-wide fetch pool."""
+
+# Resource fetches from every app share this pool, so its per-host limit and queueing are pinned here.
+# unittest keeps this coverage aligned with the existing project test style.
+# ruff: noqa: PT009
+
+from threading import Event
+from typing import Self
+from unittest import TestCase
+
+from src.downloader.fetch_pool import FetchPool
+
+
+class FetchPoolTests(TestCase):
+    """Verify host limits queue fetches without blocking fetches to other hosts."""
+
+    def test_busy_host_queues_without_blocking_other_hosts(self: Self) -> None:
+        """A host at its limit must not hold back a different host, and its queued fetch runs once a slot frees."""
+        pool = FetchPool(max_workers=2, per_host=1)
+        self.addCleanup(pool.shutdown)
+        release_first = Event()
+
+        first = pool.submit("https://github.com/a", lambda: release_first.wait(timeout=5) and "first")
+        queued = pool.submit("https://github.com/b", lambda: "queued")
+        other_host = pool.submit("https://gitlab.com/c", lambda: "other")
+
+        # Only two threads exist; the queued github.com fetch must not have taken the second one.
+        self.assertEqual("other", other_host.result(timeout=5))
+        self.assertFalse(queued.done())
+        release_first.set()
+        self.assertEqual("first", first.result(timeout=5))
+        self.assertEqual("queued", queued.result(timeout=5))
+
+    def test_failed_fetch_releases_its_host_slot(self: Self) -> None:
+        """An exception must reach the caller and still let the next fetch to that host start."""
+        pool = FetchPool(max_workers=1, per_host=1)
+        self.addCleanup(pool.shutdown)
+
+        def fail() -> str:
+            msg = "boom"
+            raise OSError(msg)
+
+        failed = pool.submit("https://github.com/a", fail)
+        following = pool.submit("https://github.com/b", lambda: "ok")
+
+        self.assertIsInstance(failed.exception(timeout=5), OSError)
+        self.assertEqual("ok", following.result(timeout=5))
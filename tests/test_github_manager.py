@@ -0,0 +1,65 @@
+"""Tests for the run-wide updates.json document."""
+
+# The resource check asks for several versions per app, so the number of updates.json downloads is pinned here.
+# unittest keeps this coverage aligned with the existing project test style.
+# ruff: noqa: PT009
+
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Self, cast
+from unittest import TestCase
+from unittest.mock import patch
+
+from environs import Env
+
+from src.manager.github import GitHubManager
+from src.utils import app_dump_key, load_older_updates
+
+if TYPE_CHECKING:
+    from src.app import APP
+
+UPDATES_URL = "https://raw.githubusercontent.com/owner/repo/changelogs/updates.json"
+
+
+class _UpdatesResponse:
+    """Response double carrying a published updates.json."""
+
+    def __init__(self: Self, payload: dict[str, Any]) -> None:
+        """Store the document the server answers with."""
+        self._payload = payload
+        self.status_code = 200
+
+    def json(self: Self) -> dict[str, Any]:
+        """Return the prepared document."""
+        return self._payload
+
+
+class UpdatesDocumentTests(TestCase):
+    """Verify updates.json is downloaded once and shared by every reader."""
+
+    def setUp(self: Self) -> None:
+        """Start each test without documents cached by earlier tests."""
+        cache_patch = patch.dict("src.utils._updates_documents", clear=True)
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+    def test_manager_lookups_share_one_download(self: Self) -> None:
+        """Both version lookups for every app must be served from a single request."""
+        payload = {"youtube": {"revanced_patches": "v5.0.0", app_dump_key: {"revanced_patches": "https://x/p.rvp"}}}
+        youtube = cast("APP", SimpleNamespace(app_name="youtube"))
+        reddit = cast("APP", SimpleNamespace(app_name="reddit"))
+
+        with (
+            patch.dict("os.environ", {"GITHUB_REPOSITORY": "owner/repo", "DRY_RUN": "False"}),
+            patch("src.utils.session.get", return_value=_UpdatesResponse(payload)) as get,
+        ):
+            manager = GitHubManager(Env())
+            self.assertEqual("v5.0.0", manager.get_last_version(youtube, "revanced_patches"))
+            self.assertEqual("https://x/p.rvp", manager.get_last_version_source(youtube, "revanced_patches"))
+            self.assertEqual("0", manager.get_last_version(reddit, "revanced_patches"))
+            older_updates = load_older_updates(Env())
+
+        get.assert_called_once()
+        self.assertEqual(UPDATES_URL, get.call_args.args[0])
+        # The build mutates its copy, which must not leak into later manager lookups.
+        older_updates["youtube"]["revanced_patches"] = "v6.0.0"
+        self.assertEqual("v5.0.0", manager.get_last_version(youtube, "revanced_patches"))
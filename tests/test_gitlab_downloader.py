@@ -5,6 +5,7 @@
 # ruff: noqa: SLF001, PT009
 
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from types import SimpleNamespace
 from typing import Any, cast
 from unittest import TestCase
@@ -14,6 +15,7 @@ from src.app import APP
 from src.config import RevancedConfig
 from src.downloader.factory import DownloaderFactory
 from src.downloader.gitlab import Gitlab
+from src.downloader.release_cache import ReleaseMetadataCache
 
 
 class _GitlabResponse:
@@ -22,9 +24,11 @@ class _GitlabResponse:
     status_code = 200
     text = ""
 
-    def __init__(self, payload: dict[str, Any]) -> None:
+    def __init__(self, payload: dict[str, Any], status_code: int = 200) -> None:
         """Store the GitLab API payload that the downloader will inspect."""
         self._payload = payload
+        self.status_code = status_code
+        self.headers = {"etag": '"release-v1"'}
 
     def json(self) -> dict[str, Any]:
         """Return the prepared payload so tests stay independent of network calls."""
@@ -102,7 +106,7 @@ class GitlabDownloaderTests(TestCase):
         }
 
         with (
-            patch("src.downloader.gitlab.requests.get", return_value=_GitlabResponse(release_payload)) as request_get,
+            patch("src.downloader.gitlab.session.get", return_value=_GitlabResponse(release_payload)) as request_get,
             patch("src.downloader.gitlab.update_changelog") as update_changelog,
         ):
             tag, download_url = Gitlab._get_release_assets(
@@ -126,6 +130,51 @@ class GitlabDownloaderTests(TestCase):
         self.assertEqual("gitlab.com/group/revanced-patches", update_changelog.call_args.args[0])
         self.assertEqual("Release notes", update_changelog.call_args.args[1]["body"])
 
+    def test_release_metadata_is_fetched_once_per_run_and_revalidated_later(self) -> None:
+        """Repeated lookups reuse this run's release JSON, and a later run revalidates it with its ETag."""
+        release_payload: dict[str, Any] = {"tag_name": "v1.2.3", "assets": {"links": []}}
+
+        with TemporaryDirectory() as temp_dir, patch("src.downloader.gitlab.update_changelog"):
+            cache_file = Path(temp_dir, "release-metadata-cache.json")
+            with (
+                patch.object(ReleaseMetadataCache, "_shared", new=ReleaseMetadataCache(cache_file, 0)),
+                patch("src.downloader.gitlab.session.get", return_value=_GitlabResponse(release_payload)) as first_run,
+            ):
+                for _ in range(2):
+                    Gitlab._get_release_assets("https://gitlab.com", "group/app", "v1.2.3", ".*apk", _config())
+
+            # A fresh cache instance reads the persisted entry, just like the next builder run would.
+            with (
+                patch.object(ReleaseMetadataCache, "_shared", new=ReleaseMetadataCache(cache_file, 0)),
+                patch("src.downloader.gitlab.session.get", return_value=_GitlabResponse({}, 304)) as next_run,
+            ):
+                tag, _ = Gitlab._get_release_assets("https://gitlab.com", "group/app", "v1.2.3", ".*apk", _config())
+
+        first_run.assert_called_once()
+        self.assertEqual('"release-v1"', next_run.call_args.kwargs["headers"]["If-None-Match"])
+        self.assertEqual("v1.2.3", tag)
+
+    def test_opt_in_ttl_lets_a_later_run_reuse_release_metadata(self) -> None:
+        """Only an operator-set TTL may serve persisted release JSON to a later run without revalidating it."""
+        release_payload: dict[str, Any] = {"tag_name": "v1.2.3", "assets": {"links": []}}
+
+        with TemporaryDirectory() as temp_dir, patch("src.downloader.gitlab.update_changelog"):
+            cache_file = Path(temp_dir, "release-metadata-cache.json")
+            with (
+                patch.object(ReleaseMetadataCache, "_shared", new=ReleaseMetadataCache(cache_file, 900)),
+                patch("src.downloader.gitlab.session.get", return_value=_GitlabResponse(release_payload)),
+            ):
+                Gitlab._get_release_assets("https://gitlab.com", "group/app", "v1.2.3", ".*apk", _config())
+
+            with (
+                patch.object(ReleaseMetadataCache, "_shared", new=ReleaseMetadataCache(cache_file, 900)),
+                patch("src.downloader.gitlab.session.get") as next_run,
+            ):
+                tag, _ = Gitlab._get_release_assets("https://gitlab.com", "group/app", "v1.2.3", ".*apk", _config())
+
+        next_run.assert_not_called()
+        self.assertEqual("v1.2.3", tag)
+
     def test_asset_name_can_match_when_url_hides_file_extension(self) -> None:
         """GitLab asset links can point at external URLs, so keep the release asset name in the match surface."""
         release_payload: dict[str, Any] = {
@@ -0,0 +1,65 @@
+"""Tests for per-host request throttling."""
+
+# Parallel APKMirror scraping relies on this throttle to back off together, so its window decisions are pinned here.
+# unittest keeps this coverage aligned with the existing project test style.
+# ruff: noqa: PT009, PT027
+
+from threading import Event, Thread
+from typing import Self
+from unittest import TestCase
+
+from src.downloader.throttle import HostThrottle
+
+
+class HostThrottleTests(TestCase):
+    """Verify the AIMD window and the request pacing of a host throttle."""
+
+    def test_pushback_halves_window_once_per_congestion_event(self: Self) -> None:
+        """Requests that were already in flight when the window shrank must not shrink it again."""
+        throttle = HostThrottle(requests_per_second=1000, burst=8, max_concurrency=8)
+
+        with throttle.request() as first, throttle.request() as second:
+            first.pushed_back = True
+            second.pushed_back = True
+
+        self.assertEqual(4, throttle.concurrency_limit)
+
+    def test_successes_grow_window_back_to_its_maximum(self: Self) -> None:
+        """After pushback the window must recover additively and never exceed the configured maximum."""
+        throttle = HostThrottle(requests_per_second=1000, burst=8, max_concurrency=4)
+        with throttle.request() as outcome:
+            outcome.pushed_back = True
+        self.assertEqual(2, throttle.concurrency_limit)
+
+        for _ in range(20):
+            with throttle.request():
+                pass
+
+        self.assertEqual(4, throttle.concurrency_limit)
+
+    def test_full_window_blocks_until_a_request_finishes(self: Self) -> None:
+        """A request beyond the window must wait for a slot instead of reaching the host."""
+        throttle = HostThrottle(requests_per_second=1000, burst=8, max_concurrency=1)
+        second_started = Event()
+
+        def second_request() -> None:
+            with throttle.request():
+                second_started.set()
+
+        with throttle.request():
+            waiter = Thread(target=second_request)
+            waiter.start()
+            self.assertFalse(second_started.wait(timeout=0.2))
+
+        waiter.join(timeout=5)
+        self.assertTrue(second_started.is_set())
+
+    def test_failed_request_leaves_window_unchanged(self: Self) -> None:
+        """A connection error is not a rate-limit signal, so it must neither widen nor narrow the window."""
+        throttle = HostThrottle(requests_per_second=1000, burst=8, max_concurrency=4)
+
+        with self.assertRaises(OSError), throttle.request():
+            msg = "connection reset"
+            raise OSError(msg)
+
+        self.assertEqual(4, throttle.concurrency_limit)
@@ -0,0 +1,79 @@
+"""Tests for targeted HTML parsing of scraped pages."""
+
+# Scrapers now build only the subtrees they read, so each lookup is pinned against a full-page parse here.
+# The pages in tests/fixtures/html are synthetic, not captures: real markup around each target, filler elsewhere.
+# unittest keeps this coverage aligned with the existing project test style.
+# ruff: noqa: PT009, PT027
+
+from pathlib import Path
+from typing import Self
+from unittest import TestCase
+from unittest.mock import patch
+
+from bs4 import BeautifulSoup
+from bs4.filter import SoupStrainer
+
+from src.downloader.apkmirror import APKMIRROR_PAGE_CLASSES
+from src.downloader.page_cache import CachedPage
+from src.html_parsing import find_by_id, has_class, html_parser, parse_html
+
+FIXTURES = Path(__file__).parent.joinpath("fixtures", "html")
+
+
+def _fixture(name: str) -> str:
+    """Return a fixture page."""
+    return FIXTURES.joinpath(name).read_text()
+
+
+class HtmlParsingTests(TestCase):
+    """Verify targeted parsing finds exactly what a full parse finds."""
+
+    def test_class_lookups_match_full_parse(self: Self) -> None:
+        """Multi-class values and single classes of a multi-class element must both match like find(class_=...)."""
+        lookups = [
+            ("apkmirror_release.html", "tab-pane noPadding"),
+            ("apkmirror_release.html", "tab-pane"),
+            ("apkmirror_variant.html", "center"),
+            ("apkmirror_variant.html", "apkm-badge"),
+            ("apkmirror_variant.html", "appspec-value"),
+        ]
+        for fixture, class_name in lookups:
+            markup = _fixture(fixture)
+            expected = BeautifulSoup(markup, html_parser).find(class_=class_name)
+            page = CachedPage(fixture, markup, APKMIRROR_PAGE_CLASSES)
+            with self.subTest(fixture=fixture, class_name=class_name):
+                self.assertIsNotNone(expected)
+                self.assertEqual(str(expected), str(page.find_by_class(class_name)))
+
+    def test_cached_page_is_parsed_once_for_every_lookup(self: Self) -> None:
+        """The variant and force-download pages serve several class lookups from a single parse."""
+        page = CachedPage("variant", _fixture("apkmirror_variant.html"), APKMIRROR_PAGE_CLASSES)
+
+        with patch("src.downloader.page_cache.parse_html", wraps=parse_html) as parse:
+            for class_name in ("center", "appspec-value", "apkm-badge"):
+                self.assertIsNotNone(page.find_by_class(class_name))
+
+        parse.assert_called_once()
+        with self.assertRaises(ValueError):
+            page.find_by_class("not-kept")
+
+    def test_id_lookup_matches_full_parse(self: Self) -> None:
+        """Uptodown's download button must keep every attribute the downloader reads."""
+        markup = _fixture("uptodown_detail.html")
+
+        button = find_by_id(markup, "button", "detail-download-button")
+
+        expected = BeautifulSoup(markup, html_parser).find("button", id="detail-download-button")
+        self.assertEqual(str(expected), str(button))
+        self.assertIsNone(find_by_id(markup, "button", "missing-button"))
+
+    def test_strained_selector_finds_icon(self: Self) -> None:
+        """A CSS selector must still work inside the kept subtree."""
+        markup = _fixture("apkmirror_search.html")
+
+        soup = parse_html(markup, SoupStrainer("div", class_=has_class("bubble-wrap")))
+
+        self.assertEqual(
+            BeautifulSoup(markup, html_parser).select_one("div.bubble-wrap > img"),
+            soup.select_one("div.bubble-wrap > img"),
+        )
@@ -0,0 +1,143 @@
+"""Regression tests for memory-aware JVM admission."""
+
+# Patch JVMs on shared runners must queue instead of exhausting memory, so admission decisions are pinned here.
+# unittest keeps this coverage aligned with the existing project test style.
+# ruff: noqa: PT009, SLF001
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Self, cast
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.jvm import (
+    JVM_NON_HEAP_OVERHEAD_MB,
+    MINIMUM_HEAP_MB,
+    ClassDataSharing,
+    JvmAdmission,
+    available_memory_mb,
+)
+
+if TYPE_CHECKING:
+    from src.config import RevancedConfig
+
+
+class JvmAdmissionTests(TestCase):
+    """Verify heap sizing, learning and admission of concurrent patch JVMs."""
+
+    def test_unseen_app_uses_default_heap_and_learned_app_uses_its_peak(self: Self) -> None:
+        """Apps without history get the configured default, while known apps are sized from their last peak."""
+        with TemporaryDirectory() as temp_dir:
+            estimates_file = Path(temp_dir, "jvm-heap-estimates.json")
+            JvmAdmission(estimates_file, 2048, None, 4).record("youtube", 1256)
+
+            admission = JvmAdmission(estimates_file, 2048, None, 4)
+
+            self.assertEqual(2048, admission.heap_mb("reddit"))
+            # The stored peak includes non-heap memory, which is removed before headroom is applied.
+            self.assertEqual(1250, admission.heap_mb("youtube"))
+
+    def test_heap_is_capped_by_budget_but_never_below_minimum(self: Self) -> None:
+        """A small runner should shrink -Xmx to what fits, without going below a usable heap."""
+        with TemporaryDirectory() as temp_dir:
+            estimates_file = Path(temp_dir, "jvm-heap-estimates.json")
+
+            self.assertEqual(1024, JvmAdmission(estimates_file, 2048, 1024 + JVM_NON_HEAP_OVERHEAD_MB, 4).heap_mb("x"))
+            self.assertEqual(MINIMUM_HEAP_MB, JvmAdmission(estimates_file, 2048, 256, 4).heap_mb("x"))
+
+    def test_second_job_waits_until_memory_is_released(self: Self) -> None:
+        """Two jobs that do not fit together must run one after the other."""
+        with TemporaryDirectory() as temp_dir:
+            admission = JvmAdmission(Path(temp_dir, "jvm-heap-estimates.json"), 1024, 2048, 4)
+            second_admitted = Event()
+
+            def admit_second() -> None:
+                with admission.admit("reddit"):
+                    second_admitted.set()
+
+            with admission.admit("youtube"):
+                waiter = Thread(target=admit_second)
+                waiter.start()
+                # The first job reserved 1024 MiB plus overhead, leaving too little for an identical second job.
+                self.assertFalse(second_admitted.wait(timeout=0.2))
+
+            waiter.join(timeout=5)
+            self.assertTrue(second_admitted.is_set())
+
+    def test_shared_budget_excludes_warm_daemon_heaps(self: Self) -> None:
+        """Daemon heaps stay allocated for the whole run, so patch jobs may only be admitted into what is left."""
+        with TemporaryDirectory() as temp_dir:
+            config = cast(
+                "RevancedConfig",
+                SimpleNamespace(
+                    temp_folder=Path(temp_dir),
+                    jvm_heap_estimates_file_name="jvm-heap-estimates.json",
+                    jvm_memory_reserve_mb=512,
+                    jvm_default_heap_mb=1024,
+                    jvm_daemon=True,
+                    jvm_daemon_pool_size=2,
+                ),
+            )
+
+            with (
+                patch.dict(JvmAdmission._instances, clear=True),
+                patch("src.jvm.available_memory_mb", return_value=8192),
+                patch("src.jvm.available_cpus", return_value=4),
+            ):
+                admission = JvmAdmission.shared(config)
+
+        self.assertEqual(8192 - 512 - 2 * (1024 + JVM_NON_HEAP_OVERHEAD_MB), admission.memory_budget_mb)
+
+    def test_available_memory_honours_cgroup_limit(self: Self) -> None:
+        """A container limit below host MemAvailable must bound the budget."""
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            root.joinpath("meminfo").write_text("MemTotal: 16777216 kB\nMemAvailable: 8388608 kB\n")
+            root.joinpath("memory.max").write_text(f"{4096 * 1024 * 1024}\n")
+            root.joinpath("memory.current").write_text(f"{1024 * 1024 * 1024}\n")
+
+            with patch("src.jvm.MEMINFO_PATH", root.joinpath("meminfo")), patch("src.jvm.CGROUP_V2_ROOT", root):
+                self.assertEqual(3072, available_memory_mb())
+
+
+class ClassDataSharingTests(TestCase):
+    """Verify per-jar AppCDS archives are created once and then reused."""
+
+    def test_first_launch_creates_archive_and_concurrent_launches_skip_it(self: Self) -> None:
+        """Only one JVM may dump an archive; others must not map a file that is still being written."""
+        with TemporaryDirectory() as temp_dir, patch.object(ClassDataSharing, "enabled", new=True):
+            jar_file = Path(temp_dir, "revanced-cli.jar")
+            jar_file.write_bytes(b"cli")
+            archive = ClassDataSharing.archive_path(jar_file)
+
+            with ClassDataSharing.java_options(jar_file) as creator_options:
+                with ClassDataSharing.java_options(jar_file) as concurrent_options:
+                    self.assertEqual([], concurrent_options)
+                with ClassDataSharing.java_options(jar_file) as later_concurrent_options:
+                    self.assertEqual([], later_concurrent_options)
+                archive.write_bytes(b"archive")
+
+            with ClassDataSharing.java_options(jar_file) as reuse_options:
+                pass
+
+        self.assertIn("-XX:+AutoCreateSharedArchive", creator_options)
+        self.assertIn(f"-XX:SharedArchiveFile={archive}", reuse_options)
+        # Reusing launches still allow auto-creation so the JVM can replace an archive it rejects.
+        self.assertIn("-XX:+AutoCreateSharedArchive", reuse_options)
+
+    def test_updated_jar_replaces_archive_for_old_contents(self: Self) -> None:
+        """A re-downloaded jar under the same name must get a new archive and drop the stale one."""
+        with TemporaryDirectory() as temp_dir, patch.object(ClassDataSharing, "enabled", new=True):
+            jar_file = Path(temp_dir, "apkeditor.jar")
+            jar_file.write_bytes(b"v1")
+            stale_archive = ClassDataSharing.archive_path(jar_file)
+            stale_archive.write_bytes(b"archive")
+            jar_file.write_bytes(b"v2-updated")
+
+            with ClassDataSharing.java_options(jar_file) as options:
+                pass
+
+            self.assertFalse(stale_archive.exists())
+        self.assertIn("-XX:+AutoCreateSharedArchive", options)
@@ -0,0 +1,77 @@
+"""Regression tests for the warm JVM daemon protocol."""
+
+# The daemon replaces per-command JVM launches, so framing, exit codes and fallback must stay exact.
+# unittest keeps this coverage aligned with the existing project test style.
+# ruff: noqa: PT009
+
+import base64
+from typing import Self
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.jvm_daemon import STDERR_CHANNEL, STDOUT_CHANNEL, JvmDaemonPool
+
+
+class _FakeHost:
+    """Process double that speaks the JarHost line protocol without a JDK."""
+
+    def __init__(self: Self, handshake: str = "READY") -> None:
+        """Queue the startup handshake; requests queue their framed output when written."""
+        self.requests: list[list[str]] = []
+        self._lines = [f"{handshake}\n"]
+        self.stdin = self
+        self.stdout = self
+
+    def write(self: Self, data: str) -> None:
+        """Decode one request and answer it with framed output and the request's sentinel token."""
+        token, *fields = data.rstrip("\n").split("\t")
+        self.requests.append([base64.b64decode(field).decode() for field in fields])
+        self._lines += ["E Picked up JAVA_TOOL_OPTIONS\n", "O Name: Hide ads\n", f"X {token} 3\n"]
+
+    def flush(self: Self) -> None:
+        """Requests are answered synchronously, so there is nothing to flush."""
+
+    def readline(self: Self) -> str:
+        """Return the next protocol line, or an empty string once the host has nothing left."""
+        return self._lines.pop(0) if self._lines else ""
+
+    def close(self: Self) -> None:
+        """Closing stdin is how the pool asks a host to exit."""
+
+    def wait(self: Self, timeout: float | None = None) -> int:
+        """The fake host exits immediately."""
+        return 0
+
+
+class JvmDaemonPoolTests(TestCase):
+    """Verify jar commands are forwarded to warm hosts and fall back cleanly."""
+
+    def test_pool_forwards_jar_command_and_returns_exit_status(self: Self) -> None:
+        """Only the jar and its arguments are sent, and framed output keeps its stream channel."""
+        host = _FakeHost()
+        output: list[tuple[str, str]] = []
+
+        with patch("src.jvm_daemon.Popen", return_value=host):
+            return_code = JvmDaemonPool(1, []).run(
+                ["-Xmx1024m", "-jar", "cli.jar", "list-patches", "--with-options", "patches.rvp"],
+                lambda channel, text: output.append((channel, text)),
+            )
+
+        self.assertEqual(3, return_code)
+        self.assertEqual([["cli.jar", "list-patches", "--with-options", "patches.rvp"]], host.requests)
+        self.assertEqual(
+            [(STDERR_CHANNEL, "Picked up JAVA_TOOL_OPTIONS"), (STDOUT_CHANNEL, "Name: Hide ads")],
+            output,
+        )
+
+    def test_unsupported_jdk_disables_pool_so_callers_use_subprocesses(self: Self) -> None:
+        """A JDK that cannot trap System.exit must make every later call fall back instead of retrying."""
+        pool = JvmDaemonPool(1, [])
+
+        with patch("src.jvm_daemon.Popen", return_value=_FakeHost("UNSUPPORTED")) as popen:
+            first = pool.run(["-jar", "cli.jar", "list-patches"], lambda _channel, _text: None)
+            second = pool.run(["-jar", "cli.jar", "list-patches"], lambda _channel, _text: None)
+
+        self.assertIsNone(first)
+        self.assertIsNone(second)
+        popen.assert_called_once()
@@ -2,17 +2,39 @@
 
 # These samples mirror the three live CLI dialects the builder supports today.
 # unittest keeps this parser coverage aligned with the existing project test style.
-# ruff: noqa: PT009
+# ruff: noqa: PT009, SLF001
 
+import json
+import re
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import chdir
+from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, Self
+from threading import Event
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Self, cast
 from unittest import TestCase
 from unittest.mock import patch
 
+from src import patches_gen
+from src.bundle_metadata import BundleMetadataReader
 from src.cli_args import merge_cli_arg_maps
 from src.patches import Patches
-from src.patches_gen import convert_command_output_to_json, parse_text_to_json
+from src.patches_cache import PatchesMetadataCache
+from src.patches_gen import (
+    convert_command_output_to_json,
+    extract_compatible_packages_from_section,
+    extract_name_from_section,
+    extract_options_from_section,
+    iter_patches,
+    parse_single_section,
+    parse_text_to_json,
+)
+
+if TYPE_CHECKING:
+    from src.app import APP
+    from src.config import RevancedConfig
 
 EXPECTED_REVANCED_PATCH_COUNT = 2
 EXPECTED_REVANCED_OPTION_COUNT = 2
@@ -160,6 +182,80 @@ class PatchesGenParserTests(TestCase):
         self.assertEqual(["app.revanced", "com.google", "com.mgoogle"], option["possible_values"])
         self.assertEqual(["20.47.62", "20.48.46"], gms_core["compatiblePackages"][0]["versions"])
 
+    def test_streaming_parser_yields_expected_patches(self: Self) -> None:
+        """Parsing lines as they arrive must yield each complete patch, whichever way the output is chunked."""
+        expected = [
+            {
+                "name": "Spoof build info",
+                "description": "Spoofs the device build information.",
+                "compatiblePackages": [{"name": "com.google.android.youtube", "versions": ["20.47.62"]}],
+                "use": False,
+                "options": [
+                    {
+                        "title": "Board",
+                        "description": "The name of the underlying board.",
+                        "required": False,
+                        "key": "Board",
+                        "default": "",
+                        "possible_values": [],
+                        "type": "kotlin.String",
+                    },
+                    {
+                        "title": "Bootloader",
+                        "description": "The system bootloader version.",
+                        "required": False,
+                        "key": "Bootloader",
+                        "default": "unknown",
+                        "possible_values": [],
+                        "type": "kotlin.String",
+                    },
+                ],
+            },
+            {
+                "name": "Spoof client",
+                "description": "Spoofs the Reddit OAuth client.",
+                "compatiblePackages": [{"name": "com.onelouder.baconreader", "versions": None}],
+                "use": True,
+                "options": [
+                    {
+                        "title": "Application client ID",
+                        "description": "The Reddit OAuth application client ID.",
+                        "required": True,
+                        "key": "Application client ID",
+                        "default": "redreader-client-id",
+                        "possible_values": ["redreader-client-id (RedReader)"],
+                        "type": "kotlin.String",
+                    },
+                ],
+            },
+        ]
+
+        self.assertEqual(expected, list(iter_patches(REVANCED_SAMPLE.splitlines(keepends=True))))
+        self.assertEqual(expected, parse_text_to_json(REVANCED_SAMPLE))
+
+    def test_section_parser_delegates_to_streaming_parser(self: Self) -> None:
+        """Whole-section callers must get the same dicts the streaming parser yields for the same sections."""
+        for sample in (REVANCED_SAMPLE, MORPHE_SAMPLE, ANDDEA_SAMPLE):
+            sections = re.split(r"\n(?=Name:)", sample.removeprefix("INFO: "))
+
+            self.assertEqual(parse_text_to_json(sample), [parse_single_section(section) for section in sections])
+
+    def test_field_extractors_share_one_section_parse(self: Self) -> None:
+        """Extracting several fields from one section must parse it once and hand out independent copies."""
+        section = re.split(r"\n(?=Name:)", REVANCED_SAMPLE)[0]
+
+        with patch("src.patches_gen._PatchSectionParser", wraps=patches_gen._PatchSectionParser) as section_parser:
+            patches_gen._parse_section.cache_clear()
+            name = extract_name_from_section(section)
+            extract_options_from_section(section).clear()
+            options = extract_options_from_section(section)
+            packages = extract_compatible_packages_from_section(section)
+
+        section_parser.assert_called_once()
+        self.assertEqual(parse_single_section(section)["name"], name)
+        self.assertEqual(parse_single_section(section)["options"], options)
+        self.assertEqual(parse_single_section(section)["compatiblePackages"] or [], packages)
+
     def test_morphe_list_patches_omits_unsupported_temp_path(self: Self) -> None:
         """Morphe list-patches does not expose the temporary-files-path option."""
         list_patch_args, _ = merge_cli_arg_maps("morphe-cli", ("", ""))
@@ -167,7 +263,10 @@ class PatchesGenParserTests(TestCase):
         with (
             TemporaryDirectory() as temp_dir,
             chdir(temp_dir),
-            patch("src.patches_gen.run_command_and_capture_output", return_value=MORPHE_SAMPLE) as run_command,
+            patch(
+                "src.patches_gen.stream_command_output",
+                return_value=MORPHE_SAMPLE.splitlines(keepends=True),
+            ) as run_command,
         ):
             convert_command_output_to_json("morphe-cli.jar", "patches.mpp", list_patch_args, "tmp/youtube")
 
@@ -175,3 +274,243 @@ class PatchesGenParserTests(TestCase):
         # Keeping the unsupported flag out of list-patches prevents Morphe CLI argument errors.
         self.assertNotIn("-t", command)
         self.assertNotIn("tmp/youtube", command)
+
+    def test_metadata_cache_skips_cli_for_identical_cli_and_bundle(self: Self) -> None:
+        """A second app sharing the same CLI jar and bundle should reuse parsed output instead of launching Java."""
+        with (
+            TemporaryDirectory() as temp_dir,
+            chdir(temp_dir),
+            patch(
+                "src.patches_gen.stream_command_output",
+                return_value=ANDDEA_SAMPLE.splitlines(keepends=True),
+            ) as run_command,
+        ):
+            Path("cli.jar").write_bytes(b"cli")
+            Path("patches.rvp").write_bytes(b"bundle")
+            cache = PatchesMetadataCache(Path("cache"), max_entries=2)
+
+            first = convert_command_output_to_json("cli.jar", "patches.rvp", metadata_cache=cache)
+            second = convert_command_output_to_json("cli.jar", "patches.rvp", metadata_cache=cache)
+
+        run_command.assert_called_once()
+        self.assertEqual(first, second)
+
+    def test_metadata_cache_misses_when_bundle_bytes_change(self: Self) -> None:
+        """The cache is content-addressed, so an updated bundle under the same file name must be listed again."""
+        with (
+            TemporaryDirectory() as temp_dir,
+            chdir(temp_dir),
+            patch(
+                "src.patches_gen.stream_command_output",
+                return_value=ANDDEA_SAMPLE.splitlines(keepends=True),
+            ) as run_command,
+        ):
+            Path("cli.jar").write_bytes(b"cli")
+            Path("patches.rvp").write_bytes(b"bundle-v1")
+            cache = PatchesMetadataCache(Path("cache"), max_entries=1)
+            convert_command_output_to_json("cli.jar", "patches.rvp", metadata_cache=cache)
+            Path("patches.rvp").write_bytes(b"bundle-v2")
+            convert_command_output_to_json("cli.jar", "patches.rvp", metadata_cache=cache)
+
+            cached_entries = list(Path("cache").glob("*.json"))
+
+        self.assertEqual(2, run_command.call_count)
+        # The size bound keeps only the newest entry once the bundle changed.
+        self.assertEqual(1, len(cached_entries))
+
+    def test_metadata_cache_bounds_entries_kept_in_memory(self: Self) -> None:
+        """Long-lived processes must not keep every parsed bundle they ever loaded."""
+        with (
+            TemporaryDirectory() as temp_dir,
+            patch.dict(PatchesMetadataCache._loaded, clear=True),
+            patch.object(PatchesMetadataCache, "_max_loaded", 2),
+        ):
+            cache = PatchesMetadataCache(Path(temp_dir), max_entries=4)
+            for key in ("a", "b", "c"):
+                cache.store(key, [{"name": key}])
+
+            self.assertEqual(["b", "c"], list(PatchesMetadataCache._loaded))
+            # Entries dropped from memory are still served from disk.
+            self.assertEqual([{"name": "a"}], cache.load("a"))
+
+    def test_single_flight_shares_one_cli_run_between_concurrent_workers(self: Self) -> None:
+        """Workers listing the same CLI and bundle at the same moment should wait on one JVM run."""
+        follower_waiting = Event()
+
+        class SignallingFuture(Future[Any]):
+            """Future that reports when a follower starts waiting on the leader's result."""
+
+            def result(self: Self, timeout: float | None = None) -> Any:
+                follower_waiting.set()
+                return super().result(timeout)
+
+        def slow_list_patches(_command: list[str]) -> list[str]:
+            # The leader only finishes once the second worker has joined its in-flight call.
+            follower_waiting.wait(timeout=5)
+            return ANDDEA_SAMPLE.splitlines(keepends=True)
+
+        with (
+            TemporaryDirectory() as temp_dir,
+            chdir(temp_dir),
+            patch("src.patches_cache.Future", SignallingFuture),
+            patch("src.patches_gen.stream_command_output", side_effect=slow_list_patches) as run_command,
+            ThreadPoolExecutor(max_workers=2) as executor,
+        ):
+            Path("cli.jar").write_bytes(b"cli")
+            Path("patches.rvp").write_bytes(b"bundle")
+
+            results = [executor.submit(convert_command_output_to_json, "cli.jar", "patches.rvp") for _ in range(2)]
+
+            self.assertEqual(results[0].result(), results[1].result())
+
+        run_command.assert_called_once()
+
+    def test_patch_index_keeps_first_bundle_entry_and_skips_other_packages(self: Self) -> None:
+        """Indexed processing must keep the first bundle's duplicate and ignore patches for other packages."""
+
+        def patch_entry(name: str, packages: list[tuple[str, list[str]]]) -> dict[str, Any]:
+            return {
+                "name": name,
+                "description": name,
+                "compatiblePackages": [{"name": package, "versions": versions} for package, versions in packages],
+            }
+
+        first_bundle = [
+            patch_entry("Hide ads", [("com.example", ["2.0", "1.0"]), ("com.other", ["9.0"])]),
+            patch_entry("Spoof signature", []),
+        ]
+        second_bundle = [
+            patch_entry("Hide ads", [("com.example", ["3.0"])]),
+            patch_entry("Other only", [("com.other", ["9.0"])]),
+            patch_entry("Theme", [("com.example", [])]),
+        ]
+        config = cast(
+            "RevancedConfig",
+            SimpleNamespace(temp_folder=Path("apks"), disable_caching=True, patches_metadata_cache_size=0),
+        )
+        app = cast(
+            "APP",
+            SimpleNamespace(
+                app_name="example",
+                package_name="com.example",
+                patch_bundles=[{"file_name": "one.rvp"}, {"file_name": "two.rvp"}],
+                resource={"cli": {"file_name": "cli.jar"}},
+                cli_lp_args={},
+                get_cli_temporary_files_path=lambda _config: "tmp/example",
+            ),
+        )
+
+        with patch("src.patches.convert_command_output_to_json", side_effect=[first_bundle, second_bundle]):
+            patches = Patches(config, app)
+
+        self.assertEqual(
+            [("Hide ads", "2.0"), ("Theme", "all")],
+            [(entry["name"], entry["version"]) for entry in patches.patches_dict["example"]],
+        )
+        self.assertEqual(["Spoof signature"], [entry["name"] for entry in patches.patches_dict["universal_patch"]])
+        self.assertEqual(2, app.no_of_patches)
+
+    def test_native_reader_lists_embedded_metadata_without_cli(self: Self) -> None:
+        """Bundles with embedded metadata should produce the CLI parser's schema without launching Java."""
+        embedded = [
+            {
+                "name": "Spoof client",
+                "description": "Spoofs the client.",
+                "use": True,
+                "compatiblePackages": {"com.google.android.youtube": ["20.14.43", "20.12.46"]},
+                "options": [
+                    {
+                        "key": "clientType",
+                        "title": "Client type",
+                        "description": "The client to spoof.",
+                        "required": False,
+                        "type": "String",
+                        "default": "ANDROID_VR",
+                        "values": {"Android VR": "ANDROID_VR", "iOS": "IOS"},
+                    },
+                ],
+            },
+            {"name": "Custom branding", "description": "Changes the app name.", "compatiblePackages": None},
+        ]
+        with (
+            TemporaryDirectory() as temp_dir,
+            chdir(temp_dir),
+            patch.object(BundleMetadataReader, "enabled", new=True),
+            patch("src.patches_gen.stream_command_output") as run_command,
+        ):
+            with zipfile.ZipFile("patches.rvp", "w") as bundle:
+                bundle.writestr("patches-list.json", json.dumps(embedded))
+
+            patches = convert_command_output_to_json("cli.jar", "patches.rvp")
+
+        run_command.assert_not_called()
+        self.assertEqual(["Custom branding", "Spoof client"], [entry["name"] for entry in patches])
+        self.assertIsNone(patches[0]["compatiblePackages"])
+        spoof_client = patches[1]
+        self.assertEqual(
+            [{"name": "com.google.android.youtube", "versions": ["20.14.43", "20.12.46"]}],
+            spoof_client["compatiblePackages"],
+        )
+        self.assertEqual(
+            {
+                "title": "Client type",
+                "description": "The client to spoof.",
+                "required": False,
+                "key": "clientType",
+                "default": "ANDROID_VR",
+                "possible_values": ["ANDROID_VR", "IOS"],
+                "type": "String",
+            },
+            spoof_client["options"][0],
+        )
+
+    def test_native_reader_follows_list_patches_flags(self: Self) -> None:
+        """Embedded metadata should omit what the CLI omits and defer package filters to the CLI."""
+        embedded = [
+            {
+                "name": "Spoof client",
+                "compatiblePackages": {"com.google.android.youtube": ["20.14.43"]},
+                "options": [{"key": "clientType", "title": "Client type"}],
+            },
+            {"name": "Custom branding", "compatiblePackages": None},
+        ]
+        narrow_args = {"OPTIONS": "", "UNIVERSAL": "", "VERSIONS": ""}
+        with (
+            TemporaryDirectory() as temp_dir,
+            chdir(temp_dir),
+            patch.object(BundleMetadataReader, "enabled", new=True),
+            patch(
+                "src.patches_gen.stream_command_output",
+                return_value=ANDDEA_SAMPLE.splitlines(keepends=True),
+            ) as run_command,
+        ):
+            with zipfile.ZipFile("patches.rvp", "w") as bundle:
+                bundle.writestr("patches-list.json", json.dumps(embedded))
+
+            narrowed = convert_command_output_to_json("cli.jar", "patches.rvp", narrow_args)
+            run_command.assert_not_called()
+            convert_command_output_to_json("cli.jar", "patches.rvp", {"FILTER_PACKAGE_NAME": "--filter=com.x"})
+
+        run_command.assert_called_once()
+        self.assertEqual(["Spoof client"], [entry["name"] for entry in narrowed])
+        self.assertEqual([{"name": "com.google.android.youtube", "versions": None}], narrowed[0]["compatiblePackages"])
+        self.assertEqual([], narrowed[0]["options"])
+
+    def test_native_reader_falls_back_to_cli_for_compiled_only_bundles(self: Self) -> None:
+        """Bundles without embedded metadata must still be listed by the CLI."""
+        with (
+            TemporaryDirectory() as temp_dir,
+            chdir(temp_dir),
+            patch.object(BundleMetadataReader, "enabled", new=True),
+            patch(
+                "src.patches_gen.stream_command_output",
+                return_value=ANDDEA_SAMPLE.splitlines(keepends=True),
+            ) as run_command,
+        ):
+            with zipfile.ZipFile("patches.rvp", "w") as bundle:
+                bundle.writestr("classes.dex", b"dex")
+
+            patches = convert_command_output_to_json("cli.jar", "patches.rvp")
+
+        run_command.assert_called_once()
+        self.assertEqual(len(parse_text_to_json(ANDDEA_SAMPLE)), len(patches))
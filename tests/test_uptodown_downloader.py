@@ -51,7 +51,7 @@ class UptodownDownloaderTests(TestCase):
 
         with (
             patch(
-                "src.downloader.uptodown.requests.get",
+                "src.downloader.uptodown.session.get",
                 return_value=_UptodownResponse(text=generic_page),
             ) as request_get,
             patch.object(downloader, "_download") as download,
@@ -93,7 +93,7 @@ class UptodownDownloaderTests(TestCase):
 
         with (
             patch(
-                "src.downloader.uptodown.requests.get",
+                "src.downloader.uptodown.session.get",
                 side_effect=[_UptodownResponse(text=generic_page), _UptodownResponse(text=variant_page)],
             ) as request_get,
             patch.object(downloader, "_download") as download,
@@ -128,7 +128,7 @@ class UptodownDownloaderTests(TestCase):
         downloader = UptoDown(_config())
 
         with (
-            patch("src.downloader.uptodown.requests.get", return_value=_UptodownResponse(text=apk_page)),
+            patch("src.downloader.uptodown.session.get", return_value=_UptodownResponse(text=apk_page)),
             patch.object(downloader, "_download") as download,
         ):
             file_name, download_url = downloader.extract_download_link(